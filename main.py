@@ -6,10 +6,11 @@ A system tray application that automatically switches Windows power plans
 and Lian Li fan configurations based on CPU/GPU usage or running applications.
 
 Usage:
-    python main.py [--config PATH]
+    python main.py [--config PATH] [--profile [TICKS]]
     
 Arguments:
-    --config PATH   Path to custom config file (optional)
+    --config PATH       Path to custom config file (optional)
+    --profile [TICKS]   Profile the monitor for TICKS ticks after startup
 """
 
 import argparse
@@ -32,6 +33,15 @@ def main():
         default=None,
         help='Path to custom config file'
     )
+    parser.add_argument(
+        '--profile',
+        type=int,
+        nargs='?',
+        const=0,
+        default=None,
+        metavar='TICKS',
+        help='Profile the monitor for TICKS ticks (default profiling.ticks) and write pstats and collapsed stacks'
+    )
     
     args = parser.parse_args()
     
@@ -47,6 +57,8 @@ def main():
     print("Starting tray application...")
     
     app = TrayApp(config)
+    if args.profile is not None:
+        app.monitor.start_profiling(args.profile or None)
     app.run()
 
 
@@ -0,0 +1,200 @@
+import logging
+import os
+import platform
+import subprocess
+import time
+from typing import Dict, List, Optional
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+SUBPROCESS_FLAGS = subprocess.CREATE_NO_WINDOW if platform.system() == "Windows" else 0
+
+
+class ProcessUsage:
+    __slots__ = ('pid', 'name', 'cpu_percent', 'gpu_percent')
+    
+    def __init__(self, pid: int, name: str, cpu_percent: float, gpu_percent: Optional[float] = None):
+        self.pid = pid
+        self.name = name
+        self.cpu_percent = cpu_percent
+        self.gpu_percent = gpu_percent
+    
+    def __str__(self) -> str:
+        text = f"{self.name}({self.pid}) {self.cpu_percent:.1f}% cpu"
+        if self.gpu_percent is not None:
+            text += f" {self.gpu_percent:.1f}% gpu"
+        return text
+
+
+class ProcessAttributor:
+    """Finds the processes responsible for load when a threshold is crossed.
+
+    Process objects are cached across calls so their names and previous CPU
+    times are reused; each scan only reads cpu_times() inside oneshot().
+    """
+    
+    def __init__(self, config):
+        self.config = config
+        self._processes: Dict[int, psutil.Process] = {}
+        self._names: Dict[int, str] = {}
+        self._cpu_times: Dict[int, float] = {}
+        self._sampled_at: Optional[float] = None
+        self._cpu_count = psutil.cpu_count() or 1
+    
+    def prime(self):
+        """Record a CPU-time baseline so the next attribute() covers the hold period."""
+        self._scan()
+    
+    def attribute(self, rank_by_gpu: bool = False) -> List[ProcessUsage]:
+        if self._baseline_stale():
+            self._scan()
+            time.sleep(self.config.attribution_sample_window_ms / 1000.0)
+        
+        cpu = self._scan()
+        gpu = self._get_gpu_usage_by_pid() if self.config.attribution_gpu_per_process else {}
+        top_n = self.config.attribution_top_n
+        
+        ranked = sorted(cpu.items(), key=lambda item: item[1], reverse=True)[:top_n]
+        pids = [pid for pid, _ in ranked]
+        if gpu:
+            for pid, _ in sorted(gpu.items(), key=lambda item: item[1], reverse=True)[:top_n]:
+                if pid not in pids:
+                    pids.append(pid)
+        
+        results = [
+            ProcessUsage(pid, self._names.get(pid, '?'), cpu.get(pid, 0.0), gpu.get(pid) if gpu else None)
+            for pid in pids
+            if cpu.get(pid, 0.0) > 0 or gpu.get(pid)
+        ]
+        if rank_by_gpu:
+            results.sort(key=lambda usage: usage.gpu_percent or 0.0, reverse=True)
+        else:
+            results.sort(key=lambda usage: usage.cpu_percent, reverse=True)
+        return results[:top_n]
+    
+    def _baseline_stale(self) -> bool:
+        if self._sampled_at is None:
+            return True
+        return time.monotonic() - self._sampled_at > self.config.attribution_max_baseline_age_seconds
+    
+    def _scan(self) -> Dict[int, float]:
+        """Update the cache and return each process's share of total CPU since the last scan."""
+        now = time.monotonic()
+        elapsed = (now - self._sampled_at) if self._sampled_at is not None else 0.0
+        capacity = elapsed * self._cpu_count
+        
+        usage: Dict[int, float] = {}
+        seen = set()
+        for pid in psutil.pids():
+            proc = self._processes.get(pid)
+            try:
+                if proc is None:
+                    proc = psutil.Process(pid)
+                    with proc.oneshot():
+                        self._names[pid] = proc.name().lower()
+                        times = proc.cpu_times()
+                    self._processes[pid] = proc
+                else:
+                    with proc.oneshot():
+                        times = proc.cpu_times()
+                total = times.user + times.system
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+            
+            seen.add(pid)
+            previous = self._cpu_times.get(pid)
+            self._cpu_times[pid] = total
+            if previous is not None and capacity > 0:
+                usage[pid] = max(0.0, (total - previous) / capacity * 100.0)
+        
+        for pid in list(self._processes):
+            if pid not in seen:
+                del self._processes[pid]
+                self._names.pop(pid, None)
+                self._cpu_times.pop(pid, None)
+        
+        self._sampled_at = now
+        return usage
+    
+    def _get_gpu_usage_by_pid(self) -> Dict[int, float]:
+        usage = self._get_nvidia_usage_by_pid()
+        if not usage and platform.system() == "Windows":
+            usage = self._get_windows_engine_usage_by_pid()
+        return usage
+    
+    def _get_nvidia_usage_by_pid(self) -> Dict[int, float]:
+        smi_path = self.config.nvidia_smi_path
+        if not os.path.exists(smi_path):
+            return {}
+        
+        try:
+            result = subprocess.run(
+                [smi_path, 'pmon', '-c', '1', '-s', 'u'],
+                capture_output=True, text=True, timeout=5, creationflags=SUBPROCESS_FLAGS
+            )
+        except Exception as e:
+            logger.debug(f"nvidia-smi pmon failed: {e}")
+            return {}
+        
+        usage: Dict[int, float] = {}
+        if result.returncode != 0:
+            return usage
+        
+        for line in result.stdout.splitlines():
+            parts = line.split()
+            if not parts or parts[0].startswith('#') or len(parts) < 4:
+                continue
+            try:
+                pid = int(parts[1])
+                sm = float(parts[3])
+            except ValueError:
+                continue
+            usage[pid] = usage.get(pid, 0.0) + sm
+        return usage
+    
+    def _get_windows_engine_usage_by_pid(self) -> Dict[int, float]:
+        ps_script = """
+$samples = (Get-Counter '\\GPU Engine(*)\\Utilization Percentage' -ErrorAction SilentlyContinue).CounterSamples
+foreach ($sample in $samples) {
+    if ($sample.CookedValue -gt 0) { Write-Output "$($sample.InstanceName) $($sample.CookedValue)" }
+}
+"""
+        try:
+            result = subprocess.run(
+                ['powershell', '-Command', ps_script],
+                capture_output=True, text=True, timeout=10, creationflags=SUBPROCESS_FLAGS
+            )
+        except Exception as e:
+            logger.debug(f"GPU engine counter query failed: {e}")
+            return {}
+        
+        usage: Dict[int, float] = {}
+        for line in result.stdout.splitlines():
+            instance, _, value = line.strip().rpartition(' ')
+            pid = _parse_engine_instance_pid(instance)
+            if pid is None:
+                continue
+            try:
+                usage[pid] = max(usage.get(pid, 0.0), float(value))
+            except ValueError:
+                pass
+        return usage
+
+
+def _parse_engine_instance_pid(instance: str) -> Optional[int]:
+    # Instance names look like "pid_1234_luid_0x..._phys_0_eng_0_engtype_3d".
+    parts = instance.split('_')
+    if len(parts) < 2 or parts[0] != 'pid':
+        return None
+    try:
+        return int(parts[1])
+    except ValueError:
+        return None
+
+
+def format_attribution(usages: List[ProcessUsage]) -> str:
+    if not usages:
+        return ""
+    return "top: " + ", ".join(str(usage) for usage in usages)
@@ -15,8 +15,37 @@ DEFAULT_CONFIG = {
         "promoteHoldSeconds": 5,
         "demoteHoldSeconds": 15
     },
+    "cpuCores": {
+        "enabled": False,
+        "groups": {},
+        "triggers": [
+            {"mode": "anyK", "k": 4, "percent": 90},
+            {"mode": "topNMean", "n": 4, "percent": 85}
+        ]
+    },
+    "io": {
+        "enabled": False,
+        "triggers": [
+            {"type": "disk", "direction": "total", "mbps": 150,
+             "include": ["*"], "exclude": ["loop*", "ram*", "zram*", "sr*"]},
+            {"type": "network", "direction": "read", "mbps": 40,
+             "include": ["*"], "exclude": ["lo", "Loopback*", "docker*", "veth*", "virbr*", "br-*"]}
+        ]
+    },
     "sampling": {
-        "intervalMs": 1000
+        "intervalMs": 1000,
+        "adaptive": False,
+        "minIntervalMs": 500,
+        "maxIntervalMs": 5000,
+        "nearMarginPercent": 10,
+        "farMarginPercent": 40,
+        "overheadReportSeconds": 600
+    },
+    "overhead": {
+        "budgetPercentOfCore": 0.5,
+        "windowSeconds": 60,
+        "maxStride": 16,
+        "enforce": True
     },
     "games": {
         "watch": [
@@ -32,6 +61,10 @@ DEFAULT_CONFIG = {
         },
         "amd": {
             "preferPyadl": True
+        },
+        "devices": [],
+        "linux": {
+            "fdinfoRescanSeconds": 5
         }
     },
     "lconnect": {
@@ -40,11 +73,150 @@ DEFAULT_CONFIG = {
         "targetFile": "C:\\ProgramData\\Lian-Li\\L-Connect 3\\settings\\L-Connect-Service",
         "mbOnDir": ".\\MB_on",
         "mbOffDir": ".\\MB_off",
-        "backupFile": ".\\backup\\lconnect_original_backup.bin"
+        "backupFile": ".\\backup\\lconnect_original_backup.bin",
+        "restartBurst": 3,
+        "restartsPerHour": 12,
+        "serviceBackend": "auto",
+        "servicePollMs": 50,
+        "serviceDeadlineSeconds": 20
+    },
+    "processor": {
+        "control": "plan",
+        "powerSources": ["ac", "dc"],
+        "boost": {
+            "minProcessorState": 100,
+            "maxProcessorState": 100,
+            "boostMode": "aggressive",
+            "epp": 0,
+            "coreParkingMinCores": 100
+        },
+        "normal": {
+            "minProcessorState": 5,
+            "maxProcessorState": 100,
+            "boostMode": "efficientAggressive",
+            "epp": 50,
+            "coreParkingMinCores": 10
+        }
+    },
+    "processEvents": {
+        "enabled": True,
+        "source": "auto",
+        "pollIntervalMs": 250,
+        "promoteHoldSeconds": 0
+    },
+    "triggers": {
+        "replaceBuiltin": False,
+        "rules": []
+    },
+    "thermal": {
+        "enabled": False,
+        "sampleSeconds": 5,
+        "hysteresisC": 5,
+        "hysteresisW": 10,
+        "cpu": {
+            "sensors": [],
+            "blockAboveC": 90,
+            "demoteAboveC": 97
+        },
+        "gpu": {
+            "blockAboveC": 83,
+            "demoteAboveC": 90,
+            "demoteAbovePowerW": None
+        },
+        "battery": {
+            "mode": "thresholds",
+            "cpuPercent": 85,
+            "gpuPercent": 85,
+            "minPercent": 25
+        }
+    },
+    "processPolicy": {
+        "enabled": False,
+        "rules": [
+            {"match": "$watched", "priority": "aboveNormal"},
+            {
+                "match": [
+                    "searchindexer.exe",
+                    "searchprotocolhost.exe",
+                    "onedrive.exe",
+                    "dropbox.exe",
+                    "googledrivefs.exe"
+                ],
+                "priority": "idle"
+            }
+        ]
+    },
+    "flapControl": {
+        "enabled": True,
+        "windowSeconds": 300,
+        "maxTransitions": 6,
+        "mode": "extend",
+        "holdMultiplier": 2.0,
+        "maxHoldMultiplier": 8.0,
+        "cooldownSeconds": 600
+    },
+    "attribution": {
+        "enabled": True,
+        "topN": 5,
+        "sampleWindowMs": 250,
+        "maxBaselineAgeSeconds": 30,
+        "gpuPerProcess": True
+    },
+    "prediction": {
+        "enabled": False,
+        "lookbackSeconds": 120,
+        "minLaunches": 3,
+        "minConfidence": 0.8,
+        "boostSeconds": 60,
+        "maxEntries": 256,
+        "modelFile": "launch_model.json"
+    },
+    "fleet": {
+        "enabled": False,
+        "url": "http://127.0.0.1:8765/ingest",
+        "nodeId": "",
+        "metricsSeconds": 10,
+        "flushSeconds": 30,
+        "maxBatchRecords": 500,
+        "maxQueueRecords": 5000,
+        "spoolDir": "fleet_spool",
+        "maxSpoolBytes": 5242880,
+        "maxBackoffSeconds": 600,
+        "timeoutSeconds": 10
+    },
+    "state": {
+        "persist": True,
+        "file": "state.json"
+    },
+    "energy": {
+        "enabled": True
+    },
+    "statusPage": {
+        "enabled": False,
+        "file": "status.page"
+    },
+    "profiling": {
+        "ticks": 300,
+        "sampleIntervalMs": 1,
+        "outputDir": "profiles"
+    },
+    "history": {
+        "enabled": False,
+        "file": "history.db",
+        "flushSeconds": 30,
+        "maxQueue": 3600,
+        "rawRetentionHours": 48,
+        "minuteRetentionDays": 30,
+        "hourRetentionDays": 730
     },
     "logging": {
         "logDir": ".\\logs",
-        "verbosity": "info"
+        "verbosity": "info",
+        "maxBytes": 5242880,
+        "backupCount": 3,
+        "rotateHours": 24,
+        "batchSize": 256,
+        "flushIntervalMs": 1000
     }
 }
 
@@ -58,7 +230,9 @@ def get_app_directory() -> Path:
 
 
 class Config:
-    def __init__(self, config_path: Optional[str] = None):
+    def __init__(self, config_path: Optional[str] = None, read_only: bool = False):
+        """read_only loads the defaults for a missing file instead of writing one (for command-line tools)."""
+        self.read_only = read_only
         if config_path is None:
             self.config_path = self._get_default_config_path()
         else:
@@ -94,7 +268,8 @@ class Config:
                 print(f"Error loading config: {e}. Using defaults.")
                 return DEFAULT_CONFIG.copy()
         else:
-            self._save_config(DEFAULT_CONFIG)
+            if not self.read_only:
+                self._save_config(DEFAULT_CONFIG)
             return DEFAULT_CONFIG.copy()
     
     def _merge_config(self, default: Dict, loaded: Dict) -> Dict:
@@ -133,6 +308,26 @@ class Config:
     def gpu_threshold(self) -> int:
         return self._config['thresholds']['gpuPercent']
     
+    @property
+    def cpu_core_triggers_enabled(self) -> bool:
+        return self._config['cpuCores']['enabled']
+    
+    @property
+    def cpu_core_groups(self) -> Dict[str, Any]:
+        return self._config['cpuCores']['groups']
+    
+    @property
+    def cpu_core_triggers(self) -> List[Dict[str, Any]]:
+        return self._config['cpuCores']['triggers']
+    
+    @property
+    def io_triggers_enabled(self) -> bool:
+        return self._config['io']['enabled']
+    
+    @property
+    def io_triggers(self) -> List[Dict[str, Any]]:
+        return self._config['io']['triggers']
+    
     @property
     def promote_hold_seconds(self) -> int:
         return self._config['thresholds']['promoteHoldSeconds']
@@ -145,6 +340,46 @@ class Config:
     def sampling_interval_ms(self) -> int:
         return self._config['sampling']['intervalMs']
     
+    @property
+    def adaptive_sampling(self) -> bool:
+        return self._config['sampling']['adaptive']
+    
+    @property
+    def sampling_min_interval_ms(self) -> int:
+        return self._config['sampling']['minIntervalMs']
+    
+    @property
+    def sampling_max_interval_ms(self) -> int:
+        return self._config['sampling']['maxIntervalMs']
+    
+    @property
+    def sampling_near_margin_percent(self) -> float:
+        return self._config['sampling']['nearMarginPercent']
+    
+    @property
+    def sampling_far_margin_percent(self) -> float:
+        return self._config['sampling']['farMarginPercent']
+    
+    @property
+    def overhead_report_seconds(self) -> float:
+        return self._config['sampling']['overheadReportSeconds']
+    
+    @property
+    def overhead_budget_percent(self) -> float:
+        return self._config['overhead']['budgetPercentOfCore']
+    
+    @property
+    def overhead_window_seconds(self) -> float:
+        return self._config['overhead']['windowSeconds']
+    
+    @property
+    def overhead_max_stride(self) -> int:
+        return self._config['overhead']['maxStride']
+    
+    @property
+    def overhead_enforce(self) -> bool:
+        return self._config['overhead']['enforce']
+    
     @property
     def watched_games(self) -> List[str]:
         return [g.lower() for g in self._config['games']['watch']]
@@ -171,6 +406,303 @@ class Config:
             return self._config['gpu']['amd'].get('preferPyadl', True)
         return True
     
+    @property
+    def attribution_enabled(self) -> bool:
+        return self._config['attribution']['enabled']
+    
+    @property
+    def attribution_top_n(self) -> int:
+        return self._config['attribution']['topN']
+    
+    @property
+    def attribution_sample_window_ms(self) -> int:
+        return self._config['attribution']['sampleWindowMs']
+    
+    @property
+    def attribution_max_baseline_age_seconds(self) -> float:
+        return self._config['attribution']['maxBaselineAgeSeconds']
+    
+    @property
+    def attribution_gpu_per_process(self) -> bool:
+        return self._config['attribution']['gpuPerProcess']
+    
+    @property
+    def prediction_enabled(self) -> bool:
+        return self._config['prediction']['enabled']
+    
+    @property
+    def prediction_lookback_seconds(self) -> float:
+        return self._config['prediction']['lookbackSeconds']
+    
+    @property
+    def prediction_min_launches(self) -> int:
+        return self._config['prediction']['minLaunches']
+    
+    @property
+    def prediction_min_confidence(self) -> float:
+        return self._config['prediction']['minConfidence']
+    
+    @property
+    def prediction_boost_seconds(self) -> float:
+        return self._config['prediction']['boostSeconds']
+    
+    @property
+    def prediction_max_entries(self) -> int:
+        return self._config['prediction']['maxEntries']
+    
+    @property
+    def prediction_model_path(self) -> Path:
+        path = Path(os.path.expandvars(self._config['prediction']['modelFile']))
+        if path.is_absolute():
+            return path
+        return self.get_config_dir() / path
+    
+    @property
+    def gpu_device_policies(self) -> List[Dict[str, Any]]:
+        return self._config['gpu'].get('devices', [])
+    
+    @property
+    def drm_fdinfo_rescan_seconds(self) -> float:
+        return self._config['gpu'].get('linux', {}).get('fdinfoRescanSeconds', 5)
+    
+    @property
+    def fleet_enabled(self) -> bool:
+        return self._config['fleet']['enabled']
+    
+    @property
+    def fleet_url(self) -> str:
+        return self._config['fleet']['url']
+    
+    @property
+    def fleet_node_id(self) -> str:
+        return self._config['fleet']['nodeId']
+    
+    @property
+    def fleet_metrics_seconds(self) -> float:
+        return self._config['fleet']['metricsSeconds']
+    
+    @property
+    def fleet_flush_seconds(self) -> float:
+        return self._config['fleet']['flushSeconds']
+    
+    @property
+    def fleet_max_batch_records(self) -> int:
+        return self._config['fleet']['maxBatchRecords']
+    
+    @property
+    def fleet_max_queue_records(self) -> int:
+        return self._config['fleet']['maxQueueRecords']
+    
+    @property
+    def fleet_spool_dir(self) -> str:
+        path = Path(os.path.expandvars(self._config['fleet']['spoolDir']))
+        if path.is_absolute():
+            return str(path)
+        return str(self.get_config_dir() / path)
+    
+    @property
+    def fleet_max_spool_bytes(self) -> int:
+        return self._config['fleet']['maxSpoolBytes']
+    
+    @property
+    def fleet_max_backoff_seconds(self) -> float:
+        return self._config['fleet']['maxBackoffSeconds']
+    
+    @property
+    def fleet_timeout_seconds(self) -> float:
+        return self._config['fleet']['timeoutSeconds']
+    
+    @property
+    def state_persist(self) -> bool:
+        return self._config['state']['persist']
+    
+    @property
+    def state_file_path(self) -> Path:
+        path = Path(os.path.expandvars(self._config['state']['file']))
+        if path.is_absolute():
+            return path
+        return self.get_config_dir() / path
+    
+    @property
+    def energy_enabled(self) -> bool:
+        return self._config['energy']['enabled']
+    
+    @property
+    def status_page_enabled(self) -> bool:
+        return self._config['statusPage']['enabled']
+    
+    @property
+    def status_page_path(self) -> Path:
+        path = Path(os.path.expandvars(self._config['statusPage']['file']))
+        if path.is_absolute():
+            return path
+        return self.get_config_dir() / path
+    
+    @property
+    def profiling_ticks(self) -> int:
+        return self._config['profiling']['ticks']
+    
+    @property
+    def profiling_sample_interval_ms(self) -> float:
+        return self._config['profiling']['sampleIntervalMs']
+    
+    @property
+    def profiling_output_dir(self) -> Path:
+        path = Path(os.path.expandvars(self._config['profiling']['outputDir']))
+        if path.is_absolute():
+            return path
+        return self.get_config_dir() / path
+    
+    @property
+    def history_enabled(self) -> bool:
+        return self._config['history']['enabled']
+    
+    @property
+    def history_path(self) -> Path:
+        path = Path(os.path.expandvars(self._config['history']['file']))
+        if path.is_absolute():
+            return path
+        return self.get_config_dir() / path
+    
+    @property
+    def history_flush_seconds(self) -> float:
+        return self._config['history']['flushSeconds']
+    
+    @property
+    def history_max_queue(self) -> int:
+        return self._config['history']['maxQueue']
+    
+    @property
+    def history_raw_retention_hours(self) -> float:
+        return self._config['history']['rawRetentionHours']
+    
+    @property
+    def history_minute_retention_days(self) -> float:
+        return self._config['history']['minuteRetentionDays']
+    
+    @property
+    def history_hour_retention_days(self) -> float:
+        return self._config['history']['hourRetentionDays']
+    
+    @property
+    def processor_control_mode(self) -> str:
+        return self._config['processor']['control']
+    
+    @property
+    def processor_power_sources(self) -> List[str]:
+        return self._config['processor']['powerSources']
+    
+    def processor_settings_for(self, boost: bool) -> Dict[str, Any]:
+        return self._config['processor']['boost' if boost else 'normal']
+    
+    @property
+    def process_events_enabled(self) -> bool:
+        return self._config['processEvents']['enabled']
+    
+    @property
+    def process_events_source(self) -> str:
+        return self._config['processEvents']['source']
+    
+    @property
+    def process_events_poll_interval_ms(self) -> float:
+        return self._config['processEvents']['pollIntervalMs']
+    
+    @property
+    def process_events_promote_hold_seconds(self) -> float:
+        return self._config['processEvents']['promoteHoldSeconds']
+    
+    @property
+    def triggers_replace_builtin(self) -> bool:
+        return self._config['triggers']['replaceBuiltin']
+    
+    @property
+    def trigger_rules(self) -> List[Dict[str, Any]]:
+        return self._config['triggers']['rules']
+    
+    @property
+    def thermal_enabled(self) -> bool:
+        return self._config['thermal']['enabled']
+    
+    @property
+    def thermal_sample_seconds(self) -> float:
+        return self._config['thermal']['sampleSeconds']
+    
+    @property
+    def thermal_hysteresis_c(self) -> float:
+        return self._config['thermal']['hysteresisC']
+    
+    @property
+    def thermal_hysteresis_w(self) -> float:
+        return self._config['thermal']['hysteresisW']
+    
+    @property
+    def thermal_cpu(self) -> Dict[str, Any]:
+        return self._config['thermal']['cpu']
+    
+    @property
+    def thermal_gpu(self) -> Dict[str, Any]:
+        return self._config['thermal']['gpu']
+    
+    @property
+    def thermal_battery(self) -> Dict[str, Any]:
+        return self._config['thermal']['battery']
+    
+    @property
+    def process_policy_enabled(self) -> bool:
+        return self._config['processPolicy']['enabled']
+    
+    @property
+    def process_policy_rules(self) -> List[Dict[str, Any]]:
+        return self._config['processPolicy']['rules']
+    
+    @property
+    def flap_control_enabled(self) -> bool:
+        return self._config['flapControl']['enabled']
+    
+    @property
+    def flap_window_seconds(self) -> float:
+        return self._config['flapControl']['windowSeconds']
+    
+    @property
+    def flap_max_transitions(self) -> int:
+        return self._config['flapControl']['maxTransitions']
+    
+    @property
+    def flap_mode(self) -> str:
+        return self._config['flapControl']['mode']
+    
+    @property
+    def flap_hold_multiplier(self) -> float:
+        return self._config['flapControl']['holdMultiplier']
+    
+    @property
+    def flap_max_hold_multiplier(self) -> float:
+        return self._config['flapControl']['maxHoldMultiplier']
+    
+    @property
+    def flap_cooldown_seconds(self) -> float:
+        return self._config['flapControl']['cooldownSeconds']
+    
+    @property
+    def service_restart_burst(self) -> int:
+        return self._config['lconnect']['restartBurst']
+    
+    @property
+    def service_restarts_per_hour(self) -> float:
+        return self._config['lconnect']['restartsPerHour']
+    
+    @property
+    def service_backend(self) -> str:
+        return self._config['lconnect']['serviceBackend']
+    
+    @property
+    def service_poll_ms(self) -> float:
+        return self._config['lconnect']['servicePollMs']
+    
+    @property
+    def service_deadline_seconds(self) -> float:
+        return self._config['lconnect']['serviceDeadlineSeconds']
+    
     @property
     def enable_fan_boost(self) -> bool:
         return self._config['lconnect']['enableFanBoost']
@@ -218,6 +750,26 @@ class Config:
     def verbosity(self) -> str:
         return self._config['logging']['verbosity']
     
+    @property
+    def log_max_bytes(self) -> int:
+        return self._config['logging']['maxBytes']
+    
+    @property
+    def log_backup_count(self) -> int:
+        return self._config['logging']['backupCount']
+    
+    @property
+    def log_rotate_hours(self) -> float:
+        return self._config['logging']['rotateHours']
+    
+    @property
+    def log_batch_size(self) -> int:
+        return self._config['logging']['batchSize']
+    
+    @property
+    def log_flush_interval_ms(self) -> int:
+        return self._config['logging']['flushIntervalMs']
+    
     def get_config_dir(self) -> Path:
         return self.config_path.parent
     
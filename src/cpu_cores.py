@@ -0,0 +1,140 @@
+import logging
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+TRIGGER_MODES = ("anyK", "topNMean")
+
+
+def parse_core_list(spec: Union[str, Sequence[int]], core_count: int) -> Tuple[int, ...]:
+    """Parse [0, 1, 2] or "0-7,16,18-19" into a tuple of valid core indices."""
+    if isinstance(spec, str):
+        indices: List[int] = []
+        for part in spec.split(','):
+            part = part.strip()
+            if not part:
+                continue
+            if '-' in part:
+                start, end = part.split('-', 1)
+                indices.extend(range(int(start), int(end) + 1))
+            else:
+                indices.append(int(part))
+    else:
+        indices = [int(i) for i in spec]
+    
+    valid = tuple(sorted({i for i in indices if 0 <= i < core_count}))
+    if len(valid) != len(set(indices)):
+        logger.warning(f"Ignoring core indices outside 0-{core_count - 1} in '{spec}'")
+    return valid
+
+
+class CoreTrigger:
+    """One saturation rule over a group of cores.
+
+    anyK fires when at least K cores are at or above the threshold, which is
+    the same as the K-th busiest core reaching it. topNMean fires when the
+    mean of the N busiest cores reaches the threshold. Both keep the N busiest
+    values in a preallocated array, so evaluation is a single pass with no
+    allocation.
+    """
+    
+    __slots__ = ('mode', 'count', 'percent', 'group', 'indices', '_top')
+    
+    def __init__(self, mode: str, count: int, percent: float, group: str, indices: Tuple[int, ...]):
+        self.mode = mode
+        self.count = max(1, min(count, len(indices)))
+        self.percent = percent
+        self.group = group
+        self.indices = indices
+        self._top = array('d', [0.0] * self.count)
+    
+    def metric(self, values: array) -> float:
+        top = self._top
+        n = self.count
+        for j in range(n):
+            top[j] = -1.0
+        low = 0
+        for i in self.indices:
+            v = values[i]
+            if v > top[low]:
+                top[low] = v
+                low = 0
+                for j in range(1, n):
+                    if top[j] < top[low]:
+                        low = j
+        
+        if self.mode == "anyK":
+            return top[low]
+        total = 0.0
+        for j in range(n):
+            total += top[j]
+        return total / n
+    
+    def describe(self, metric: float) -> str:
+        if self.mode == "anyK":
+            return f"CPU cores: {self.count} of {self.group} at >= {metric:.1f}%"
+        return f"CPU cores: top {self.count} of {self.group} averaging {metric:.1f}%"
+
+
+class CoreLoad:
+    """Per-core CPU utilization with K-of-N and top-N saturation triggers."""
+    
+    def __init__(self, config):
+        self.config = config
+        self.core_count = psutil.cpu_count() or 1
+        self._values = array('d', [0.0] * self.core_count)
+        self.groups = self._build_groups(config.cpu_core_groups)
+        self.triggers = self._build_triggers(config.cpu_core_triggers)
+        psutil.cpu_percent(interval=None, percpu=True)
+    
+    def _build_groups(self, spec: Dict[str, Union[str, Sequence[int]]]) -> Dict[str, Tuple[int, ...]]:
+        groups = {"all": tuple(range(self.core_count))}
+        for name, cores in spec.items():
+            try:
+                indices = parse_core_list(cores, self.core_count)
+            except ValueError:
+                logger.warning(f"Invalid core group '{name}': {cores}")
+                continue
+            if indices:
+                groups[name] = indices
+        return groups
+    
+    def _build_triggers(self, specs: List[Dict]) -> List[CoreTrigger]:
+        triggers = []
+        for spec in specs:
+            mode = spec.get("mode")
+            group = spec.get("group", "all")
+            if mode not in TRIGGER_MODES:
+                logger.warning(f"Unknown core trigger mode '{mode}'; expected one of {TRIGGER_MODES}")
+                continue
+            if group not in self.groups:
+                logger.warning(f"Core trigger refers to unknown group '{group}'")
+                continue
+            count = spec.get("k" if mode == "anyK" else "n", 1)
+            triggers.append(CoreTrigger(mode, int(count), float(spec.get("percent", 90)),
+                                        group, self.groups[group]))
+        return triggers
+    
+    def update(self) -> array:
+        values = self._values
+        for i, v in enumerate(psutil.cpu_percent(interval=None, percpu=True)):
+            if i < self.core_count:
+                values[i] = v
+        return values
+    
+    def evaluate(self) -> Tuple[Optional[str], float]:
+        """Return (reason or None, smallest headroom below any trigger in points)."""
+        headroom = 100.0
+        for trigger in self.triggers:
+            metric = trigger.metric(self._values)
+            if metric >= trigger.percent:
+                return trigger.describe(metric), 0.0
+            headroom = min(headroom, trigger.percent - metric)
+        return None, headroom
+    
+    @property
+    def values(self) -> array:
+        return self._values
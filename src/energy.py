@@ -0,0 +1,182 @@
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from .gpu_linux import PreadFile
+
+logger = logging.getLogger(__name__)
+
+MAX_REASONS = 32
+OTHER_REASON = "Other"
+
+
+def _read_text(path: Path) -> Optional[str]:
+    try:
+        return path.read_text().strip()
+    except OSError:
+        return None
+
+
+def reason_category(reason: str) -> str:
+    """Collapse a transition reason to a stable key, e.g. "CPU at 91.2% [game.exe]" -> "CPU"."""
+    reason = reason.split(" [", 1)[0]
+    if ":" in reason:
+        return reason.split(":", 1)[0]
+    if reason.startswith(("CPU ", "GPU ")):
+        return reason[:3]
+    if reason.startswith(("Disk I/O", "Network I/O")):
+        return reason.split(" I/O", 1)[0] + " I/O"
+    return reason
+
+
+class RaplZone:
+    """A top-level powercap zone (one CPU package) with a monotonic microjoule counter."""
+    
+    __slots__ = ('name', 'file', 'max_range', 'last')
+    
+    def __init__(self, name: str, zone_dir: Path):
+        self.name = name
+        self.file = PreadFile(str(zone_dir / 'energy_uj'))
+        max_range = _read_text(zone_dir / 'max_energy_range_uj')
+        self.max_range = int(max_range) if max_range and max_range.isdigit() else None
+        self.last = self.read()
+    
+    def read(self) -> int:
+        return int(self.file.read(32))
+    
+    def delta_uj(self) -> int:
+        value = self.read()
+        delta = value - self.last
+        if delta < 0:
+            # The counter wrapped at max_energy_range_uj (or was reset, e.g. across suspend).
+            delta = self.max_range - self.last + value if self.max_range else 0
+        self.last = value
+        return delta
+
+
+def discover_rapl_zones(powercap_root: str = '/sys/class/powercap') -> List[RaplZone]:
+    """Open package zones (intel-rapl:N); subzones such as intel-rapl:N:M are already included in them."""
+    zones = []
+    root = Path(powercap_root)
+    if not root.is_dir():
+        return zones
+    for zone_dir in sorted(root.iterdir()):
+        prefix, _, index = zone_dir.name.partition(':')
+        if prefix != 'intel-rapl' or not index.isdigit():
+            continue
+        name = _read_text(zone_dir / 'name') or zone_dir.name
+        try:
+            zones.append(RaplZone(name, zone_dir))
+        except (OSError, ValueError) as e:
+            # energy_uj is root-only on kernels patched for CVE-2020-8694.
+            logger.info(f"Cannot read RAPL zone {zone_dir.name}: {e}")
+    return zones
+
+
+class EnergyAccount:
+    __slots__ = ('seconds', 'cpu_joules', 'gpu_joules')
+    
+    def __init__(self):
+        self.seconds = 0.0
+        self.cpu_joules = 0.0
+        self.gpu_joules = 0.0
+    
+    def add(self, seconds: float, cpu_joules: float, gpu_joules: float):
+        self.seconds += seconds
+        self.cpu_joules += cpu_joules
+        self.gpu_joules += gpu_joules
+    
+    def to_dict(self) -> Dict[str, float]:
+        joules = self.cpu_joules + self.gpu_joules
+        seconds = self.seconds or 1.0
+        return {
+            "seconds": self.seconds,
+            "joules": joules,
+            "cpuJoules": self.cpu_joules,
+            "gpuJoules": self.gpu_joules,
+            "avgWatts": joules / seconds,
+            "cpuWatts": self.cpu_joules / seconds,
+            "gpuWatts": self.gpu_joules / seconds
+        }
+
+
+class EnergyMeter:
+    """Accumulates CPU package (RAPL) and GPU board energy per state and per reason.
+
+    Each interval between samples is charged to the state and transition
+    reason that were in effect during it. GPU energy integrates the
+    power.draw readings with the trapezoid rule. Intervals longer than twice
+    the longest tick interval (suspend, a stalled loop) are skipped.
+    """
+    
+    def __init__(self, config, powercap_root: str = '/sys/class/powercap'):
+        self.config = config
+        self.zones = discover_rapl_zones(powercap_root)
+        # Without adaptive sampling every tick is intervalMs apart, which may exceed maxIntervalMs.
+        self._max_gap = 2 * max(config.sampling_interval_ms, config.sampling_max_interval_ms) / 1000.0
+        self._states = {"boost": EnergyAccount(), "normal": EnergyAccount()}
+        self._reasons: Dict[str, EnergyAccount] = {}
+        self._last_time: Optional[float] = None
+        self._last_gpu_power: Optional[float] = None
+        self._last_boosted = False
+        self._last_reason = ""
+        self._gpu_seen = False
+        self.cpu_watts: Optional[float] = None
+        self.gpu_watts: Optional[float] = None
+        if self.zones:
+            logger.info(f"Energy metering via RAPL zones: {', '.join(zone.name for zone in self.zones)}")
+    
+    def sample(self, gpu_devices: Iterable, boosted: bool, reason: str, now: Optional[float] = None):
+        now = time.monotonic() if now is None else now
+        powers = [device.power_w for device in gpu_devices if device.power_w is not None]
+        gpu_power = sum(powers) if powers else None
+        self._gpu_seen = self._gpu_seen or gpu_power is not None
+        
+        cpu_uj = 0
+        for zone in self.zones:
+            try:
+                cpu_uj += zone.delta_uj()
+            except (OSError, ValueError) as e:
+                logger.debug(f"Reading RAPL zone {zone.name} failed: {e}")
+        
+        if self._last_time is not None:
+            seconds = now - self._last_time
+            if 0 < seconds <= self._max_gap:
+                cpu_joules = cpu_uj / 1e6
+                gpu_joules = 0.0
+                if gpu_power is not None:
+                    previous = self._last_gpu_power if self._last_gpu_power is not None else gpu_power
+                    gpu_joules = (previous + gpu_power) / 2 * seconds
+                self.cpu_watts = cpu_joules / seconds if self.zones else None
+                self.gpu_watts = gpu_power
+                self._states["boost" if self._last_boosted else "normal"].add(seconds, cpu_joules, gpu_joules)
+                self._reason_account(self._last_reason).add(seconds, cpu_joules, gpu_joules)
+        
+        self._last_time = now
+        self._last_gpu_power = gpu_power
+        self._last_boosted = boosted
+        self._last_reason = reason
+    
+    def _reason_account(self, reason: str) -> EnergyAccount:
+        key = reason_category(reason) or OTHER_REASON
+        account = self._reasons.get(key)
+        if account is None:
+            if len(self._reasons) >= MAX_REASONS:
+                key = OTHER_REASON
+            account = self._reasons.setdefault(key, EnergyAccount())
+        return account
+    
+    def close(self):
+        for zone in self.zones:
+            zone.file.close()
+    
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "raplZones": [zone.name for zone in self.zones],
+            "gpuPower": self._gpu_seen,
+            "cpuWatts": self.cpu_watts,
+            "gpuWatts": self.gpu_watts,
+            "states": {state: account.to_dict() for state, account in self._states.items()},
+            "reasons": {reason: account.to_dict() for reason, account in list(self._reasons.items())}
+        }
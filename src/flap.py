@@ -0,0 +1,161 @@
+import logging
+import math
+import time
+from collections import deque
+from threading import Lock
+from typing import Any, Callable, Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+MODE_EXTEND = "extend"
+MODE_PIN = "pin"
+
+
+class FlapDetector:
+    """Rate-limits automatic transitions over a sliding window.
+
+    When more than maxTransitions happen within windowSeconds, either the
+    promote/demote hold times are multiplied by holdMultiplier for every
+    transition over the limit (mode "extend", capped at maxHoldMultiplier), or
+    the current state is pinned for cooldownSeconds (mode "pin"). The hold
+    multiplier relaxes on its own as old transitions leave the window.
+    """
+    
+    def __init__(self, config):
+        self.config = config
+        self._transitions: Deque[float] = deque()
+        self._pinned_until: Optional[float] = None
+        self._multiplier = 1.0
+        self.suppressed = 0
+        self._suppressing = False
+        self.decision = "none"
+    
+    def _expire(self, now: float):
+        cutoff = now - self.config.flap_window_seconds
+        while self._transitions and self._transitions[0] < cutoff:
+            self._transitions.popleft()
+    
+    def record(self, now: float):
+        self._transitions.append(now)
+        self._update(now)
+    
+    def _update(self, now: float):
+        self._expire(now)
+        excess = len(self._transitions) - self.config.flap_max_transitions
+        
+        if self.config.flap_mode == MODE_PIN:
+            if excess > 0 and self._pinned_until is None:
+                self._pinned_until = now + self.config.flap_cooldown_seconds
+                self._set_decision(f"pinned for {self.config.flap_cooldown_seconds:.0f}s after "
+                                   f"{len(self._transitions)} transitions in {self.config.flap_window_seconds:.0f}s")
+            return
+        
+        multiplier = 1.0
+        if excess > 0:
+            multiplier = min(self.config.flap_max_hold_multiplier,
+                             self.config.flap_hold_multiplier ** excess)
+        if multiplier != self._multiplier:
+            self._multiplier = multiplier
+            if multiplier > 1.0:
+                self._set_decision(f"hold times x{multiplier:g} after "
+                                   f"{len(self._transitions)} transitions in {self.config.flap_window_seconds:.0f}s")
+            else:
+                self._set_decision("none")
+    
+    def _set_decision(self, decision: str):
+        if decision == self.decision:
+            return
+        self.decision = decision
+        if decision == "none":
+            logger.info("Flap control released")
+        else:
+            logger.warning(f"Flapping detected: {decision}")
+    
+    def is_pinned(self, now: float) -> bool:
+        if self._pinned_until is None:
+            return False
+        if now < self._pinned_until:
+            return True
+        self._pinned_until = None
+        # Transitions from before the pin no longer count against the rate.
+        self._transitions.clear()
+        self._set_decision("none")
+        return False
+    
+    def hold(self, base_seconds: float, now: float) -> float:
+        if self._multiplier > 1.0:
+            self._update(now)
+        return base_seconds * self._multiplier
+    
+    def note_pinned_demand(self, wants_change: bool):
+        """Count each stretch of ticks in which a pin held back a wanted transition."""
+        if wants_change and not self._suppressing:
+            self.suppressed += 1
+            logger.info("Transition suppressed by flap control pin")
+        self._suppressing = wants_change
+    
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, Any]:
+        now = time.time() if now is None else now
+        cutoff = now - self.config.flap_window_seconds
+        return {
+            "mode": self.config.flap_mode,
+            "recentTransitions": sum(1 for t in list(self._transitions) if t >= cutoff),
+            "holdMultiplier": self._multiplier,
+            "pinnedSeconds": max(0.0, self._pinned_until - now) if self._pinned_until else 0.0,
+            "suppressed": self.suppressed,
+            "decision": self.decision
+        }
+
+
+class TokenBucket:
+    """Allows bursts of up to capacity actions, refilled at rate_per_second.
+
+    A rate of 0 never refills, so once the burst is spent no token becomes
+    available again. Safe to share between threads.
+    """
+    
+    def __init__(self, capacity: float, rate_per_second: float, clock: Callable[[], float] = time.monotonic):
+        self.capacity = capacity
+        self.rate = rate_per_second
+        self.clock = clock
+        self._lock = Lock()
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self.denied = 0
+    
+    def _refill(self):
+        now = self.clock()
+        if self.rate > 0:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    def try_take(self) -> bool:
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            self.denied += 1
+            return False
+    
+    def seconds_until_available(self) -> float:
+        with self._lock:
+            return self._seconds_until_available()
+    
+    def _seconds_until_available(self) -> float:
+        self._refill()
+        if self._tokens >= 1.0:
+            return 0.0
+        if self.rate <= 0:
+            return math.inf
+        return (1.0 - self._tokens) / self.rate
+    
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            wait = self._seconds_until_available()
+            return {
+                "tokens": round(self._tokens, 2),
+                "capacity": self.capacity,
+                "denied": self.denied,
+                "nextTokenSeconds": None if math.isinf(wait) else wait
+            }
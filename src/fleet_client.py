@@ -0,0 +1,230 @@
+import gzip
+import json
+import logging
+import os
+import random
+import socket
+import time
+import urllib.error
+import urllib.request
+import uuid
+import zlib
+from collections import deque
+from pathlib import Path
+from threading import Event, Lock, Thread
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SPOOL_SUFFIX = '.jsonl.gz'
+
+
+def encode_batch(records: List[Dict[str, Any]]) -> bytes:
+    lines = "\n".join(json.dumps(record, separators=(',', ':')) for record in records)
+    return gzip.compress(lines.encode('utf-8'))
+
+
+class BatchTooLarge(ValueError):
+    pass
+
+
+def decode_batch(body: bytes, max_bytes: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Decompress a gzip batch, stopping at max_bytes of output so a small body cannot expand without bound."""
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    data = decompressor.decompress(body, max_bytes + 1 if max_bytes is not None else 0)
+    if max_bytes is not None and (len(data) > max_bytes or decompressor.unconsumed_tail):
+        raise BatchTooLarge(f"batch expands beyond {max_bytes} bytes")
+    if not decompressor.eof:
+        raise ValueError("truncated gzip batch")
+    text = data.decode('utf-8')
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+class FleetClient:
+    """Pushes metric and journal records from this node to a fleet collector.
+
+    Records are queued in memory and sent as gzip-compressed JSON lines in one
+    POST per flush. A failed batch goes to a local spool directory capped at
+    maxSpoolBytes, oldest files dropped first, and is retried before newer
+    data with exponential backoff.
+
+    Every record carries this process's run id and a sequence number, so the
+    collector can drop a batch that arrives twice (a POST that succeeded but
+    timed out here, then replayed from the spool), even after a restart.
+    """
+    
+    def __init__(self, config, status_provider: Optional[Callable[[], Dict[str, Any]]] = None):
+        self.config = config
+        self.node_id = config.fleet_node_id or socket.gethostname()
+        self.status_provider = status_provider
+        self.spool_dir = Path(config.fleet_spool_dir)
+        self._pending: Deque[Dict[str, Any]] = deque(maxlen=config.fleet_max_queue_records)
+        self._lock = Lock()
+        self._stop_event = Event()
+        self._thread: Optional[Thread] = None
+        self._failures = 0
+        self._next_attempt = 0.0
+        self.run_id = uuid.uuid4().hex
+        self._sequence = 0
+        self.sent_records = 0
+        self.dropped_bytes = 0
+    
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = Thread(target=self._run, name='FleetClient', daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=self.config.fleet_timeout_seconds + 1)
+            if self._thread.is_alive():
+                # The worker spools what is left itself once its current flush returns.
+                logger.warning("Fleet flush still running at stop; it will spool in the background")
+                return
+            self._thread = None
+        # Whatever could not be sent survives in the spool for the next run.
+        self._spool(self._take_pending())
+    
+    def record(self, record_type: str, **fields):
+        record = {"type": record_type, "node": self.node_id, "run": self.run_id, "ts": time.time()}
+        record.update(fields)
+        with self._lock:
+            self._sequence += 1
+            record["seq"] = self._sequence
+            self._pending.append(record)
+    
+    def record_transition(self, boost: bool, reason: str):
+        self.record("transition", boost=boost, reason=reason)
+    
+    def _run(self):
+        next_metrics = 0.0
+        next_flush = time.monotonic() + self.config.fleet_flush_seconds
+        while not self._stop_event.is_set():
+            now = time.monotonic()
+            if self.status_provider and now >= next_metrics:
+                next_metrics = now + self.config.fleet_metrics_seconds
+                try:
+                    self.record("metrics", **self._metrics_fields(self.status_provider()))
+                except Exception as e:
+                    logger.debug(f"Fleet metrics snapshot failed: {e}")
+            if now >= next_flush:
+                next_flush = now + self.config.fleet_flush_seconds
+                self.flush()
+            wake = min(next_metrics, next_flush) if self.status_provider else next_flush
+            self._stop_event.wait(max(0.0, wake - time.monotonic()))
+        self._spool(self._take_pending())
+    
+    @staticmethod
+    def _metrics_fields(status: Dict[str, Any]) -> Dict[str, Any]:
+        samplers = status.get("overhead", {}).get("samplers", {})
+        return {
+            "cpu": status.get("cpu"),
+            "gpu": status.get("gpu"),
+            "boosted": status.get("boosted"),
+            "boostSeconds": status.get("boostSeconds"),
+            "transitions": status.get("transitions"),
+            "samplerErrors": {name: stats.get("errors", 0) for name, stats in samplers.items()},
+            "rssBytes": status.get("overhead", {}).get("rssBytes")
+        }
+    
+    def _take_pending(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            records = list(self._pending)
+            self._pending.clear()
+        return records
+    
+    def flush(self) -> bool:
+        """Send spooled batches, then pending records. Returns True if nothing is left unsent."""
+        if time.monotonic() < self._next_attempt:
+            self._spool(self._take_pending())
+            return False
+        
+        for path in self._spool_files():
+            try:
+                body = path.read_bytes()
+            except OSError:
+                continue
+            if not self._post(body):
+                self._spool(self._take_pending())
+                return False
+            path.unlink(missing_ok=True)
+        
+        records = self._take_pending()
+        max_records = self.config.fleet_max_batch_records
+        for start in range(0, len(records), max_records):
+            batch = records[start:start + max_records]
+            if not self._post(encode_batch(batch)):
+                self._spool(records[start:])
+                return False
+            self.sent_records += len(batch)
+        return True
+    
+    def _post(self, body: bytes) -> bool:
+        request = urllib.request.Request(
+            self.config.fleet_url,
+            data=body,
+            method='POST',
+            headers={
+                'Content-Type': 'application/x-ndjson',
+                'Content-Encoding': 'gzip',
+                'X-Node-Id': self.node_id
+            }
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.config.fleet_timeout_seconds) as response:
+                ok = 200 <= response.status < 300
+        except (urllib.error.URLError, OSError) as e:
+            logger.debug(f"Fleet push failed: {e}")
+            ok = False
+        
+        if ok:
+            if self._failures:
+                logger.info(f"Fleet collector reachable again after {self._failures} failed attempts")
+            self._failures = 0
+            self._next_attempt = 0.0
+            return True
+        
+        self._failures += 1
+        backoff = min(self.config.fleet_max_backoff_seconds,
+                      self.config.fleet_flush_seconds * (2 ** (self._failures - 1)))
+        self._next_attempt = time.monotonic() + backoff * random.uniform(0.5, 1.0)
+        if self._failures == 1:
+            logger.warning(f"Fleet collector unreachable at {self.config.fleet_url}; spooling locally")
+        return False
+    
+    def _spool_files(self) -> List[Path]:
+        if not self.spool_dir.is_dir():
+            return []
+        return sorted(self.spool_dir.glob('*' + SPOOL_SUFFIX))
+    
+    def _spool(self, records: List[Dict[str, Any]]):
+        if not records:
+            return
+        try:
+            self.spool_dir.mkdir(parents=True, exist_ok=True)
+            name = f"{time.time_ns()}-{os.getpid()}{SPOOL_SUFFIX}"
+            (self.spool_dir / name).write_bytes(encode_batch(records))
+        except OSError as e:
+            logger.warning(f"Could not spool fleet records: {e}")
+            return
+        self._trim_spool()
+    
+    def _trim_spool(self):
+        files = self._spool_files()
+        sizes = []
+        for path in files:
+            try:
+                sizes.append(path.stat().st_size)
+            except OSError:
+                sizes.append(0)
+        total = sum(sizes)
+        for path, size in zip(files, sizes):
+            if total <= self.config.fleet_max_spool_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            self.dropped_bytes += size
+            logger.warning(f"Fleet spool over {self.config.fleet_max_spool_bytes} bytes; dropped {path.name}")
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Fleet collector for Dynamic Power Plan nodes.
+
+Accepts gzip-compressed JSON-lines batches from FleetClient instances and
+serves fleet-level summaries.
+
+Usage:
+    python -m src.fleet_collector [--host HOST] [--port PORT]
+
+Endpoints:
+    POST /ingest        Batch of records (Content-Encoding: gzip)
+    GET  /summary       Fleet totals and a per-node table
+    GET  /nodes/<id>    Latest state and recent transitions for one node
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from .fleet_client import BatchTooLarge, decode_batch
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY_BYTES = 8 * 1024 * 1024
+# Limit on a batch after decompression; gzip can expand a body a thousandfold.
+MAX_DECODED_BYTES = 64 * 1024 * 1024
+RECENT_TRANSITIONS = 50
+# How long a client may take to send its whole request.
+READ_TIMEOUT_SECONDS = 30.0
+
+
+class NodeState:
+    """Aggregates one node's records.
+
+    Nodes report cumulative counters (boost seconds, transitions, sampler
+    errors) that reset when the node restarts. A drop in a counter is treated
+    as a restart and the previous value is folded into a base offset.
+
+    Records are deduplicated on (run, seq): a client sends its records in
+    sequence order, so anything at or below the highest sequence seen for
+    that run is a replay.
+    """
+    
+    def __init__(self, node_id: str):
+        self.node_id = node_id
+        self.first_seen: Optional[float] = None
+        self.last_seen = 0.0
+        self.last_metrics: Dict[str, Any] = {}
+        self.records = 0
+        self.restarts = 0
+        self.duplicates = 0
+        self._last_seq: Dict[str, int] = {}
+        self.transitions: Deque[Dict[str, Any]] = deque(maxlen=RECENT_TRANSITIONS)
+        self._counters: Dict[str, Tuple[float, float]] = {}
+    
+    def _counter(self, name: str, value: Optional[float]) -> float:
+        base, last = self._counters.get(name, (0.0, 0.0))
+        if value is None:
+            return base + last
+        if value < last:
+            base += last
+        self._counters[name] = (base, value)
+        return base + value
+    
+    def total(self, name: str) -> float:
+        base, last = self._counters.get(name, (0.0, 0.0))
+        return base + last
+    
+    def ingest(self, record: Dict[str, Any]) -> bool:
+        """Fold one record in; returns False for a replayed record, which is ignored."""
+        run, seq = record.get("run"), record.get("seq")
+        if run is not None and isinstance(seq, int):
+            if seq <= self._last_seq.get(run, 0):
+                self.duplicates += 1
+                return False
+            self._last_seq[run] = seq
+        self.records += 1
+        ts = float(record.get("ts", time.time()))
+        self.first_seen = ts if self.first_seen is None else min(self.first_seen, ts)
+        self.last_seen = max(self.last_seen, ts)
+        record_type = record.get("type")
+        
+        if record_type == "metrics":
+            boost_seconds = record.get("boostSeconds")
+            if boost_seconds is not None and boost_seconds < self._counters.get("boostSeconds", (0.0, 0.0))[1]:
+                self.restarts += 1
+            self._counter("boostSeconds", boost_seconds)
+            self._counter("transitions", record.get("transitions"))
+            for sampler, errors in (record.get("samplerErrors") or {}).items():
+                self._counter(f"errors.{sampler}", errors)
+            self.last_metrics = record
+        elif record_type == "transition":
+            self.transitions.append({
+                "ts": record.get("ts"),
+                "boost": record.get("boost"),
+                "reason": record.get("reason")
+            })
+        return True
+    
+    def sampler_errors(self) -> Dict[str, float]:
+        return {name[7:]: self.total(name) for name in self._counters if name.startswith("errors.")}
+    
+    def summary(self) -> Dict[str, Any]:
+        lifetime = max(self.last_seen - (self.first_seen or self.last_seen), 0.0)
+        boost_seconds = self.total("boostSeconds")
+        return {
+            "node": self.node_id,
+            "lastSeen": self.last_seen,
+            "boosted": self.last_metrics.get("boosted"),
+            "cpu": self.last_metrics.get("cpu"),
+            "gpu": self.last_metrics.get("gpu"),
+            "boostSeconds": boost_seconds,
+            "boostFraction": boost_seconds / lifetime if lifetime > 0 else 0.0,
+            "transitions": self.total("transitions"),
+            "samplerErrors": self.sampler_errors(),
+            "restarts": self.restarts,
+            "records": self.records,
+            "duplicates": self.duplicates
+        }
+
+
+class FleetCollector:
+    def __init__(self, stale_seconds: float = 300.0, read_timeout_seconds: float = READ_TIMEOUT_SECONDS):
+        self.nodes: Dict[str, NodeState] = {}
+        self.stale_seconds = stale_seconds
+        self.read_timeout_seconds = read_timeout_seconds
+        self.batches = 0
+    
+    def ingest(self, node_id: str, records: List[Dict[str, Any]]) -> int:
+        """Returns how many records were new."""
+        self.batches += 1
+        accepted = 0
+        for record in records:
+            node = record.get("node") or node_id
+            state = self.nodes.get(node)
+            if state is None:
+                state = NodeState(node)
+                self.nodes[node] = state
+                logger.info(f"New node: {node}")
+            accepted += state.ingest(record)
+        return accepted
+    
+    def summary(self) -> Dict[str, Any]:
+        now = time.time()
+        nodes = [state.summary() for state in self.nodes.values()]
+        errors: Dict[str, float] = {}
+        for node in nodes:
+            for sampler, count in node["samplerErrors"].items():
+                errors[sampler] = errors.get(sampler, 0) + count
+        return {
+            "nodes": len(nodes),
+            "activeNodes": sum(1 for n in nodes if now - n["lastSeen"] <= self.stale_seconds),
+            "boostedNodes": sum(1 for n in nodes if n["boosted"]),
+            "boostSeconds": sum(n["boostSeconds"] for n in nodes),
+            "transitions": sum(n["transitions"] for n in nodes),
+            "samplerErrors": errors,
+            "batches": self.batches,
+            "perNode": sorted(nodes, key=lambda n: n["node"])
+        }
+    
+    def node_detail(self, node_id: str) -> Optional[Dict[str, Any]]:
+        state = self.nodes.get(node_id)
+        if state is None:
+            return None
+        detail = state.summary()
+        detail["recentTransitions"] = list(state.transitions)
+        return detail
+    
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            status, payload = await asyncio.wait_for(self._handle_request(reader), self.read_timeout_seconds)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+        except asyncio.TimeoutError:
+            logger.warning(f"Dropped a client that sent no complete request within {self.read_timeout_seconds:g}s")
+            writer.close()
+            return
+        except Exception as e:
+            logger.warning(f"Bad request: {e}")
+            status, payload = 400, {"error": str(e)}
+        
+        body = json.dumps(payload).encode('utf-8')
+        reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large"}.get(status, "Error")
+        writer.write(
+            f"HTTP/1.1 {status} {reason}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: close\r\n\r\n".encode('ascii') + body
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+    
+    async def _handle_request(self, reader: asyncio.StreamReader) -> Tuple[int, Any]:
+        request_line = (await reader.readline()).decode('latin-1').strip()
+        if not request_line:
+            raise ConnectionError("empty request")
+        method, path, _ = request_line.split(' ', 2)
+        
+        headers: Dict[str, str] = {}
+        while True:
+            line = (await reader.readline()).decode('latin-1')
+            if line in ('\r\n', '\n', ''):
+                break
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        
+        if method == 'POST' and path == '/ingest':
+            length = int(headers.get('content-length', '0'))
+            if length > MAX_BODY_BYTES:
+                return 413, {"error": "batch too large"}
+            body = await reader.readexactly(length)
+            try:
+                records = decode_batch(body, MAX_DECODED_BYTES) if headers.get('content-encoding') == 'gzip' else [
+                    json.loads(line) for line in body.decode('utf-8').splitlines() if line.strip()
+                ]
+            except BatchTooLarge:
+                return 413, {"error": "batch too large"}
+            accepted = self.ingest(headers.get('x-node-id', 'unknown'), records)
+            return 200, {"accepted": accepted, "duplicates": len(records) - accepted}
+        
+        if method == 'GET' and path == '/summary':
+            return 200, self.summary()
+        
+        if method == 'GET' and path.startswith('/nodes/'):
+            detail = self.node_detail(path[len('/nodes/'):])
+            return (200, detail) if detail is not None else (404, {"error": "unknown node"})
+        
+        return 404, {"error": f"no route for {method} {path}"}
+
+
+async def serve(host: str, port: int, collector: Optional[FleetCollector] = None) -> asyncio.AbstractServer:
+    collector = collector or FleetCollector()
+    return await asyncio.start_server(collector.handle, host, port)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Dynamic Power Plan fleet collector')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on')
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on')
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    
+    async def run():
+        server = await serve(args.host, args.port)
+        logger.info(f"Fleet collector listening on http://{args.host}:{args.port}")
+        async with server:
+            await server.serve_forever()
+    
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
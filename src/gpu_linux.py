@@ -0,0 +1,286 @@
+import logging
+import os
+import platform
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .gpu_samplers import GPUDevice, GPUReading, GPUSampler, GPUVendor
+
+logger = logging.getLogger(__name__)
+
+AMD_VENDOR_ID = "0x1002"
+INTEL_VENDOR_ID = "0x8086"
+INTEL_DRIVERS = ("i915", "xe")
+
+
+class PreadFile:
+    """A file kept open and re-read from offset 0 with a single pread()."""
+    
+    __slots__ = ('path', 'fd')
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.fd = os.open(path, os.O_RDONLY)
+    
+    def read(self, size: int = 4096) -> str:
+        return os.pread(self.fd, size, 0).decode('ascii', errors='replace')
+    
+    def close(self):
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+
+
+def _read_text(path: Path) -> Optional[str]:
+    try:
+        return path.read_text().strip()
+    except OSError:
+        return None
+
+
+def drm_cards(sysfs_root: str, vendor_id: str) -> List[Tuple[str, Path]]:
+    """Return (card name, device dir) for DRM cards of the given PCI vendor."""
+    cards = []
+    drm_dir = Path(sysfs_root) / 'class' / 'drm'
+    if not drm_dir.is_dir():
+        return cards
+    for card in sorted(drm_dir.iterdir()):
+        # Skip connector entries such as card0-DP-1.
+        if not card.name.startswith('card') or not card.name[4:].isdigit():
+            continue
+        device_dir = card / 'device'
+        if _read_text(device_dir / 'vendor') == vendor_id:
+            cards.append((card.name, device_dir))
+    return cards
+
+
+def _device_name(device_dir: Path, fallback: str) -> str:
+    product = _read_text(device_dir / 'product_name')
+    if product:
+        return product
+    uevent = _read_text(device_dir / 'uevent') or ""
+    for line in uevent.splitlines():
+        if line.startswith('PCI_SLOT_NAME='):
+            return f"{fallback} ({line.split('=', 1)[1]})"
+    return fallback
+
+
+def _pci_slot(device_dir: Path) -> str:
+    uevent = _read_text(device_dir / 'uevent') or ""
+    for line in uevent.splitlines():
+        if line.startswith('PCI_SLOT_NAME='):
+            return line.split('=', 1)[1]
+    return os.path.basename(os.path.realpath(device_dir))
+
+
+class AmdSysfsSampler(GPUSampler):
+    """amdgpu utilization from /sys/class/drm/card*/device/gpu_busy_percent."""
+    
+    name = "amdgpu-sysfs"
+    vendor = GPUVendor.AMD
+    
+    def __init__(self, config, sysfs_root: str = '/sys'):
+        super().__init__(config)
+        self.sysfs_root = sysfs_root
+        self._files: Dict[str, Tuple[PreadFile, Optional[PreadFile], Optional[PreadFile]]] = {}
+    
+    @property
+    def cost(self) -> int:
+        return 5
+    
+    def available(self) -> bool:
+        return platform.system() == "Linux" and bool(self._busy_cards())
+    
+    def _busy_cards(self) -> List[Tuple[str, Path]]:
+        return [(name, device_dir) for name, device_dir in drm_cards(self.sysfs_root, AMD_VENDOR_ID)
+                if (device_dir / 'gpu_busy_percent').exists()]
+    
+    def discover(self, known: Dict[str, GPUDevice]) -> List[GPUDevice]:
+        devices = []
+        for card, device_dir in self._busy_cards():
+            key = f"drm:{card}"
+            try:
+                busy = PreadFile(str(device_dir / 'gpu_busy_percent'))
+            except OSError as e:
+                logger.debug(f"Cannot open {device_dir / 'gpu_busy_percent'}: {e}")
+                continue
+            self._files[key] = (
+                busy,
+                self._open_optional(device_dir / 'mem_info_vram_used'),
+                self._open_optional(device_dir / 'mem_info_vram_total')
+            )
+            devices.append(GPUDevice(key, GPUVendor.AMD, _device_name(device_dir, "AMD GPU"),
+                                     _read_text(device_dir / 'unique_id')))
+        return devices
+    
+    @staticmethod
+    def _open_optional(path: Path) -> Optional[PreadFile]:
+        try:
+            return PreadFile(str(path))
+        except OSError:
+            return None
+    
+    def sample(self) -> Dict[str, GPUReading]:
+        readings = {}
+        for key, (busy, used, total) in self._files.items():
+            try:
+                readings[key] = GPUReading(
+                    float(busy.read(16)),
+                    int(used.read(32)) / 1048576 if used else None,
+                    int(total.read(32)) / 1048576 if total else None
+                )
+            except (OSError, ValueError) as e:
+                logger.debug(f"Reading {busy.path} failed: {e}")
+        return readings
+
+
+class IntelFdinfoSampler(GPUSampler):
+    """i915/xe utilization from DRM fdinfo engine counters in /proc/*/fdinfo.
+
+    Every process holding a DRM file descriptor exposes cumulative busy time
+    per engine (drm-engine-<name>: <ns>, or drm-cycles-/drm-total-cycles- on
+    xe). Busy deltas are summed across clients per card and divided by the
+    elapsed time; the busiest engine is the card's utilization. Client fdinfo
+    files stay open and are re-read with pread; /proc is only rescanned for
+    new clients every rescanSeconds. Without root, only the current user's
+    clients are visible.
+    """
+    
+    name = "intel-fdinfo"
+    vendor = GPUVendor.INTEL
+    
+    def __init__(self, config, sysfs_root: str = '/sys', procfs_root: str = '/proc',
+                 rescan_seconds: Optional[float] = None):
+        super().__init__(config)
+        self.sysfs_root = sysfs_root
+        self.procfs_root = procfs_root
+        self.rescan_seconds = (rescan_seconds if rescan_seconds is not None
+                               else config.drm_fdinfo_rescan_seconds)
+        self._cards: Dict[str, str] = {}
+        self._clients: Dict[str, PreadFile] = {}
+        self._previous: Dict[Tuple[str, str, str], Tuple[int, int]] = {}
+        self._previous_time: Optional[float] = None
+        self._last_scan = 0.0
+    
+    @property
+    def cost(self) -> int:
+        return 8
+    
+    def available(self) -> bool:
+        return platform.system() == "Linux" and bool(self._intel_cards())
+    
+    def _intel_cards(self) -> List[Tuple[str, Path]]:
+        cards = []
+        for name, device_dir in drm_cards(self.sysfs_root, INTEL_VENDOR_ID):
+            driver = os.path.basename(os.path.realpath(device_dir / 'driver'))
+            if driver in INTEL_DRIVERS:
+                cards.append((name, device_dir))
+        return cards
+    
+    def discover(self, known: Dict[str, GPUDevice]) -> List[GPUDevice]:
+        devices = []
+        for card, device_dir in self._intel_cards():
+            key = f"drm:{card}"
+            self._cards[_pci_slot(device_dir)] = key
+            devices.append(GPUDevice(key, GPUVendor.INTEL, _device_name(device_dir, "Intel GPU")))
+        self._scan_clients()
+        return devices
+    
+    def _scan_clients(self):
+        self._last_scan = time.monotonic()
+        try:
+            pids = [entry.name for entry in os.scandir(self.procfs_root) if entry.name.isdigit()]
+        except OSError:
+            return
+        
+        for pid in pids:
+            fd_dir = os.path.join(self.procfs_root, pid, 'fd')
+            try:
+                fds = os.listdir(fd_dir)
+            except OSError:
+                continue
+            for fd in fds:
+                fdinfo_path = os.path.join(self.procfs_root, pid, 'fdinfo', fd)
+                if fdinfo_path in self._clients:
+                    continue
+                try:
+                    if not os.readlink(os.path.join(fd_dir, fd)).startswith('/dev/dri/'):
+                        continue
+                    client = PreadFile(fdinfo_path)
+                except OSError:
+                    continue
+                if self._parse(client) is None:
+                    client.close()
+                else:
+                    self._clients[fdinfo_path] = client
+    
+    def _parse(self, client: PreadFile) -> Optional[Tuple[str, str, Dict[str, Tuple[int, int]]]]:
+        """Return (card key, client id, {engine: (busy, total)}) or None if not one of our clients."""
+        try:
+            text = client.read()
+        except OSError:
+            return None
+        
+        pdev = client_id = None
+        engines: Dict[str, List[int]] = {}
+        for line in text.splitlines():
+            field, _, value = line.partition(':')
+            value = value.strip()
+            if field == 'drm-pdev':
+                pdev = value
+            elif field == 'drm-client-id':
+                client_id = value
+            elif field.startswith('drm-engine-') and not field.startswith('drm-engine-capacity-'):
+                engines.setdefault(field[11:], [0, 0])[0] = int(value.split()[0])
+            elif field.startswith('drm-cycles-'):
+                engines.setdefault(field[11:], [0, 0])[0] = int(value.split()[0])
+            elif field.startswith('drm-total-cycles-'):
+                engines.setdefault(field[17:], [0, 0])[1] = int(value.split()[0])
+        
+        if pdev not in self._cards or client_id is None:
+            return None
+        return self._cards[pdev], client_id, {name: (v[0], v[1]) for name, v in engines.items()}
+    
+    def sample(self) -> Dict[str, GPUReading]:
+        now = time.monotonic()
+        if now - self._last_scan >= self.rescan_seconds:
+            self._scan_clients()
+        
+        elapsed_ns = (now - self._previous_time) * 1e9 if self._previous_time is not None else 0.0
+        busy: Dict[Tuple[str, str], float] = {}
+        current: Dict[Tuple[str, str, str], Tuple[int, int]] = {}
+        
+        for path, client in list(self._clients.items()):
+            parsed = self._parse(client)
+            if parsed is None:
+                client.close()
+                del self._clients[path]
+                continue
+            card, client_id, engines = parsed
+            for engine, (value, total) in engines.items():
+                sample_key = (card, client_id, engine)
+                if sample_key in current:
+                    # The same client can be open through several fds.
+                    continue
+                current[sample_key] = (value, total)
+                previous = self._previous.get(sample_key)
+                if previous is None or elapsed_ns <= 0:
+                    continue
+                if total:
+                    span = total - previous[1]
+                    share = (value - previous[0]) / span if span > 0 else 0.0
+                else:
+                    share = (value - previous[0]) / elapsed_ns
+                busy[(card, engine)] = busy.get((card, engine), 0.0) + max(0.0, share)
+        
+        self._previous = current
+        self._previous_time = now
+        
+        readings = {key: GPUReading(0.0) for key in self._cards.values()}
+        for (card, _), share in busy.items():
+            utilization = min(100.0, share * 100.0)
+            if utilization > readings[card].utilization:
+                readings[card] = GPUReading(utilization)
+        return readings
@@ -0,0 +1,496 @@
+import logging
+import os
+import platform
+import subprocess
+from enum import Enum
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+SUBPROCESS_FLAGS = subprocess.CREATE_NO_WINDOW if platform.system() == "Windows" else 0
+
+GPUtil = None
+GPUTIL_AVAILABLE = False
+try:
+    import GPUtil as _GPUtil
+    _GPUtil.getGPUs()
+    GPUtil = _GPUtil
+    GPUTIL_AVAILABLE = True
+except Exception:
+    pass
+
+pyadl = None
+PYADL_AVAILABLE = False
+try:
+    import pyadl as _pyadl
+    _pyadl.ADLManager.getInstance().getDevices()
+    pyadl = _pyadl
+    PYADL_AVAILABLE = True
+except Exception:
+    pass
+
+
+class GPUVendor(Enum):
+    NVIDIA = "nvidia"
+    AMD = "amd"
+    INTEL = "intel"
+    UNKNOWN = "unknown"
+
+
+class GPUReading(NamedTuple):
+    utilization: float
+    memory_used_mb: Optional[float] = None
+    memory_total_mb: Optional[float] = None
+    temperature_c: Optional[float] = None
+    power_w: Optional[float] = None
+
+
+class GPUDevice:
+    """Identity, latest reading and policy for one physical GPU."""
+    
+    def __init__(self, key: str, vendor: GPUVendor, name: str, uuid: Optional[str] = None):
+        self.key = key
+        self.vendor = vendor
+        self.name = name
+        self.uuid = uuid
+        self.backend = ""
+        self.utilization = 0.0
+        self.memory_used_mb: Optional[float] = None
+        self.memory_total_mb: Optional[float] = None
+        self.temperature_c: Optional[float] = None
+        self.power_w: Optional[float] = None
+        self.threshold: Optional[float] = None
+        self.ignored = False
+    
+    def update(self, reading: GPUReading):
+        self.utilization = reading.utilization
+        if reading.memory_used_mb is not None:
+            self.memory_used_mb = reading.memory_used_mb
+        if reading.memory_total_mb is not None:
+            self.memory_total_mb = reading.memory_total_mb
+        self.temperature_c = reading.temperature_c
+        self.power_w = reading.power_w
+    
+    def matches(self, pattern: str) -> bool:
+        pattern = pattern.lower()
+        return (pattern == self.key.lower()
+                or pattern == self.vendor.value
+                or (self.uuid is not None and pattern == self.uuid.lower())
+                or pattern in self.name.lower())
+    
+    def to_dict(self) -> Dict:
+        return {
+            "key": self.key,
+            "vendor": self.vendor.value,
+            "name": self.name,
+            "uuid": self.uuid,
+            "backend": self.backend,
+            "utilization": self.utilization,
+            "memoryUsedMb": self.memory_used_mb,
+            "memoryTotalMb": self.memory_total_mb,
+            "temperatureC": self.temperature_c,
+            "powerW": self.power_w,
+            "threshold": self.threshold,
+            "ignored": self.ignored
+        }
+
+
+class GPUSampler:
+    """Base class for a GPU utilization backend.
+
+    discover() is called once and returns the devices this backend can see;
+    sample() is called every tick and returns a reading per device key. One
+    call covers all of the backend's devices, so subprocess backends spawn
+    once per tick regardless of GPU count.
+    """
+    
+    name = "base"
+    vendor = GPUVendor.UNKNOWN
+    spawns_process = False
+    
+    def __init__(self, config):
+        self.config = config
+    
+    @property
+    def cost(self) -> int:
+        """Relative cost per sample; the registry prefers the lowest."""
+        return 100
+    
+    def available(self) -> bool:
+        return False
+    
+    def discover(self, known: Dict[str, GPUDevice]) -> List[GPUDevice]:
+        return []
+    
+    def sample(self) -> Dict[str, GPUReading]:
+        return {}
+
+
+class NvidiaSmiSampler(GPUSampler):
+    name = "nvidia-smi"
+    vendor = GPUVendor.NVIDIA
+    spawns_process = True
+    
+    @property
+    def cost(self) -> int:
+        return 20 if self.config.prefer_nvidia_smi else 40
+    
+    def available(self) -> bool:
+        return os.path.exists(self.config.nvidia_smi_path)
+    
+    def _query(self, fields: str) -> List[List[str]]:
+        result = subprocess.run(
+            [self.config.nvidia_smi_path, f'--query-gpu={fields}', '--format=csv,noheader,nounits'],
+            capture_output=True, text=True, timeout=5, creationflags=SUBPROCESS_FLAGS
+        )
+        if result.returncode != 0:
+            return []
+        return [[part.strip() for part in line.split(',')]
+                for line in result.stdout.strip().split('\n') if line.strip()]
+    
+    def discover(self, known: Dict[str, GPUDevice]) -> List[GPUDevice]:
+        devices = []
+        try:
+            for index, uuid, name in self._query('index,uuid,name'):
+                devices.append(GPUDevice(f"nvidia:{index}", GPUVendor.NVIDIA, name, uuid))
+        except Exception as e:
+            logger.debug(f"nvidia-smi discovery failed: {e}")
+        return devices
+    
+    def sample(self) -> Dict[str, GPUReading]:
+        readings = {}
+        fields = 'index,utilization.gpu,memory.used,memory.total,temperature.gpu,power.draw'
+        for index, util, used, total, temperature, power in self._query(fields):
+            readings[f"nvidia:{index}"] = GPUReading(float(util), _to_float(used), _to_float(total),
+                                                     _to_float(temperature), _to_float(power))
+        return readings
+
+
+class GPUtilSampler(GPUSampler):
+    name = "gputil"
+    vendor = GPUVendor.NVIDIA
+    spawns_process = True
+    
+    @property
+    def cost(self) -> int:
+        return 30
+    
+    def available(self) -> bool:
+        return GPUTIL_AVAILABLE and GPUtil is not None
+    
+    def discover(self, known: Dict[str, GPUDevice]) -> List[GPUDevice]:
+        devices = []
+        try:
+            for gpu in GPUtil.getGPUs():
+                devices.append(GPUDevice(f"nvidia:{gpu.id}", GPUVendor.NVIDIA, gpu.name, gpu.uuid))
+        except Exception as e:
+            logger.debug(f"GPUtil discovery failed: {e}")
+        return devices
+    
+    def sample(self) -> Dict[str, GPUReading]:
+        return {
+            f"nvidia:{gpu.id}": GPUReading(gpu.load * 100, gpu.memoryUsed, gpu.memoryTotal)
+            for gpu in GPUtil.getGPUs()
+        }
+
+
+class PyadlSampler(GPUSampler):
+    name = "pyadl"
+    vendor = GPUVendor.AMD
+    
+    @property
+    def cost(self) -> int:
+        return 10 if self.config.prefer_amd_pyadl else 60
+    
+    def available(self) -> bool:
+        return PYADL_AVAILABLE and pyadl is not None
+    
+    def discover(self, known: Dict[str, GPUDevice]) -> List[GPUDevice]:
+        devices = []
+        try:
+            for index, device in enumerate(pyadl.ADLManager.getInstance().getDevices()):
+                name = getattr(device, 'adapterName', None) or "AMD GPU"
+                if isinstance(name, bytes):
+                    name = name.decode(errors='replace')
+                devices.append(GPUDevice(f"amd:{index}", GPUVendor.AMD, name))
+        except Exception as e:
+            logger.debug(f"pyadl discovery failed: {e}")
+        return devices
+    
+    def sample(self) -> Dict[str, GPUReading]:
+        readings = {}
+        for index, device in enumerate(pyadl.ADLManager.getInstance().getDevices()):
+            usage = self._device_usage(device)
+            if usage is not None:
+                readings[f"amd:{index}"] = GPUReading(usage)
+        return readings
+    
+    @staticmethod
+    def _device_usage(device) -> Optional[float]:
+        try:
+            usage = device.getCurrentUsage()
+            if usage is not None and usage >= 0:
+                return float(usage)
+        except AttributeError:
+            try:
+                activity = device.getCurrentActivity()
+                if activity is not None and hasattr(activity, 'iActivityPercent'):
+                    return float(activity.iActivityPercent)
+            except Exception:
+                pass
+        except Exception:
+            pass
+        return None
+
+
+class PerfCounterSampler(GPUSampler):
+    """Windows GPU Engine performance counters, one device per adapter LUID.
+
+    Counter instances only carry the adapter LUID, so devices are keyed
+    "luid:<luid>" and DXGI supplies each LUID's name and vendor. Only
+    adapters that no native backend has discovered get a device; counter
+    readings for the others are ignored by the registry.
+    """
+    
+    name = "perfcounter"
+    spawns_process = True
+    
+    _SAMPLE_SCRIPT = """
+$util = @{}
+$samples = (Get-Counter '\\GPU Engine(*engtype_3D)\\Utilization Percentage' -ErrorAction SilentlyContinue).CounterSamples
+foreach ($sample in $samples) {
+    if ($sample.InstanceName -match 'luid_(0x[0-9a-f]+_0x[0-9a-f]+)') {
+        $luid = $Matches[1]
+        if (-not $util.ContainsKey($luid) -or $sample.CookedValue -gt $util[$luid]) { $util[$luid] = $sample.CookedValue }
+    }
+}
+$mem = @{}
+$samples = (Get-Counter '\\GPU Adapter Memory(*)\\Dedicated Usage' -ErrorAction SilentlyContinue).CounterSamples
+foreach ($sample in $samples) {
+    if ($sample.InstanceName -match 'luid_(0x[0-9a-f]+_0x[0-9a-f]+)') { $mem[$Matches[1]] = $sample.CookedValue }
+}
+foreach ($luid in $util.Keys) { Write-Output "$luid $($util[$luid]) $($mem[$luid])" }
+"""
+    
+    @property
+    def cost(self) -> int:
+        return 50
+    
+    def available(self) -> bool:
+        return platform.system() == "Windows"
+    
+    def discover(self, known: Dict[str, GPUDevice]) -> List[GPUDevice]:
+        try:
+            adapters = dxgi_adapters()
+        except Exception as e:
+            logger.debug(f"DXGI adapter enumeration failed: {e}")
+            return []
+        
+        devices = [GPUDevice(f"luid:{luid}", vendor, name) for luid, (name, vendor) in adapters.items()
+                   if not any(_same_adapter(name, device.name) for device in known.values())]
+        if devices:
+            logger.info(f"Using GPU performance counters for: {', '.join(device.name for device in devices)}")
+        return devices
+    
+    def sample(self) -> Dict[str, GPUReading]:
+        result = subprocess.run(
+            ['powershell', '-Command', self._SAMPLE_SCRIPT],
+            capture_output=True, text=True, timeout=10, creationflags=SUBPROCESS_FLAGS
+        )
+        readings = {}
+        for line in result.stdout.splitlines():
+            parts = line.split()
+            if len(parts) < 2:
+                continue
+            memory = _to_float(parts[2]) if len(parts) > 2 else None
+            readings[f"luid:{parts[0].lower()}"] = GPUReading(
+                max(0.0, float(parts[1])),
+                memory / 1048576 if memory is not None else None
+            )
+        return readings
+
+
+SAMPLER_TYPES: List[Type[GPUSampler]] = [PyadlSampler, NvidiaSmiSampler, GPUtilSampler, PerfCounterSampler]
+
+
+def default_sampler_types() -> List[Type[GPUSampler]]:
+    from .gpu_linux import AmdSysfsSampler, IntelFdinfoSampler
+    return [AmdSysfsSampler, IntelFdinfoSampler] + SAMPLER_TYPES
+
+
+class GPURegistry:
+    """Discovers GPUs across backends and picks the cheapest backend per device.
+
+    Backends are asked to discover in cost order; every backend that sees a
+    device becomes a candidate for it. fallback() moves a backend's devices
+    to their next candidate, e.g. when the overhead budget is exceeded.
+    """
+    
+    def __init__(self, config, sampler_types: Optional[List[Type[GPUSampler]]] = None):
+        self.config = config
+        self.devices: Dict[str, GPUDevice] = {}
+        self._candidates: Dict[str, List[GPUSampler]] = {}
+        self._assignment: Dict[str, GPUSampler] = {}
+        
+        samplers = [cls(config) for cls in (sampler_types or default_sampler_types())]
+        for sampler in sorted(samplers, key=lambda s: s.cost):
+            try:
+                if not sampler.available():
+                    continue
+                found = sampler.discover(self.devices)
+            except Exception as e:
+                logger.debug(f"GPU backend {sampler.name} unavailable: {e}")
+                continue
+            for device in found:
+                self.devices.setdefault(device.key, device)
+                self._candidates.setdefault(device.key, []).append(sampler)
+        
+        for key, candidates in self._candidates.items():
+            self._assign(key, candidates[0])
+        self._apply_device_policies()
+        
+        for device in self.devices.values():
+            logger.info(f"GPU {device.key}: {device.name} via {device.backend}"
+                        f"{' (ignored)' if device.ignored else ''}")
+    
+    def _assign(self, key: str, sampler: GPUSampler):
+        self._assignment[key] = sampler
+        self.devices[key].backend = sampler.name
+    
+    def _apply_device_policies(self):
+        for policy in self.config.gpu_device_policies:
+            pattern = str(policy.get("match", ""))
+            if not pattern:
+                continue
+            for device in self.devices.values():
+                if device.matches(pattern):
+                    device.ignored = bool(policy.get("ignore", device.ignored))
+                    if "percent" in policy:
+                        device.threshold = float(policy["percent"])
+    
+    @property
+    def samplers(self) -> List[GPUSampler]:
+        """Every backend that serves at least one device as a candidate."""
+        seen: Dict[str, GPUSampler] = {}
+        for candidates in self._candidates.values():
+            for sampler in candidates:
+                seen.setdefault(sampler.name, sampler)
+        return list(seen.values())
+    
+    def active_samplers(self) -> List[GPUSampler]:
+        seen: Dict[str, GPUSampler] = {}
+        for sampler in self._assignment.values():
+            seen.setdefault(sampler.name, sampler)
+        return list(seen.values())
+    
+    def sample(self, run: Callable[[str, Callable[[], Dict[str, GPUReading]]], Dict[str, GPUReading]]):
+        """Sample every active backend once via run(meter_name, fn) and update the devices."""
+        for sampler in self.active_samplers():
+            # run() counts and logs a failing backend and returns its last readings (None before any).
+            readings = run(f"gpu.{sampler.name}", sampler.sample) or {}
+            for key, reading in readings.items():
+                if self._assignment.get(key) is sampler:
+                    self.devices[key].update(reading)
+    
+    def fallback(self, sampler: GPUSampler) -> bool:
+        moved = False
+        for key, assigned in list(self._assignment.items()):
+            if assigned is not sampler:
+                continue
+            candidates = self._candidates[key]
+            position = candidates.index(sampler)
+            if position + 1 < len(candidates):
+                self._assign(key, candidates[position + 1])
+                logger.info(f"GPU {key} moved from {sampler.name} to {candidates[position + 1].name}")
+                moved = True
+        return moved
+    
+    def threshold_for(self, device: GPUDevice) -> float:
+        return device.threshold if device.threshold is not None else self.config.gpu_threshold
+    
+    def tracked_devices(self) -> List[GPUDevice]:
+        return [device for device in self.devices.values() if not device.ignored]
+
+
+def _to_float(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value not in (None, '') else None
+    except ValueError:
+        return None
+
+
+def _same_adapter(wmi_name: str, device_name: str) -> bool:
+    a = wmi_name.lower()
+    b = device_name.lower()
+    return a in b or b in a
+
+
+def _vendor_from_name(name: str) -> GPUVendor:
+    lowered = name.lower()
+    if 'nvidia' in lowered:
+        return GPUVendor.NVIDIA
+    if 'amd' in lowered or 'radeon' in lowered:
+        return GPUVendor.AMD
+    if 'intel' in lowered:
+        return GPUVendor.INTEL
+    return GPUVendor.UNKNOWN
+
+
+PCI_VENDORS = {0x10DE: GPUVendor.NVIDIA, 0x1002: GPUVendor.AMD, 0x1022: GPUVendor.AMD, 0x8086: GPUVendor.INTEL}
+DXGI_ADAPTER_FLAG_SOFTWARE = 0x2
+
+
+def dxgi_adapters() -> Dict[str, Tuple[str, GPUVendor]]:
+    """Hardware adapters from DXGI as {luid: (name, vendor)}, luid in the counters' "0xhigh_0xlow" form."""
+    import ctypes
+    from ctypes import wintypes
+    
+    class LUID(ctypes.Structure):
+        _fields_ = [('LowPart', wintypes.DWORD), ('HighPart', wintypes.LONG)]
+    
+    class AdapterDesc1(ctypes.Structure):
+        _fields_ = [('Description', wintypes.WCHAR * 128), ('VendorId', wintypes.UINT),
+                    ('DeviceId', wintypes.UINT), ('SubSysId', wintypes.UINT), ('Revision', wintypes.UINT),
+                    ('DedicatedVideoMemory', ctypes.c_size_t), ('DedicatedSystemMemory', ctypes.c_size_t),
+                    ('SharedSystemMemory', ctypes.c_size_t), ('AdapterLuid', LUID), ('Flags', wintypes.UINT)]
+    
+    class GUID(ctypes.Structure):
+        _fields_ = [('Data1', wintypes.DWORD), ('Data2', wintypes.WORD), ('Data3', wintypes.WORD),
+                    ('Data4', ctypes.c_ubyte * 8)]
+    
+    def method(obj: ctypes.c_void_p, index: int, *argtypes):
+        vtable = ctypes.cast(obj, ctypes.POINTER(ctypes.POINTER(ctypes.c_void_p)))[0]
+        return ctypes.WINFUNCTYPE(ctypes.c_long, ctypes.c_void_p, *argtypes)(vtable[index])
+    
+    # IID_IDXGIFactory1 {770aae78-f26f-4dba-a829-253c83d1b387}
+    iid = GUID(0x770AAE78, 0xF26F, 0x4DBA, (ctypes.c_ubyte * 8)(0xA8, 0x29, 0x25, 0x3C, 0x83, 0xD1, 0xB3, 0x87))
+    factory = ctypes.c_void_p()
+    hr = ctypes.windll.dxgi.CreateDXGIFactory1(ctypes.byref(iid), ctypes.byref(factory))
+    if hr < 0:
+        raise OSError(f"CreateDXGIFactory1 failed: 0x{hr & 0xFFFFFFFF:08X}")
+    
+    adapters: Dict[str, Tuple[str, GPUVendor]] = {}
+    try:
+        enum_adapters1 = method(factory, 12, wintypes.UINT, ctypes.POINTER(ctypes.c_void_p))
+        index = 0
+        while True:
+            adapter = ctypes.c_void_p()
+            hr = enum_adapters1(factory, index, ctypes.byref(adapter))
+            if hr < 0:
+                # DXGI_ERROR_NOT_FOUND once past the last adapter.
+                break
+            index += 1
+            try:
+                desc = AdapterDesc1()
+                if method(adapter, 10, ctypes.POINTER(AdapterDesc1))(adapter, ctypes.byref(desc)) < 0:
+                    continue
+                if desc.Flags & DXGI_ADAPTER_FLAG_SOFTWARE:
+                    continue
+                luid = f"0x{desc.AdapterLuid.HighPart & 0xFFFFFFFF:08x}_0x{desc.AdapterLuid.LowPart:08x}"
+                name = desc.Description
+                adapters[luid] = (name, PCI_VENDORS.get(desc.VendorId, _vendor_from_name(name)))
+            finally:
+                method(adapter, 2)(adapter)
+    finally:
+        method(factory, 2)(factory)
+    return adapters
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Local time-series history for Dynamic Power Plan.
+
+Raw per-tick samples are rolled up into 1-minute and 1-hour aggregates,
+each tier with its own retention, in a SQLite database next to the config.
+
+Usage:
+    python -m src.history summary [--since 30d]
+    python -m src.history query [--tier raw|1m|1h] [--since 24h] [--until 0s] [--limit N]
+"""
+
+import argparse
+import logging
+import math
+import sqlite3
+import sys
+import time
+from collections import deque
+from pathlib import Path
+from threading import Event, Lock, Thread
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+TIERS = {"1m": 60, "1h": 3600}
+METRICS = ("cpu", "gpu")
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+RETENTION_CHECK_SECONDS = 600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS raw (
+    ts REAL PRIMARY KEY,
+    cpu REAL,
+    gpu REAL,
+    boosted INTEGER,
+    interval REAL
+);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value REAL);
+"""
+
+ROLLUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollup_{tier} (
+    ts INTEGER PRIMARY KEY,
+    samples INTEGER,
+    cpu_min REAL, cpu_max REAL, cpu_mean REAL, cpu_p95 REAL,
+    gpu_min REAL, gpu_max REAL, gpu_mean REAL, gpu_p95 REAL,
+    boost_seconds REAL,
+    covered_seconds REAL
+);
+"""
+
+ROLLUP_COLUMNS = ("ts", "samples",
+                  "cpu_min", "cpu_max", "cpu_mean", "cpu_p95",
+                  "gpu_min", "gpu_max", "gpu_mean", "gpu_p95",
+                  "boost_seconds", "covered_seconds")
+
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def aggregate(bucket: int, rows: List[Tuple[float, float, float, int, float]]) -> Tuple:
+    """Aggregate raw (ts, cpu, gpu, boosted, interval) rows into one rollup row."""
+    values = []
+    for column in (1, 2):
+        series = sorted(row[column] for row in rows)
+        values.extend((series[0], series[-1], sum(series) / len(series), percentile(series, 0.95)))
+    boost_seconds = sum(row[4] for row in rows if row[3])
+    covered = sum(row[4] for row in rows)
+    return (bucket, len(rows), *values, boost_seconds, covered)
+
+
+def open_database(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(str(path), check_same_thread=False)
+    # auto_vacuum only takes effect on a new database; existing ones keep their mode.
+    connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    connection.execute("PRAGMA journal_mode = WAL")
+    connection.execute("PRAGMA synchronous = NORMAL")
+    connection.executescript(SCHEMA)
+    for tier in TIERS:
+        connection.executescript(ROLLUP_SCHEMA.format(tier=tier))
+    return connection
+
+
+class HistoryStore:
+    """Buffers samples in memory and writes them from a background thread.
+
+    record() only appends to a bounded deque, so the monitor never waits on
+    disk; if the writer falls behind, the oldest unwritten samples are
+    dropped and counted. Every flushSeconds the writer inserts the batch in
+    one transaction, rolls up completed minutes and hours, and applies the
+    per-tier retention.
+    """
+    
+    def __init__(self, config, path: Optional[Path] = None):
+        self.config = config
+        self.path = Path(path) if path else config.history_path
+        self._queue: Deque[Tuple[float, float, float, int, float]] = deque(maxlen=config.history_max_queue)
+        self._queue_lock = Lock()
+        self._last_ts: Optional[float] = None
+        self._stop_event = Event()
+        self._thread: Optional[Thread] = None
+        self._connection: Optional[sqlite3.Connection] = None
+        # Without adaptive sampling every tick is intervalMs apart, which may exceed maxIntervalMs.
+        self._max_gap = 2 * max(config.sampling_interval_ms, config.sampling_max_interval_ms) / 1000.0
+        self._last_retention = 0.0
+        self.dropped = 0
+        self.written = 0
+    
+    def record(self, ts: float, cpu: float, gpu: float, boosted: bool):
+        # A sample covers the time since the previous one, capped so a suspend is not counted.
+        interval = 0.0 if self._last_ts is None else min(ts - self._last_ts, self._max_gap)
+        self._last_ts = ts
+        with self._queue_lock:
+            if len(self._queue) == self._queue.maxlen:
+                self.dropped += 1
+            self._queue.append((ts, cpu, gpu, 1 if boosted else 0, max(0.0, interval)))
+    
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = Thread(target=self._run, name='HistoryWriter', daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=10)
+            self._thread = None
+    
+    def _run(self):
+        try:
+            self._connection = open_database(self.path)
+        except sqlite3.Error as e:
+            logger.error(f"Cannot open history database {self.path}: {e}")
+            return
+        
+        try:
+            while not self._stop_event.wait(self.config.history_flush_seconds):
+                self.flush()
+            self.flush()
+        finally:
+            self._connection.close()
+            self._connection = None
+    
+    def flush(self):
+        with self._queue_lock:
+            batch = list(self._queue)
+            self._queue.clear()
+        
+        try:
+            with self._connection:
+                if batch:
+                    self._connection.executemany(
+                        "INSERT OR REPLACE INTO raw (ts, cpu, gpu, boosted, interval) VALUES (?, ?, ?, ?, ?)", batch
+                    )
+                    self.written += len(batch)
+                self._roll_up()
+            if time.monotonic() - self._last_retention >= RETENTION_CHECK_SECONDS:
+                self._last_retention = time.monotonic()
+                self._apply_retention(time.time())
+        except sqlite3.Error as e:
+            logger.warning(f"History write failed: {e}")
+    
+    def _roll_up(self):
+        # Only buckets older than the newest stored sample are complete; samples still
+        # queued are always newer than that one.
+        latest = self._connection.execute("SELECT MAX(ts) FROM raw").fetchone()[0]
+        if latest is None:
+            return
+        for tier, seconds in TIERS.items():
+            key = f"rolled_{tier}"
+            row = self._connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+            start = row[0] if row else None
+            if start is None:
+                first = self._connection.execute("SELECT MIN(ts) FROM raw").fetchone()[0]
+                if first is None:
+                    continue
+                start = math.floor(first / seconds) * seconds
+            end = math.floor(latest / seconds) * seconds
+            if end <= start:
+                continue
+            
+            buckets: Dict[int, List] = {}
+            for sample in self._connection.execute(
+                    "SELECT ts, cpu, gpu, boosted, interval FROM raw WHERE ts >= ? AND ts < ? ORDER BY ts",
+                    (start, end)):
+                buckets.setdefault(int(sample[0] // seconds * seconds), []).append(sample)
+            self._connection.executemany(
+                f"INSERT OR REPLACE INTO rollup_{tier} ({', '.join(ROLLUP_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(ROLLUP_COLUMNS))})",
+                [aggregate(bucket, rows) for bucket, rows in buckets.items()]
+            )
+            self._connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, end))
+    
+    def _apply_retention(self, now: float):
+        limits = {
+            "raw": now - self.config.history_raw_retention_hours * 3600,
+            "rollup_1m": now - self.config.history_minute_retention_days * 86400,
+            "rollup_1h": now - self.config.history_hour_retention_days * 86400
+        }
+        deleted = 0
+        with self._connection:
+            for table, cutoff in limits.items():
+                deleted += self._connection.execute(f"DELETE FROM {table} WHERE ts < ?", (cutoff,)).rowcount
+        if deleted:
+            self._connection.execute("PRAGMA incremental_vacuum")
+            logger.debug(f"History retention removed {deleted} rows")
+    
+    def snapshot(self) -> Dict[str, Any]:
+        return {"written": self.written, "dropped": self.dropped, "queued": len(self._queue)}
+
+
+def parse_duration(text: str) -> float:
+    unit = text[-1]
+    if unit not in DURATION_UNITS:
+        raise argparse.ArgumentTypeError(f"Duration needs a unit (s, m, h, d): {text}")
+    try:
+        return float(text[:-1]) * DURATION_UNITS[unit]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid duration: {text}")
+
+
+def query(connection: sqlite3.Connection, tier: str, since: float, until: float,
+          limit: Optional[int] = None) -> Tuple[List[str], List[Tuple]]:
+    if tier == "raw":
+        columns = ["ts", "cpu", "gpu", "boosted", "interval"]
+        table = "raw"
+    else:
+        columns = list(ROLLUP_COLUMNS)
+        table = f"rollup_{tier}"
+    sql = f"SELECT {', '.join(columns)} FROM {table} WHERE ts >= ? AND ts < ? ORDER BY ts"
+    params: List[Any] = [since, until]
+    if limit:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return columns, connection.execute(sql, params).fetchall()
+
+
+def summarize(connection: sqlite3.Connection, since: float, until: float) -> Dict[str, float]:
+    """Totals over a range, from minute rollups unless retention already pruned part of it."""
+    oldest_minute = connection.execute("SELECT MIN(ts) FROM rollup_1m").fetchone()[0]
+    oldest_hour = connection.execute("SELECT MIN(ts) FROM rollup_1h").fetchone()[0]
+    tier = "1m"
+    if oldest_minute is None or (oldest_hour is not None and oldest_minute > max(since, oldest_hour + TIERS["1h"])):
+        tier = "1h"
+    row = connection.execute(
+        f"SELECT SUM(boost_seconds), SUM(covered_seconds), SUM(cpu_mean * covered_seconds), "
+        f"SUM(gpu_mean * covered_seconds), MAX(cpu_p95), MAX(gpu_p95) "
+        f"FROM rollup_{tier} WHERE ts >= ? AND ts < ?", (since, until)
+    ).fetchone()
+    boost, covered, cpu_weighted, gpu_weighted, cpu_p95, gpu_p95 = (value or 0.0 for value in row)
+    return {
+        "tier": tier,
+        "coveredHours": covered / 3600,
+        "boostHours": boost / 3600,
+        "boostFraction": boost / covered if covered else 0.0,
+        "cpuMean": cpu_weighted / covered if covered else 0.0,
+        "gpuMean": gpu_weighted / covered if covered else 0.0,
+        "cpuP95Max": cpu_p95,
+        "gpuP95Max": gpu_p95
+    }
+
+
+def _format_value(column: str, value: Any) -> str:
+    if column == "ts":
+        return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(value))
+    if isinstance(value, float):
+        return f"{value:.1f}"
+    return str(value)
+
+
+def main(argv: Optional[List[str]] = None):
+    from .config import Config
+    
+    parser = argparse.ArgumentParser(description='Query Dynamic Power Plan usage history')
+    parser.add_argument('--config', help='Path to config.json (locates the database)')
+    parser.add_argument('--db', help='Path to the history database (overrides the config)')
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    summary_parser = commands.add_parser('summary', help='Boost time and mean load over a range')
+    summary_parser.add_argument('--since', type=parse_duration, default=parse_duration('30d'))
+    summary_parser.add_argument('--until', type=parse_duration, default=0.0, help='End, as time before now')
+    
+    query_parser = commands.add_parser('query', help='Print samples or rollups for a range')
+    query_parser.add_argument('--tier', choices=['raw', *TIERS], default='1h')
+    query_parser.add_argument('--since', type=parse_duration, default=parse_duration('24h'))
+    query_parser.add_argument('--until', type=parse_duration, default=0.0, help='End, as time before now')
+    query_parser.add_argument('--limit', type=int)
+    
+    args = parser.parse_args(argv)
+    path = Path(args.db) if args.db else Config(args.config, read_only=True).history_path
+    if not path.exists():
+        print(f"No history database at {path}", file=sys.stderr)
+        sys.exit(1)
+    
+    connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    now = time.time()
+    since = now - args.since
+    until = now - args.until
+    
+    if args.command == 'summary':
+        result = summarize(connection, since, until)
+        print(f"Range:         last {args.since / 86400:.1f} days ({result['tier']} rollups)")
+        print(f"Covered:       {result['coveredHours']:.1f} h")
+        print(f"Boosted:       {result['boostHours']:.1f} h ({result['boostFraction'] * 100:.1f}%)")
+        print(f"Mean CPU/GPU:  {result['cpuMean']:.1f}% / {result['gpuMean']:.1f}%")
+        print(f"Peak p95:      CPU {result['cpuP95Max']:.1f}% / GPU {result['gpuP95Max']:.1f}%")
+    else:
+        columns, rows = query(connection, args.tier, since, until, args.limit)
+        print("\t".join(columns))
+        for row in rows:
+            print("\t".join(_format_value(column, value) for column, value in zip(columns, row)))
+    connection.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+import fnmatch
+import logging
+import time
+from array import array
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+IO_TYPES = ("disk", "network")
+DIRECTIONS = ("read", "write", "total")
+BYTES_PER_MB = 1024 * 1024
+
+
+class IoTrigger:
+    """Fires when any matched device moves at least `mbps` MB/s in `direction`.
+
+    Devices are judged one at a time rather than summed, so a disk and its
+    partitions (both listed by psutil on Linux) are never double counted.
+    For network interfaces "read" is received and "write" is sent.
+    """
+    
+    __slots__ = ('io_type', 'direction', 'mbps', 'include', 'exclude', 'slots')
+    
+    def __init__(self, io_type: str, direction: str, mbps: float,
+                 include: Sequence[str], exclude: Sequence[str]):
+        self.io_type = io_type
+        self.direction = direction
+        self.mbps = mbps
+        self.include = tuple(include)
+        self.exclude = tuple(exclude)
+        self.slots: Tuple[int, ...] = ()
+    
+    def matches(self, device: str) -> bool:
+        return (any(fnmatch.fnmatch(device, pattern) for pattern in self.include)
+                and not any(fnmatch.fnmatch(device, pattern) for pattern in self.exclude))
+    
+    def metric(self, read: array, write: array) -> Tuple[float, int]:
+        """Return the highest rate in MB/s among matched devices and its slot."""
+        best = 0.0
+        best_slot = -1
+        direction = self.direction
+        for slot in self.slots:
+            if direction == "read":
+                rate = read[slot]
+            elif direction == "write":
+                rate = write[slot]
+            else:
+                rate = read[slot] + write[slot]
+            if rate > best:
+                best = rate
+                best_slot = slot
+        return best, best_slot
+
+
+class IoCounters:
+    """Per-device byte rates for one counter source, kept in slot-indexed arrays.
+
+    Device names are mapped to slots once; each tick only overwrites the
+    arrays in place. New devices (hot-plugged disks, VPN interfaces) get a
+    slot when first seen and the triggers are re-matched.
+    """
+    
+    def __init__(self, io_type: str, read_counters: Callable[[], Dict], read_field: str, write_field: str):
+        self.io_type = io_type
+        self._read_counters = read_counters
+        self._read_field = read_field
+        self._write_field = write_field
+        self.names: List[str] = []
+        self._slots: Dict[str, int] = {}
+        self._last_read = array('d')
+        self._last_write = array('d')
+        self.read_rate = array('d')
+        self.write_rate = array('d')
+        self._seen = array('b')
+        self._last_time: Optional[float] = None
+    
+    def update(self, now: float) -> bool:
+        """Refresh rates; returns True when a new device appeared."""
+        try:
+            counters = self._read_counters() or {}
+        except Exception as e:
+            logger.debug(f"Reading {self.io_type} counters failed: {e}")
+            return False
+        
+        elapsed = now - self._last_time if self._last_time is not None else 0.0
+        self._last_time = now
+        added = False
+        seen = self._seen
+        for i in range(len(seen)):
+            seen[i] = 0
+        
+        for name, counter in counters.items():
+            slot = self._slots.get(name)
+            if slot is None:
+                slot = self._add(name)
+                added = True
+            read = float(getattr(counter, self._read_field))
+            write = float(getattr(counter, self._write_field))
+            if elapsed > 0 and read >= self._last_read[slot] and write >= self._last_write[slot]:
+                self.read_rate[slot] = (read - self._last_read[slot]) / elapsed / BYTES_PER_MB
+                self.write_rate[slot] = (write - self._last_write[slot]) / elapsed / BYTES_PER_MB
+            else:
+                # First sample, or the counters were reset (device re-added).
+                self.read_rate[slot] = 0.0
+                self.write_rate[slot] = 0.0
+            self._last_read[slot] = read
+            self._last_write[slot] = write
+            seen[slot] = 1
+        
+        for i in range(len(seen)):
+            if not seen[i]:
+                self.read_rate[i] = 0.0
+                self.write_rate[i] = 0.0
+        return added
+    
+    def _add(self, name: str) -> int:
+        slot = len(self.names)
+        self.names.append(name)
+        self._slots[name] = slot
+        # The previous counters start at infinity so the first delta reads as a reset.
+        self._last_read.append(float('inf'))
+        self._last_write.append(float('inf'))
+        self.read_rate.append(0.0)
+        self.write_rate.append(0.0)
+        self._seen.append(0)
+        return slot
+
+
+class IoLoad:
+    """Disk and network throughput triggers from psutil per-device counters."""
+    
+    def __init__(self, config, disk_counters: Optional[Callable[[], Dict]] = None,
+                 net_counters: Optional[Callable[[], Dict]] = None):
+        self.config = config
+        self.sources = {
+            "disk": IoCounters("disk", disk_counters or (lambda: psutil.disk_io_counters(perdisk=True)),
+                               'read_bytes', 'write_bytes'),
+            "network": IoCounters("network", net_counters or (lambda: psutil.net_io_counters(pernic=True)),
+                                  'bytes_recv', 'bytes_sent')
+        }
+        self.triggers = self._build_triggers(config.io_triggers)
+        self._active_types = {trigger.io_type for trigger in self.triggers}
+        self.update()
+    
+    @staticmethod
+    def _build_triggers(specs: List[Dict]) -> List[IoTrigger]:
+        triggers = []
+        for spec in specs:
+            io_type = spec.get("type")
+            direction = spec.get("direction", "total")
+            if io_type not in IO_TYPES:
+                logger.warning(f"Unknown I/O trigger type '{io_type}'; expected one of {IO_TYPES}")
+                continue
+            if direction not in DIRECTIONS:
+                logger.warning(f"Unknown I/O trigger direction '{direction}'; expected one of {DIRECTIONS}")
+                continue
+            mbps = float(spec.get("mbps", 100))
+            if mbps <= 0:
+                logger.warning(f"I/O trigger threshold must be above 0 MB/s, got {mbps}")
+                continue
+            include = spec.get("include") or ["*"]
+            exclude = spec.get("exclude") or []
+            triggers.append(IoTrigger(io_type, direction, mbps,
+                                      [include] if isinstance(include, str) else include,
+                                      [exclude] if isinstance(exclude, str) else exclude))
+        return triggers
+    
+    def update(self, now: Optional[float] = None):
+        now = time.monotonic() if now is None else now
+        for io_type in self._active_types:
+            source = self.sources[io_type]
+            if source.update(now):
+                self._match(source)
+    
+    def _match(self, source: IoCounters):
+        for trigger in self.triggers:
+            if trigger.io_type == source.io_type:
+                trigger.slots = tuple(slot for slot, name in enumerate(source.names) if trigger.matches(name))
+    
+    def evaluate(self) -> Tuple[Optional[str], float]:
+        """Return (reason or None, smallest headroom in percent of a trigger's threshold)."""
+        headroom = 100.0
+        for trigger in self.triggers:
+            source = self.sources[trigger.io_type]
+            rate, slot = trigger.metric(source.read_rate, source.write_rate)
+            if rate >= trigger.mbps:
+                label = "Disk" if trigger.io_type == "disk" else "Network"
+                return f"{label} I/O {source.names[slot]} {trigger.direction} at {rate:.1f} MB/s", 0.0
+            headroom = min(headroom, 100.0 * (1.0 - rate / trigger.mbps))
+        return None, headroom
+    
+    def rates(self) -> Dict[str, Dict[str, Tuple[float, float]]]:
+        """Current (read, write) MB/s per device, for status output."""
+        return {
+            io_type: {name: (source.read_rate[slot], source.write_rate[slot])
+                      for slot, name in enumerate(source.names)}
+            for io_type, source in self.sources.items() if io_type in self._active_types
+        }
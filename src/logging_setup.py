@@ -0,0 +1,210 @@
+import logging
+import logging.handlers
+import queue
+import time
+from pathlib import Path
+from threading import Thread, Lock
+from typing import Optional
+
+# All application modules log under the package logger ("src.monitor",
+# "src.power_manager", ...), so one queue handler here covers every thread.
+PACKAGE_LOGGER = __name__.rpartition('.')[0] or __name__
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(threadName)s - %(message)s'
+
+_lock = Lock()
+_queue_handler: Optional[logging.handlers.QueueHandler] = None
+_listener: Optional['BatchingQueueListener'] = None
+
+
+class SizeAndTimeRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """Rotates on size or age, and only flushes when the listener asks it to.
+
+    The age is counted from when the current file was started, which is kept
+    in a "<log>.opened" sidecar: appending updates st_mtime, and Windows
+    carries a rotated file's creation time over to its replacement.
+    """
+    
+    def __init__(self, filename, max_bytes: int, backup_count: int, rotate_seconds: float):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count,
+                         encoding='utf-8', delay=True)
+        self.rotate_seconds = rotate_seconds
+        self._stamp_path = Path(self.baseFilename + '.opened')
+        self._opened_at = self._initial_open_time(Path(self.baseFilename))
+    
+    def _initial_open_time(self, path: Path) -> float:
+        try:
+            if not path.exists() or path.stat().st_size == 0:
+                return time.time()
+        except OSError:
+            return time.time()
+        try:
+            return float(self._stamp_path.read_text().strip())
+        except (OSError, ValueError):
+            pass
+        # A log written before the sidecar existed: use its creation time where the platform has one.
+        try:
+            opened = getattr(path.stat(), 'st_birthtime', None)
+        except OSError:
+            opened = None
+        opened = opened if opened is not None else time.time()
+        self._write_stamp(opened)
+        return opened
+    
+    def _write_stamp(self, opened: float):
+        try:
+            self._stamp_path.write_text(f"{opened:.3f}\n")
+        except OSError:
+            pass
+    
+    def _open(self):
+        stream = super()._open()
+        if stream.tell() == 0:
+            self._opened_at = time.time()
+            self._write_stamp(self._opened_at)
+        return stream
+    
+    def shouldRollover(self, record) -> bool:
+        if self.rotate_seconds > 0 and time.time() - self._opened_at >= self.rotate_seconds:
+            return True
+        return bool(super().shouldRollover(record))
+    
+    def doRollover(self):
+        super().doRollover()
+        self._opened_at = time.time()
+    
+    def emit(self, record):
+        # Same as StreamHandler.emit minus the per-record flush; the listener
+        # flushes once per batch instead.
+        try:
+            if self.shouldRollover(record):
+                self.doRollover()
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+
+
+class BatchingQueueListener:
+    """Drains the log queue on a background thread, writing records in batches."""
+    
+    _SENTINEL = None
+    
+    def __init__(self, log_queue: queue.Queue, handler: logging.Handler,
+                 batch_size: int = 256, flush_interval: float = 1.0):
+        self.queue = log_queue
+        self.handler = handler
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(0.0, flush_interval)
+        self._thread: Optional[Thread] = None
+    
+    def start(self):
+        self._thread = Thread(target=self._run, name='LogWriter', daemon=True)
+        self._thread.start()
+    
+    def stop(self, timeout: float = 2.0):
+        if self._thread is None:
+            return
+        self.queue.put_nowait(self._SENTINEL)
+        self._thread.join(timeout=timeout)
+        self._thread = None
+    
+    def _run(self):
+        while True:
+            record = self.queue.get()
+            if record is self._SENTINEL:
+                break
+            
+            stop = False
+            batch = 1
+            deadline = time.monotonic() + self.flush_interval
+            self._handle(record)
+            
+            while batch < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    record = self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if record is self._SENTINEL:
+                    stop = True
+                    break
+                self._handle(record)
+                batch += 1
+            
+            self._flush()
+            if stop:
+                break
+        
+        self._flush()
+    
+    def _handle(self, record):
+        if record.levelno >= self.handler.level:
+            self.handler.handle(record)
+    
+    def _flush(self):
+        try:
+            self.handler.flush()
+        except Exception:
+            pass
+
+
+def setup_logging(config) -> logging.Logger:
+    """Configure the shared queue-based logging pipeline once per process.
+
+    Later calls only change the level, and only towards more verbose: the
+    most verbose level any caller asked for applies to the logger and the
+    log file alike.
+    """
+    global _queue_handler, _listener
+    
+    level = logging.DEBUG if config.verbosity == 'debug' else logging.INFO
+    package_logger = logging.getLogger(PACKAGE_LOGGER)
+    
+    with _lock:
+        if _queue_handler is not None:
+            level = min(package_logger.level, level)
+            package_logger.setLevel(level)
+            _listener.handler.setLevel(level)
+            return package_logger
+        
+        log_dir = Path(config.log_dir)
+        log_dir.mkdir(parents=True, exist_ok=True)
+        
+        file_handler = SizeAndTimeRotatingFileHandler(
+            log_dir / 'power_manager.log',
+            max_bytes=config.log_max_bytes,
+            backup_count=config.log_backup_count,
+            rotate_seconds=config.log_rotate_hours * 3600.0
+        )
+        file_handler.setLevel(level)
+        file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        
+        log_queue: queue.Queue = queue.Queue(-1)
+        _listener = BatchingQueueListener(
+            log_queue, file_handler,
+            batch_size=config.log_batch_size,
+            flush_interval=config.log_flush_interval_ms / 1000.0
+        )
+        _listener.start()
+        
+        _queue_handler = logging.handlers.QueueHandler(log_queue)
+        package_logger.addHandler(_queue_handler)
+        package_logger.setLevel(level)
+    
+    return package_logger
+
+
+def shutdown_logging():
+    """Flush pending records and stop the writer thread."""
+    global _queue_handler, _listener
+    
+    with _lock:
+        if _queue_handler is not None:
+            logging.getLogger(PACKAGE_LOGGER).removeHandler(_queue_handler)
+            _queue_handler = None
+        if _listener is not None:
+            _listener.stop()
+            _listener.handler.close()
+            _listener = None
@@ -1,132 +1,138 @@
 import psutil
-import subprocess
-import os
+import logging
 import time
-import platform
-from typing import Optional, Tuple, List, Callable
-from threading import Thread, Event
-from enum import Enum
+from typing import Optional, Tuple, List, Callable, Set, Dict
+from threading import Thread, Event, Lock
 
-SUBPROCESS_FLAGS = subprocess.CREATE_NO_WINDOW if platform.system() == "Windows" else 0
+from .attribution import ProcessAttributor, format_attribution
+from .cpu_cores import CoreLoad
+from .energy import EnergyMeter
+from .flap import FlapDetector
+from .gpu_samplers import GPURegistry, GPUVendor
+from .history import HistoryStore
+from .io_load import IoLoad
+from .logging_setup import setup_logging
+from .overhead import OverheadMonitor
+from .predictor import LaunchPredictor
+from .process_events import ProcessEventSource, create_event_source
+from .process_policy import ProcessPolicy
+from .profiling import TickProfiler
+from .sampling import AdaptiveInterval, SamplingStats, format_sampling_stats
+from .status_page import StatusPage
+from .thermal import ThermalGate
+from .triggers import TriggerContext, compile_triggers
 
-GPUtil = None
-GPUTIL_AVAILABLE = False
-try:
-    import GPUtil as _GPUtil
-    _GPUtil.getGPUs()
-    GPUtil = _GPUtil
-    GPUTIL_AVAILABLE = True
-except Exception:
-    pass
-
-pyadl = None
-PYADL_AVAILABLE = False
-try:
-    import pyadl as _pyadl
-    _pyadl.ADLManager.getInstance().getDevices()
-    pyadl = _pyadl
-    PYADL_AVAILABLE = True
-except Exception:
-    pass
-
-
-class GPUVendor(Enum):
-    NVIDIA = "nvidia"
-    AMD = "amd"
-    INTEL = "intel"
-    UNKNOWN = "unknown"
+logger = logging.getLogger(__name__)
 
 
 class SystemMonitor:
-    def __init__(self, config):
+    def __init__(self, config, process_scanner: Optional[Callable[[], Dict[int, str]]] = None):
         self.config = config
+        # Returns {pid: lowercase name}; the latency rig passes a fake process table.
+        self._process_scanner = process_scanner or self._scan_processes
+        setup_logging(config)
         self._stop_event = Event()
+        self._wake_event = Event()
+        self._process_events: Optional[ProcessEventSource] = None
+        self._fast_path_game: Optional[str] = None
+        self._fast_path_at = 0.0
+        self._scan_started_at = 0.0
         self._monitor_thread: Optional[Thread] = None
+        self._profiler: Optional[TickProfiler] = None
         
         self._current_cpu = 0.0
         self._current_gpu = 0.0
+        self._core_load = CoreLoad(config) if config.cpu_core_triggers_enabled else None
+        self._core_reason: Optional[str] = None
+        self._core_headroom: Optional[float] = None
+        self._io_load = IoLoad(config) if config.io_triggers_enabled else None
+        self._io_reason: Optional[str] = None
+        self._io_headroom: Optional[float] = None
         self._is_boosted = False
         self._manual_override = False
         
         self._promote_start_time: Optional[float] = None
         self._demote_start_time: Optional[float] = None
         
-        self._on_state_change: Optional[Callable[[bool], None]] = None
-        self._on_verify: Optional[Callable[[bool], None]] = None
+        self._interval = AdaptiveInterval(config)
+        self._sampling_stats = SamplingStats(config.sampling_interval_ms)
+        self._last_overhead_report = time.monotonic()
         
-        self._detected_gpus: List[Tuple[GPUVendor, str]] = []
-        self._detect_gpus()
-    
-    def _detect_gpus(self):
-        self._detected_gpus = []
+        self._running_processes: Set[str] = set()
+        self._process_table: Dict[int, str] = {}
+        self._process_policy = ProcessPolicy(config) if config.process_policy_enabled else None
+        self._load_start_time: Optional[float] = None
+        self._load_recorded = False
         
-        if self._check_nvidia_available():
-            self._detected_gpus.append((GPUVendor.NVIDIA, "NVIDIA GPU"))
+        self._last_transition_reason = ""
+        self._transition_count = 0
+        self._boost_seconds = 0.0
+        self._last_tick: Optional[float] = None
+        self._predictor = LaunchPredictor(config) if config.prediction_enabled else None
+        self._attributor = ProcessAttributor(config) if config.attribution_enabled else None
+        self._attribution_lock = Lock()
+        self._attribution_thread: Optional[Thread] = None
+        self._history = HistoryStore(config) if config.history_enabled else None
+        self._energy = EnergyMeter(config) if config.energy_enabled else None
+        self._status_page = self._open_status_page() if config.status_page_enabled else None
         
-        if self._check_amd_available():
-            self._detected_gpus.append((GPUVendor.AMD, "AMD GPU"))
+        self._flap = FlapDetector(config) if config.flap_control_enabled else None
+        self._thermal = ThermalGate(config) if config.thermal_enabled else None
+        self._triggers = compile_triggers(config.trigger_rules)
+        self._trigger_context = TriggerContext()
+        self._trigger_reason: Optional[str] = None
+        if any(trigger.uses_cores for trigger in self._triggers) and not self._core_load:
+            logger.warning("Trigger expressions use core() but cpuCores is disabled; core() will not match")
         
-        if self._check_intel_available():
-            self._detected_gpus.append((GPUVendor.INTEL, "Intel GPU"))
-    
-    def _check_nvidia_available(self) -> bool:
-        if os.path.exists(self.config.nvidia_smi_path):
-            try:
-                result = subprocess.run(
-                    [self.config.nvidia_smi_path, '--query-gpu=name', '--format=csv,noheader'],
-                    capture_output=True, text=True, timeout=5, creationflags=SUBPROCESS_FLAGS
-                )
-                if result.returncode == 0 and result.stdout.strip():
-                    return True
-            except Exception:
-                pass
+        self._on_state_change: Optional[Callable[[bool], None]] = None
+        self._on_verify: Optional[Callable[[bool], None]] = None
         
-        if GPUTIL_AVAILABLE and GPUtil is not None:
-            try:
-                gpus = GPUtil.getGPUs()
-                return len(gpus) > 0
-            except Exception:
-                pass
+        self._gpus = GPURegistry(config)
+        self._gpu_reason: Optional[str] = None
+        self._gpu_headroom: Optional[float] = None
         
-        return False
+        self._overhead = OverheadMonitor(config)
+        self._register_samplers()
     
-    def _check_amd_available(self) -> bool:
-        if PYADL_AVAILABLE and pyadl is not None:
-            try:
-                devices = pyadl.ADLManager.getInstance().getDevices()
-                return len(devices) > 0
-            except Exception:
-                pass
-        
-        if platform.system() == "Windows":
-            try:
-                result = subprocess.run(
-                    ['powershell', '-Command', 
-                     "Get-WmiObject Win32_VideoController | Where-Object { $_.Name -like '*AMD*' -or $_.Name -like '*Radeon*' } | Select-Object -First 1 Name"],
-                    capture_output=True, text=True, timeout=5, creationflags=SUBPROCESS_FLAGS
-                )
-                return result.returncode == 0 and ('AMD' in result.stdout or 'Radeon' in result.stdout)
-            except Exception:
-                pass
-        
-        return False
+    def _open_status_page(self) -> Optional[StatusPage]:
+        try:
+            page = StatusPage(self.config.status_page_path)
+        except (OSError, ValueError) as e:
+            logger.error(f"Cannot open status page {self.config.status_page_path}: {e}")
+            return None
+        logger.info(f"Publishing status to {page.path}")
+        return page
     
-    def _check_intel_available(self) -> bool:
-        if platform.system() == "Windows":
-            try:
-                result = subprocess.run(
-                    ['powershell', '-Command', 
-                     "Get-WmiObject Win32_VideoController | Where-Object { $_.Name -like '*Intel*' } | Select-Object -First 1 Name"],
-                    capture_output=True, text=True, timeout=5, creationflags=SUBPROCESS_FLAGS
-                )
-                return result.returncode == 0 and 'Intel' in result.stdout
-            except Exception:
-                pass
-        
-        return False
+    def _publish_status(self):
+        if self._status_page:
+            self._status_page.publish(time.time(), self._current_cpu, self._current_gpu, self._is_boosted,
+                                      self._manual_override, self._transition_count, self._boost_seconds,
+                                      self._last_transition_reason)
+    
+    def _register_samplers(self):
+        # Boost detection reads these every tick, so they are reported when over budget but never strided.
+        self._overhead.register('cpu', strideable=False)
+        if self._core_load:
+            self._overhead.register('cpu.cores')
+        if self._io_load:
+            self._overhead.register('io')
+        self._overhead.register('processes', strideable=False)
+        if self._thermal:
+            self._overhead.register('thermal')
+        if self._energy:
+            self._overhead.register('energy')
+        if self._triggers:
+            # A strided tick would skip the "for Ns" timers of rules that drive boost.
+            self._overhead.register('triggers', strideable=False)
+        if self._process_policy:
+            # A strided tick could skip the restore when the boost ends.
+            self._overhead.register('processPolicy', strideable=False)
+        for sampler in self._gpus.samplers:
+            self._overhead.register(f"gpu.{sampler.name}", spawns_process=sampler.spawns_process,
+                                    fallback=lambda sampler=sampler: self._gpus.fallback(sampler))
     
     def get_detected_gpus(self) -> List[Tuple[GPUVendor, str]]:
-        return self._detected_gpus.copy()
+        return [(device.vendor, device.name) for device in self._gpus.devices.values()]
     
     def set_state_change_callback(self, callback: Callable[[bool], None]):
         self._on_state_change = callback
@@ -137,153 +143,142 @@ class SystemMonitor:
     def get_cpu_usage(self) -> float:
         return psutil.cpu_percent(interval=None)
     
+    def _update_core_load(self):
+        values = self._core_load.update()
+        self._core_reason, self._core_headroom = self._core_load.evaluate()
+        return values
+    
+    def _update_io_load(self):
+        self._io_load.update()
+        self._io_reason, self._io_headroom = self._io_load.evaluate()
+    
     def get_gpu_usage(self) -> float:
-        max_usage = 0.0
+        self._gpus.sample(self._overhead.run)
         
-        for vendor, _ in self._detected_gpus:
-            try:
-                if vendor == GPUVendor.NVIDIA:
-                    usage = self._get_nvidia_usage()
-                elif vendor == GPUVendor.AMD:
-                    usage = self._get_amd_usage()
-                elif vendor == GPUVendor.INTEL:
-                    usage = self._get_intel_usage()
-                else:
-                    usage = 0.0
-                
-                max_usage = max(max_usage, usage)
-            except Exception:
-                pass
+        max_usage = 0.0
+        reason = None
+        headroom = None
+        for device in self._gpus.tracked_devices():
+            threshold = self._gpus.threshold_for(device)
+            if self._thermal:
+                threshold = self._thermal.gpu_threshold(threshold)
+            max_usage = max(max_usage, device.utilization)
+            if reason is None and device.utilization >= threshold:
+                reason = f"GPU {device.name} at {device.utilization:.1f}%"
+            device_headroom = max(0.0, threshold - device.utilization)
+            headroom = device_headroom if headroom is None else min(headroom, device_headroom)
         
+        self._gpu_reason = reason
+        self._gpu_headroom = headroom
         return max_usage
     
-    def _get_nvidia_usage(self) -> float:
-        if self.config.prefer_nvidia_smi and os.path.exists(self.config.nvidia_smi_path):
-            try:
-                result = subprocess.run(
-                    [self.config.nvidia_smi_path, '--query-gpu=utilization.gpu', '--format=csv,noheader,nounits'],
-                    capture_output=True, text=True, timeout=5, creationflags=SUBPROCESS_FLAGS
-                )
-                if result.returncode == 0:
-                    lines = result.stdout.strip().split('\n')
-                    usages = [float(line.strip()) for line in lines if line.strip()]
-                    if usages:
-                        return max(usages)
-            except Exception:
-                pass
-        
-        if GPUTIL_AVAILABLE and GPUtil is not None:
-            try:
-                gpus = GPUtil.getGPUs()
-                if gpus:
-                    return max(gpu.load * 100 for gpu in gpus)
-            except Exception:
-                pass
-        
-        return 0.0
-    
-    def _get_amd_usage(self) -> float:
-        if self.config.prefer_amd_pyadl and PYADL_AVAILABLE and pyadl is not None:
-            try:
-                devices = pyadl.ADLManager.getInstance().getDevices()
-                if devices:
-                    usages = []
-                    for device in devices:
-                        try:
-                            usage = device.getCurrentUsage()
-                            if usage is not None and usage >= 0:
-                                usages.append(float(usage))
-                        except AttributeError:
-                            try:
-                                activity = device.getCurrentActivity()
-                                if activity is not None and hasattr(activity, 'iActivityPercent'):
-                                    usages.append(float(activity.iActivityPercent))
-                            except Exception:
-                                pass
-                        except Exception:
-                            pass
-                    if usages:
-                        return max(usages)
-            except Exception:
-                pass
-        
-        return self._get_windows_gpu_usage_by_luid("AMD", "Radeon")
+    def _cpu_threshold(self) -> float:
+        if self._thermal:
+            return self._thermal.cpu_threshold(self.config.cpu_threshold)
+        return self.config.cpu_threshold
     
-    def _get_intel_usage(self) -> float:
-        return self._get_windows_gpu_usage_by_luid("Intel")
+    def _update_thermal(self):
+        self._thermal.update(self._gpus.tracked_devices())
     
-    def _get_windows_gpu_usage_by_luid(self, *vendor_keywords: str) -> float:
-        if platform.system() != "Windows":
-            return 0.0
-        
-        try:
-            keywords_ps = " -or ".join([f"$_.Name -like '*{kw}*'" for kw in vendor_keywords])
-            ps_script = f"""
-try {{
-    $adapters = Get-CimInstance Win32_VideoController -ErrorAction SilentlyContinue | Where-Object {{ {keywords_ps} }}
-    if (-not $adapters) {{ Write-Output 0; exit }}
-    
-    $samples = (Get-Counter '\\GPU Engine(*)\\Utilization Percentage' -ErrorAction SilentlyContinue).CounterSamples
-    if ($samples) {{
-        $maxUsage = 0
-        foreach ($sample in $samples) {{
-            if ($sample.InstanceName -like '*engtype_3D*') {{
-                if ($sample.CookedValue -gt $maxUsage) {{
-                    $maxUsage = $sample.CookedValue
-                }}
-            }}
-        }}
-        Write-Output $maxUsage
-    }} else {{
-        Write-Output 0
-    }}
-}} catch {{
-    Write-Output 0
-}}
-"""
-            result = subprocess.run(
-                ['powershell', '-Command', ps_script],
-                capture_output=True, text=True, timeout=10, creationflags=SUBPROCESS_FLAGS
-            )
-            if result.returncode == 0 and result.stdout.strip():
-                try:
-                    val = float(result.stdout.strip().split('\n')[-1])
-                    return max(0.0, val)
-                except ValueError:
-                    pass
-        except Exception:
-            pass
+    def _evaluate_triggers(self):
+        ctx = self._trigger_context
+        ctx.cpu = self._current_cpu
+        ctx.gpu = self._current_gpu
+        ctx.boosted = self._is_boosted
+        ctx.processes = self._running_processes
+        ctx.devices = self._gpus.devices
+        ctx.now = time.monotonic()
+        if self._core_load:
+            ctx.cores = self._core_load.values
+        if self._thermal:
+            ctx.cpu_temp = self._thermal.cpu_temp
+            ctx.gpu_temp = self._thermal.gpu_temp
+            ctx.gpu_power = self._thermal.gpu_power
+            ctx.on_battery = self._thermal.on_battery
+            ctx.battery = self._thermal.battery_percent
         
-        return 0.0
+        # Every trigger is evaluated each tick so that "for" timers stay current.
+        reason = None
+        for trigger in self._triggers:
+            fired = trigger.evaluate(ctx)
+            if reason is None:
+                reason = fired
+        self._trigger_reason = reason
     
     def get_running_processes(self) -> List[str]:
-        processes = []
+        return list(self._process_scanner().values())
+    
+    @staticmethod
+    def _scan_processes() -> Dict[int, str]:
+        processes = {}
         for proc in psutil.process_iter(['name']):
             try:
                 name = proc.info['name']
                 if name:
-                    processes.append(name.lower())
+                    processes[proc.pid] = name.lower()
             except (psutil.NoSuchProcess, psutil.AccessDenied):
                 pass
         return processes
     
     def is_watched_game_running(self) -> bool:
-        running = self.get_running_processes()
-        watched = self.config.watched_games
-        return any(game in running for game in watched)
+        return self._watched_game_in(set(self.get_running_processes()))
+    
+    def _watched_game_in(self, running: Set[str]) -> bool:
+        return any(game in running for game in self.config.watched_games)
+    
+    def _refresh_processes(self) -> Set[str]:
+        started = time.monotonic()
+        self._process_table = self._process_scanner()
+        self._running_processes = set(self._process_table.values())
+        self._scan_started_at = started
+        if self._predictor:
+            self._predictor.observe(self._running_processes)
+        return self._running_processes
     
     def should_boost(self) -> Tuple[bool, str]:
         if self._manual_override:
             return self._is_boosted, "Manual override"
         
-        if self.is_watched_game_running():
+        if self._thermal:
+            demote_reason = self._thermal.demote_reason()
+            if demote_reason:
+                return False, demote_reason
+        
+        boost, reason = self._load_decision()
+        if boost and not self._is_boosted and self._thermal:
+            block_reason = self._thermal.block_reason()
+            if block_reason:
+                return False, block_reason
+        return boost, reason
+    
+    def _load_decision(self) -> Tuple[bool, str]:
+        if self.config.triggers_replace_builtin:
+            if self._trigger_reason:
+                return True, self._trigger_reason
+            return False, "Normal usage"
+        
+        if self._watched_game_in(self._running_processes):
             return True, "Watched game detected"
         
-        if self._current_cpu >= self.config.cpu_threshold:
+        if self._predictor:
+            prediction = self._predictor.active_prediction(self._running_processes)
+            if prediction:
+                return True, f"Predicted: {prediction.explain()}"
+        
+        if self._current_cpu >= self._cpu_threshold():
             return True, f"CPU at {self._current_cpu:.1f}%"
         
-        if self._current_gpu >= self.config.gpu_threshold:
-            return True, f"GPU at {self._current_gpu:.1f}%"
+        if self._core_reason:
+            return True, self._core_reason
+        
+        if self._gpu_reason:
+            return True, self._gpu_reason
+        
+        if self._io_reason:
+            return True, self._io_reason
+        
+        if self._trigger_reason:
+            return True, self._trigger_reason
         
         return False, "Normal usage"
     
@@ -291,30 +286,48 @@ try {{
         should_boost, reason = self.should_boost()
         current_time = time.time()
         
+        self._track_sustained_load(current_time)
+        
         if self._manual_override:
             return
         
+        forced = self._is_forced_demotion(reason)
+        if self._flap and not forced and self._flap.is_pinned(current_time):
+            self._flap.note_pinned_demand(should_boost != self._is_boosted)
+            self._promote_start_time = None
+            self._demote_start_time = None
+            return
+        
         if should_boost and not self._is_boosted:
             if self._promote_start_time is None:
                 self._promote_start_time = current_time
+                if self._is_threshold_reason(reason) and self._attributor:
+                    self._prime_attribution()
             
+            hold = self._promote_hold(reason, current_time)
             elapsed = current_time - self._promote_start_time
-            if elapsed >= self.config.promote_hold_seconds:
+            if elapsed >= hold:
                 self._is_boosted = True
                 self._promote_start_time = None
                 self._demote_start_time = None
+                self._note_auto_transition(current_time)
+                self._record_transition(True, reason)
                 if self._on_state_change:
                     self._on_state_change(True)
+                self._start_attribution(reason)
         
         elif not should_boost and self._is_boosted:
             if self._demote_start_time is None:
                 self._demote_start_time = current_time
             
+            hold = 0 if forced else self._hold(self.config.demote_hold_seconds, current_time)
             elapsed = current_time - self._demote_start_time
-            if elapsed >= self.config.demote_hold_seconds:
+            if elapsed >= hold:
                 self._is_boosted = False
                 self._demote_start_time = None
                 self._promote_start_time = None
+                self._note_auto_transition(current_time)
+                self._record_transition(False, reason)
                 if self._on_state_change:
                     self._on_state_change(False)
         
@@ -324,6 +337,95 @@ try {{
             else:
                 self._promote_start_time = None
     
+    def _promote_hold(self, reason: str, current_time: float) -> float:
+        if reason.startswith("Predicted"):
+            return 0
+        if self._fast_path_game and reason == "Watched game detected":
+            return self.config.process_events_promote_hold_seconds
+        return self._hold(self.config.promote_hold_seconds, current_time)
+    
+    def _hold(self, base_seconds: float, current_time: float) -> float:
+        return self._flap.hold(base_seconds, current_time) if self._flap else base_seconds
+    
+    def _note_auto_transition(self, current_time: float):
+        if self._flap:
+            self._flap.record(current_time)
+    
+    def _track_sustained_load(self, current_time: float):
+        """Tell the predictor when real load has lasted the promote hold time."""
+        if not self._predictor:
+            return
+        
+        under_load = (self._watched_game_in(self._running_processes)
+                      or self._current_cpu >= self._cpu_threshold()
+                      or self._core_reason is not None
+                      or self._gpu_reason is not None
+                      or self._io_reason is not None
+                      or self._trigger_reason is not None)
+        if not under_load:
+            self._load_start_time = None
+            self._load_recorded = False
+            return
+        
+        if self._load_start_time is None:
+            self._load_start_time = current_time
+        elif (not self._load_recorded
+              and current_time - self._load_start_time >= self.config.promote_hold_seconds):
+            self._predictor.record_sustained_load(self._load_start_time)
+            self._load_recorded = True
+    
+    @staticmethod
+    def _is_forced_demotion(reason: str) -> bool:
+        return reason.startswith(("Thermal limit", "Power limit"))
+    
+    @staticmethod
+    def _is_threshold_reason(reason: str) -> bool:
+        return reason.startswith(("CPU", "GPU"))
+    
+    def _prime_attribution(self):
+        # Skip the baseline rather than wait while an earlier attribution is still running.
+        if self._attribution_lock.acquire(blocking=False):
+            try:
+                self._attributor.prime()
+            finally:
+                self._attribution_lock.release()
+    
+    def _start_attribution(self, reason: str):
+        """Attribute a promotion on a worker thread, after the boost has been applied.
+
+        attribute() may sleep for a sample window and run nvidia-smi or a
+        GPU counter query, so it must not sit between the decision and the
+        state change callback.
+        """
+        if not self._attributor or not self._is_threshold_reason(reason):
+            return
+        if self._attribution_thread is not None and self._attribution_thread.is_alive():
+            return
+        self._attribution_thread = Thread(target=self._attribute_transition, args=(reason, self._transition_count),
+                                          name='Attribution', daemon=True)
+        self._attribution_thread.start()
+    
+    def _attribute_transition(self, reason: str, transition: int):
+        with self._attribution_lock:
+            try:
+                usages = self._attributor.attribute(rank_by_gpu=reason.startswith("GPU"))
+            except Exception as e:
+                logger.debug(f"Process attribution failed: {e}")
+                return
+        
+        summary = format_attribution(usages)
+        if not summary:
+            return
+        attributed = f"{reason} [{summary}]"
+        if self._transition_count == transition:
+            self._last_transition_reason = attributed
+        logger.info(f"Boost attributed: {attributed}")
+    
+    def _record_transition(self, boost: bool, reason: str):
+        self._last_transition_reason = reason
+        self._transition_count += 1
+        logger.info(f"Switching to {'BOOST' if boost else 'NORMAL'}: {reason}")
+    
     def _monitor_loop(self):
         psutil.cpu_percent(interval=None)
         
@@ -331,35 +433,202 @@ try {{
             self._on_verify(self._is_boosted)
         
         while not self._stop_event.is_set():
-            self._current_cpu = self.get_cpu_usage()
+            profiler = self._profiler
+            if profiler is not None:
+                profiler.tick_started()
+            tick_wall = time.perf_counter()
+            tick_cpu = time.thread_time()
+            self._overhead.tick()
+            self._accumulate_boost_time()
+            
+            self._current_cpu = self._overhead.run('cpu', self.get_cpu_usage) or 0.0
+            if self._core_load:
+                self._overhead.run('cpu.cores', self._update_core_load)
             self._current_gpu = self.get_gpu_usage()
+            if self._io_load:
+                self._overhead.run('io', self._update_io_load)
+            if self._thermal:
+                self._overhead.run('thermal', self._update_thermal)
+            self._overhead.run('processes', self._refresh_processes)
+            if self._triggers:
+                self._overhead.run('triggers', self._evaluate_triggers)
             
             self._check_state_transition()
+            if self._energy:
+                self._overhead.run('energy', self._update_energy)
+            self._publish_status()
+            self._expire_fast_path()
+            if self._process_policy:
+                self._overhead.run('processPolicy', self._update_process_policy)
+            if self._history:
+                self._history.record(time.time(), self._current_cpu, self._current_gpu, self._is_boosted)
             
             if self._on_verify:
                 self._on_verify(self._is_boosted)
             
-            self._stop_event.wait(self.config.sampling_interval_ms / 1000.0)
+            interval_ms = self._interval.next_interval_ms(self._headroom(), self._needs_fast_sampling())
+            self._sampling_stats.record_tick(
+                time.perf_counter() - tick_wall, time.thread_time() - tick_cpu, interval_ms
+            )
+            self._report_overhead()
+            if profiler is not None and profiler.tick_finished() and self._profiler is profiler:
+                self._profiler = None
+            
+            self._wake_event.wait(interval_ms / 1000.0)
+            self._wake_event.clear()
+        
+        self._release_loop_resources()
+    
+    def _release_loop_resources(self):
+        """Undo what the loop applied and close what it writes to.
+
+        Runs when the loop exits, or from stop() once the thread is gone, so
+        a tick that outlives stop() never publishes to a closed page.
+        """
+        if self._process_policy:
+            self._process_policy.restore_all()
+        if self._energy:
+            self._energy.close()
+        if self._status_page:
+            self._status_page.close()
+            self._status_page = None
+    
+    def _expire_fast_path(self):
+        # A game missing from a scan that started before the event (or a skipped scan) proves nothing.
+        if not self._fast_path_game:
+            return
+        if self._is_boosted or (self._scan_started_at >= self._fast_path_at
+                                and self._fast_path_game not in self._running_processes):
+            self._fast_path_game = None
+    
+    def _update_energy(self):
+        # Called after the transition check, so the coming interval is charged to the new state.
+        self._energy.sample(self._gpus.tracked_devices(), self._is_boosted, self._last_transition_reason)
+    
+    def _update_process_policy(self):
+        self._process_policy.update(self._is_boosted, self._process_table)
+    
+    def _accumulate_boost_time(self):
+        now = time.monotonic()
+        if self._is_boosted and self._last_tick is not None:
+            self._boost_seconds += now - self._last_tick
+        self._last_tick = now
+    
+    def _headroom(self) -> float:
+        """Smallest distance below any boost threshold, in percentage points."""
+        headroom = max(0.0, self._cpu_threshold() - self._current_cpu)
+        for extra in (self._core_headroom, self._gpu_headroom, self._io_headroom):
+            if extra is not None:
+                headroom = min(headroom, extra)
+        return headroom
+    
+    def _needs_fast_sampling(self) -> bool:
+        return (self._is_boosted
+                or self._promote_start_time is not None
+                or self._demote_start_time is not None
+                or self._watched_game_in(self._running_processes))
+    
+    def _report_overhead(self):
+        now = time.monotonic()
+        if now - self._last_overhead_report < self.config.overhead_report_seconds:
+            return
+        self._last_overhead_report = now
+        logger.info(f"Monitor overhead: {format_sampling_stats(self._sampling_stats.snapshot())}")
+        
+        overhead = self._overhead.snapshot()
+        per_sampler = ", ".join(
+            f"{name} {stats['avgWallMs']:.1f}ms/{stats['cpuPercentOfCore']:.3f}%"
+            for name, stats in overhead['samplers'].items()
+        )
+        logger.info(f"Sampler costs: {per_sampler}; RSS {overhead['rssBytes'] / 1048576:.1f} MiB")
     
     def start(self):
         if self._monitor_thread is not None and self._monitor_thread.is_alive():
             return
         
         self._stop_event.clear()
-        self._monitor_thread = Thread(target=self._monitor_loop, daemon=True)
+        # Created first: a polling source registers its overhead meter, which the monitor thread iterates.
+        if self.config.process_events_enabled and self.config.watched_games:
+            self._process_events = create_event_source(
+                self.config, self.config.watched_games, self.notify_process_started, self._overhead
+            )
+        
+        self._monitor_thread = Thread(target=self._monitor_loop, name='Monitor', daemon=True)
         self._monitor_thread.start()
+        if self._history:
+            self._history.start()
+        
+        if self._process_events:
+            self._process_events.start()
+            logger.info(f"Watching process starts via {self._process_events.name}")
     
     def stop(self):
         self._stop_event.set()
+        self._wake_event.set()
+        if self._process_events:
+            self._process_events.stop()
+            self._process_events = None
         if self._monitor_thread:
             self._monitor_thread.join(timeout=2)
+        if self._monitor_thread is not None and self._monitor_thread.is_alive():
+            # The loop restores priorities and closes the status page itself when the current tick ends.
+            logger.warning("Monitor tick still running at stop; it will finish in the background")
+        else:
+            self._release_loop_resources()
+        if self._profiler:
+            self._profiler.finish()
+            self._profiler = None
+        if self._history:
+            self._history.stop()
+        if self._predictor:
+            self._predictor.save()
+    
+    def start_profiling(self, ticks: Optional[int] = None):
+        """Profile the next `ticks` monitor ticks (default profiling.ticks) into profiling.outputDir."""
+        if self._profiler is not None:
+            return
+        self._profiler = TickProfiler(ticks or self.config.profiling_ticks, self.config.profiling_output_dir,
+                                      self.config.profiling_sample_interval_ms)
+    
+    def stop_profiling(self):
+        """End profiling after the current tick and write what was collected."""
+        profiler = self._profiler
+        if profiler is None:
+            return
+        if profiler.completed == 0 and (self._monitor_thread is None or not self._monitor_thread.is_alive()):
+            self._profiler = None
+            return
+        profiler.ticks = profiler.completed + 1
+        self._wake_event.set()
+    
+    @property
+    def is_profiling(self) -> bool:
+        return self._profiler is not None
+    
+    def notify_process_started(self, pid: int, name: str):
+        """Fast path for watched games: wake the monitor now instead of at the next tick."""
+        if self._is_boosted or self._manual_override:
+            return
+        logger.info(f"Watched game started: {name} ({pid})")
+        self._fast_path_at = time.monotonic()
+        self._fast_path_game = name
+        self._wake_event.set()
+    
+    def restore_state(self, boosted: bool, manual_override: bool):
+        """Resume a persisted state before start() without firing the state change callback."""
+        self._is_boosted = boosted
+        self._manual_override = manual_override
+        self._last_transition_reason = "Resumed previous session"
     
     def set_manual_boost(self, boost: bool):
         self._manual_override = True
         if self._is_boosted != boost:
             self._is_boosted = boost
+            self._record_transition(boost, "Manual override")
             if self._on_state_change:
                 self._on_state_change(boost)
+        # Let the monitor thread, the only status page writer, publish the change now.
+        self._wake_event.set()
     
     def clear_manual_override(self):
         self._manual_override = False
@@ -378,6 +647,35 @@ try {{
     def is_boosted(self) -> bool:
         return self._is_boosted
     
+    def get_status(self) -> dict:
+        return {
+            "cpu": self._current_cpu,
+            "gpu": self._current_gpu,
+            "cpuCores": list(self._core_load.values) if self._core_load else [],
+            "io": self._io_load.rates() if self._io_load else None,
+            "gpus": [device.to_dict() for device in self._gpus.devices.values()],
+            "boosted": self._is_boosted,
+            "manualOverride": self._manual_override,
+            "lastTransitionReason": self._last_transition_reason,
+            "transitions": self._transition_count,
+            "boostSeconds": self._boost_seconds,
+            "flapControl": self._flap.snapshot() if self._flap else None,
+            "thermal": self._thermal.snapshot() if self._thermal else None,
+            "processPolicy": self._process_policy.snapshot() if self._process_policy else None,
+            "history": self._history.snapshot() if self._history else None,
+            "energy": self._energy.snapshot() if self._energy else None,
+            "sampling": self._sampling_stats.snapshot(),
+            "overhead": self._overhead.snapshot()
+        }
+    
+    @property
+    def sampling_stats(self) -> dict:
+        return self._sampling_stats.snapshot()
+    
+    @property
+    def last_transition_reason(self) -> str:
+        return self._last_transition_reason
+    
     @property
     def is_manual_override(self) -> bool:
         return self._manual_override
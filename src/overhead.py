@@ -0,0 +1,200 @@
+import logging
+import os
+import time
+from threading import Lock
+from typing import Any, Callable, Dict, Optional
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+# os.times() only reports reaped children's CPU time on POSIX.
+CHILD_TIMES_AVAILABLE = os.name != 'nt'
+
+# A failing sampler is logged on its first error and then at most this often.
+ERROR_LOG_SECONDS = 60.0
+
+
+class SamplerMeter:
+    __slots__ = ('name', 'spawns_process', 'fallback', 'strideable', 'calls', 'skipped', 'wall_total',
+                 'cpu_total', 'window_cost', 'last_wall', 'last_value', 'has_value', 'stride',
+                 'fallback_active', 'over_budget', 'errors', 'errors_unlogged', 'error_logged_at')
+    
+    def __init__(self, name: str, spawns_process: bool, fallback: Optional[Callable[[], bool]],
+                 strideable: bool):
+        self.name = name
+        self.spawns_process = spawns_process
+        self.fallback = fallback
+        self.strideable = strideable
+        self.calls = 0
+        self.skipped = 0
+        self.wall_total = 0.0
+        self.cpu_total = 0.0
+        self.window_cost = 0.0
+        self.last_wall = 0.0
+        self.last_value: Any = None
+        self.has_value = False
+        self.stride = 1
+        self.fallback_active = False
+        self.over_budget = False
+        self.errors = 0
+        self.errors_unlogged = 0
+        self.error_logged_at: Optional[float] = None
+    
+    def to_dict(self, elapsed: float) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "wallMsTotal": self.wall_total * 1000.0,
+            "cpuMsTotal": self.cpu_total * 1000.0,
+            "lastWallMs": self.last_wall * 1000.0,
+            "avgWallMs": self.wall_total / self.calls * 1000.0 if self.calls else 0.0,
+            "cpuPercentOfCore": self.cpu_total / elapsed * 100.0 if elapsed > 0 else 0.0,
+            "stride": self.stride,
+            "strideable": self.strideable,
+            "fallbackActive": self.fallback_active
+        }
+
+
+class OverheadMonitor:
+    """Measures each sampler's cost and keeps it within a CPU budget.
+
+    Sampler calls go through run(). Every budget window, a sampler whose cost
+    exceeds budgetPercentOfCore is first swapped for its cheaper fallback (if
+    it registered one), otherwise it is run only every Nth tick, reusing its
+    last value in between. The stride relaxes again once the cost drops well
+    below the budget. Samplers registered with strideable=False (the ones
+    boost detection depends on) are never skipped, only reported.
+    
+    A sampler that raises is counted and logged (rate limited) and its last
+    value is returned, so one failing sampler cannot stop the monitor loop.
+    
+    Samplers may run on other threads than the monitor (the process start
+    poller does). The bookkeeping is locked; the sampler call itself is not.
+    """
+    
+    def __init__(self, config):
+        self.config = config
+        self._meters: Dict[str, SamplerMeter] = {}
+        self._tick = 0
+        self._started = time.monotonic()
+        self._window_started = self._started
+        self._process = psutil.Process()
+        self._lock = Lock()
+    
+    def register(self, name: str, spawns_process: bool = False,
+                 fallback: Optional[Callable[[], bool]] = None, strideable: bool = True):
+        with self._lock:
+            self._meters[name] = SamplerMeter(name, spawns_process, fallback, strideable)
+    
+    def tick(self):
+        with self._lock:
+            self._tick += 1
+            now = time.monotonic()
+            if now - self._window_started >= self.config.overhead_window_seconds:
+                self._evaluate(now - self._window_started)
+                self._window_started = now
+    
+    def run(self, name: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            meter = self._meters.get(name)
+            if meter is None:
+                meter = SamplerMeter(name, False, None, True)
+                self._meters[name] = meter
+            if meter.stride > 1 and meter.has_value and self._tick % meter.stride:
+                meter.skipped += 1
+                return meter.last_value
+        
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        child_start = self._children_cpu() if meter.spawns_process else 0.0
+        value = None
+        error: Optional[Exception] = None
+        try:
+            value = fn()
+        except Exception as e:
+            error = e
+        wall = time.perf_counter() - wall_start
+        cpu = time.thread_time() - cpu_start
+        if meter.spawns_process:
+            if CHILD_TIMES_AVAILABLE:
+                cpu += self._children_cpu() - child_start
+            else:
+                # Child CPU is not observable here; charge the wall time instead.
+                cpu = max(cpu, wall)
+        
+        with self._lock:
+            meter.calls += 1
+            meter.wall_total += wall
+            meter.cpu_total += cpu
+            meter.window_cost += cpu
+            meter.last_wall = wall
+            if error is not None:
+                self._note_error(meter, error)
+                return meter.last_value
+            meter.last_value = value
+            meter.has_value = True
+            return value
+    
+    @staticmethod
+    def _note_error(meter: SamplerMeter, error: Exception):
+        meter.errors += 1
+        meter.errors_unlogged += 1
+        now = time.monotonic()
+        if meter.error_logged_at is not None and now - meter.error_logged_at < ERROR_LOG_SECONDS:
+            return
+        first = meter.error_logged_at is None
+        repeated = "" if first else f" ({meter.errors_unlogged} errors since last report)"
+        logger.warning(f"Sampler '{meter.name}' failed: {error!r}{repeated}",
+                       exc_info=error if first else None)
+        meter.error_logged_at = now
+        meter.errors_unlogged = 0
+    
+    def _evaluate(self, window: float):
+        budget = self.config.overhead_budget_percent
+        for meter in self._meters.values():
+            share = meter.window_cost / window * 100.0
+            meter.window_cost = 0.0
+            if not self.config.overhead_enforce:
+                continue
+            
+            if share > budget:
+                if meter.fallback and not meter.fallback_active and meter.fallback():
+                    meter.fallback_active = True
+                    logger.warning(f"Sampler '{meter.name}' used {share:.2f}% of a core "
+                                   f"(budget {budget}%); switched to fallback")
+                elif meter.strideable and meter.stride < self.config.overhead_max_stride:
+                    meter.stride = min(meter.stride * 2, self.config.overhead_max_stride)
+                    logger.warning(f"Sampler '{meter.name}' used {share:.2f}% of a core "
+                                   f"(budget {budget}%); now sampling every {meter.stride} ticks")
+                elif not meter.strideable and not meter.over_budget:
+                    logger.warning(f"Sampler '{meter.name}' used {share:.2f}% of a core "
+                                   f"(budget {budget}%); not throttled because boost detection needs it")
+                meter.over_budget = True
+                continue
+            meter.over_budget = False
+            if share < budget / 2 and meter.stride > 1:
+                meter.stride //= 2
+                logger.info(f"Sampler '{meter.name}' back within budget ({share:.2f}% of a core); "
+                            f"now sampling every {meter.stride} ticks")
+    
+    @staticmethod
+    def _children_cpu() -> float:
+        times = os.times()
+        return times.children_user + times.children_system
+    
+    def snapshot(self) -> Dict[str, Any]:
+        elapsed = time.monotonic() - self._started
+        try:
+            rss = self._process.memory_info().rss
+        except psutil.Error:
+            rss = 0
+        with self._lock:
+            samplers = {name: meter.to_dict(elapsed) for name, meter in self._meters.items()}
+        return {
+            "rssBytes": rss,
+            "budgetPercentOfCore": self.config.overhead_budget_percent,
+            "samplers": samplers,
+            "cpuPercentOfCore": sum(m["cpuPercentOfCore"] for m in samplers.values())
+        }
@@ -4,8 +4,17 @@ import subprocess
 import logging
 import platform
 import filecmp
+import hashlib
+import math
 from pathlib import Path
-from typing import Optional
+from threading import Condition, Thread
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .flap import TokenBucket
+from .logging_setup import setup_logging
+from .processor_settings import ProcessorSettingsController, RecordingPowercfg
+from .profiling import profiled_section
+from .service_control import RestartResult, ServiceController, create_service_backend
 
 logger = logging.getLogger(__name__)
 
@@ -16,24 +25,23 @@ class PowerManager:
     def __init__(self, config):
         self.config = config
         self._current_plan: Optional[str] = None
+        self._current_plan_guid: Optional[str] = None
         self._fan_state_verified = False
-        self._setup_logging()
-    
-    def _setup_logging(self):
-        log_dir = Path(self.config.log_dir)
-        log_dir.mkdir(parents=True, exist_ok=True)
-        
-        log_file = log_dir / 'power_manager.log'
-        
-        level = logging.DEBUG if self.config.verbosity == 'debug' else logging.INFO
-        
-        handler = logging.FileHandler(log_file)
-        handler.setLevel(level)
-        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-        
-        logger.addHandler(handler)
-        logger.setLevel(level)
+        self._restart_bucket = TokenBucket(config.service_restart_burst,
+                                           config.service_restarts_per_hour / 3600.0)
+        self._restart_pending = False
+        self._last_restart: Optional[RestartResult] = None
+        # Restarts run on one worker thread; a request queued while one runs replaces any older queued one.
+        self._restart_cond = Condition()
+        self._restart_request: Optional[Tuple[Optional[Callable[[], None]]]] = None
+        self._restart_thread: Optional[Thread] = None
+        self.services = ServiceController(create_service_backend(config),
+                                          poll_seconds=config.service_poll_ms / 1000.0,
+                                          deadline_seconds=config.service_deadline_seconds)
+        self.processor = ProcessorSettingsController(
+            config, runner=None if os.name == 'nt' else RecordingPowercfg()
+        )
+        setup_logging(config)
     
     def get_current_power_plan(self) -> Optional[str]:
         if os.name != 'nt':
@@ -57,9 +65,31 @@ class PowerManager:
         
         return None
     
+    def get_active_plan_guid(self) -> Optional[str]:
+        if os.name != 'nt':
+            return None
+        
+        try:
+            result = subprocess.run(
+                ['powercfg', '/getactivescheme'],
+                capture_output=True,
+                text=True,
+                timeout=5,
+                creationflags=SUBPROCESS_FLAGS
+            )
+            if result.returncode == 0:
+                for part in result.stdout.split():
+                    if len(part) == 36 and part.count('-') == 4:
+                        return part
+        except Exception as e:
+            logger.error(f"Error getting active power plan: {e}")
+        
+        return None
+    
     def set_power_plan(self, plan_name: str) -> bool:
         if os.name != 'nt':
             logger.info(f"[Simulated] Would set power plan to: {plan_name}")
+            self._current_plan = plan_name
             return True
         
         try:
@@ -97,11 +127,12 @@ class PowerManager:
             if result.returncode == 0:
                 logger.info(f"Set power plan to: {plan_name}")
                 self._current_plan = plan_name
+                self._current_plan_guid = plan_guid
                 return True
             else:
                 logger.error(f"Failed to set power plan: {result.stderr}")
                 return False
-                
+        
         except Exception as e:
             logger.error(f"Error setting power plan: {e}")
             return False
@@ -131,15 +162,17 @@ class PowerManager:
             target_path = Path(target_file)
             target_path.parent.mkdir(parents=True, exist_ok=True)
             
-            shutil.copy2(source_file, target_path)
-            logger.info(f"Copied fan config: {'MB_on' if boost else 'MB_off'} -> {target_file}")
-            
-            self._update_status_file(target_path.parent, boost)
+            def write_fan_config():
+                shutil.copy2(source_file, target_path)
+                logger.info(f"Copied fan config: {'MB_on' if boost else 'MB_off'} -> {target_file}")
+                self._update_status_file(target_path.parent, boost)
             
-            self._restart_lconnect_service()
+            # The copy overlaps the service's stop phase instead of preceding it; both run on the restart
+            # worker, so True means the change is queued.
+            self._restart_lconnect_service(during_stop=write_fan_config)
             
             return True
-            
+        
         except Exception as e:
             logger.error(f"Error copying fan config: {e}")
             return False
@@ -166,6 +199,14 @@ class PowerManager:
         if not self.config.enable_fan_boost:
             return True
         
+        if self.restart_in_progress():
+            # The fan config may not be written yet; check again on a later pass.
+            return True
+        
+        if self._restart_pending and self._restart_bucket.seconds_until_available() == 0:
+            self._restart_lconnect_service()
+            return True
+        
         if self._fan_state_verified:
             return True
         
@@ -233,37 +274,168 @@ class PowerManager:
         
         return None
     
+    def fan_config_hash(self) -> Optional[str]:
+        target_file = self.config.lconnect_target_file
+        if not target_file:
+            return None
+        
+        try:
+            with open(target_file, 'rb') as f:
+                return hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            return None
+    
+    def applied_state(self) -> Dict[str, Any]:
+        return {
+            "planName": self._current_plan,
+            "planGuid": self._current_plan_guid,
+            "fanHash": self.fan_config_hash() if self.config.enable_fan_boost else None
+        }
+    
+    def resume(self, state: Dict[str, Any]) -> bool:
+        """Adopt a persisted state after a restart, re-applying only what has drifted.
+
+        Returns True if the system matched and nothing was actuated.
+        """
+        boost = bool(state.get("boosted"))
+        plan_name = self.config.boost_plan if boost else self.config.normal_plan
+        consistent = True
+        
+        if self._uses_processor_settings():
+            # One query shows whether anything drifted; only those values are written.
+            consistent = self.processor.apply(boost, refresh=True) == 0
+        else:
+            plan_guid = state.get("planGuid")
+            if state.get("planName") != plan_name:
+                logger.info(f"Configured plan changed since last run; applying {plan_name}")
+                consistent = False
+            elif os.name == 'nt' and (self.get_active_plan_guid() or "").lower() != (plan_guid or "").lower():
+                logger.info(f"Active power plan drifted from {plan_name}; re-applying")
+                consistent = False
+            
+            if consistent:
+                self._current_plan = plan_name
+                self._current_plan_guid = plan_guid
+            else:
+                self.set_power_plan(plan_name)
+        
+        target_file = self.config.lconnect_target_file
+        if self.config.enable_fan_boost and target_file:
+            target_path = Path(target_file)
+            if (self.fan_config_hash() != state.get("fanHash")
+                    and self._detect_actual_fan_state(target_path) != boost):
+                logger.info("Fan config drifted since last run; re-applying")
+                consistent = False
+                if not self.copy_fan_config(boost):
+                    return False
+            elif not self._status_file_matches(target_path.parent, boost):
+                self._update_status_file(target_path.parent, boost)
+        self._fan_state_verified = True
+        
+        if consistent:
+            logger.info(f"Resumed {'BOOST' if boost else 'NORMAL'} mode without re-applying")
+        return consistent
+    
+    @staticmethod
+    def _status_file_matches(target_dir: Path, boost: bool) -> bool:
+        has_on = (target_dir / 'on').exists()
+        has_off = (target_dir / 'off').exists()
+        return has_on != has_off and has_on == boost
+    
     def reset_fan_verification(self):
         self._fan_state_verified = False
     
-    def _restart_lconnect_service(self):
+    def _restart_lconnect_service(self, during_stop: Optional[Callable[[], None]] = None):
+        """Queue a restart of the L-Connect service on the restart worker, running during_stop while it stops.
+        
+        Returns at once so the monitor thread keeps sampling. A request queued
+        while another restart runs replaces any older queued one, whose
+        during_stop is dropped since the newer one writes the latest config.
+        """
+        with self._restart_cond:
+            self._restart_request = (during_stop,)
+            if self._restart_thread is None:
+                self._restart_thread = Thread(target=self._restart_worker, name='ServiceRestart', daemon=True)
+                self._restart_thread.start()
+    
+    def _restart_worker(self):
+        while True:
+            with self._restart_cond:
+                request = self._restart_request
+                self._restart_request = None
+                if request is None:
+                    self._restart_thread = None
+                    self._restart_cond.notify_all()
+                    return
+            try:
+                with profiled_section():
+                    self._run_restart(request[0])
+            except Exception as e:
+                logger.error(f"Error applying fan config: {e}")
+                self.reset_fan_verification()
+    
+    def restart_in_progress(self) -> bool:
+        with self._restart_cond:
+            return self._restart_thread is not None
+    
+    def wait_idle(self, timeout: float) -> bool:
+        """Wait for queued and running restarts to finish; returns False on timeout."""
+        with self._restart_cond:
+            idle = self._restart_cond.wait_for(lambda: self._restart_thread is None, timeout)
+        if not idle:
+            logger.warning(f"Service restart still running after {timeout:g}s")
+        return idle
+    
+    def _run_restart(self, during_stop: Optional[Callable[[], None]]):
+        """Restart the L-Connect service, running during_stop while it stops.
+        
+        When no restart is possible, during_stop still runs; exceptions from it propagate.
+        """
         service_name = self.config.lconnect_service_name
         if not service_name:
+            if during_stop:
+                during_stop()
             return
         
-        try:
-            subprocess.run(
-                ['net', 'stop', service_name],
-                capture_output=True,
-                timeout=10,
-                creationflags=SUBPROCESS_FLAGS
-            )
-            
-            subprocess.run(
-                ['net', 'start', service_name],
-                capture_output=True,
-                timeout=10,
-                creationflags=SUBPROCESS_FLAGS
-            )
-            
-            logger.info(f"Restarted service: {service_name}")
-        except Exception as e:
-            logger.warning(f"Could not restart service {service_name}: {e}")
+        if not self._restart_bucket.try_take():
+            if not self._restart_pending:
+                wait = self._restart_bucket.seconds_until_available()
+                logger.warning(f"Service restart rate limit reached; deferring restart of {service_name} "
+                               + (f"for {wait:.0f}s" if wait != math.inf else "until the app restarts "
+                                  "(lconnect.restartsPerHour is 0)"))
+            self._restart_pending = True
+            if during_stop:
+                during_stop()
+            return
+        self._restart_pending = False
+        
+        result = self.services.restart(service_name, during_stop)
+        self._last_restart = result
+        if result.ok:
+            logger.info(f"Restarted service {service_name} in {result.stop_seconds + result.start_seconds:.2f}s "
+                        f"(stop {result.stop_seconds:.2f}s, start {result.start_seconds:.2f}s)")
+        else:
+            logger.warning(f"Could not restart service {service_name}: {result.error} (state {result.state})")
+    
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "plan": self._current_plan,
+            "processorControl": self.config.processor_control_mode,
+            "processorBatches": self.processor.applied_batches,
+            "serviceRestarts": self._restart_bucket.snapshot(),
+            "restartPending": self._restart_pending,
+            "serviceBackend": self.services.backend.name,
+            "lastRestart": self._last_restart.to_dict() if self._last_restart else None
+        }
+    
+    def _uses_processor_settings(self) -> bool:
+        return self.config.processor_control_mode == "settings"
     
     def apply_boost_mode(self, boost: bool):
-        plan_name = self.config.boost_plan if boost else self.config.normal_plan
-        
-        self.set_power_plan(plan_name)
+        if self._uses_processor_settings():
+            self.processor.apply(boost)
+        else:
+            self.set_power_plan(self.config.boost_plan if boost else self.config.normal_plan)
         
         self.copy_fan_config(boost)
         
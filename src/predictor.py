@@ -0,0 +1,249 @@
+import json
+import logging
+import os
+import time
+from collections import deque
+from pathlib import Path
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+MODEL_VERSION = 1
+
+# Coarse time-of-day buckets: night, morning, afternoon, evening.
+BUCKET_NAMES = ("night", "morning", "afternoon", "evening")
+
+
+def time_bucket(timestamp: float) -> int:
+    return time.localtime(timestamp).tm_hour // 6
+
+
+class LaunchStats:
+    __slots__ = ('launches', 'boosts', 'bucket_launches', 'bucket_boosts', 'last_seen')
+    
+    def __init__(self):
+        self.launches = 0
+        self.boosts = 0
+        self.bucket_launches = [0] * len(BUCKET_NAMES)
+        self.bucket_boosts = [0] * len(BUCKET_NAMES)
+        self.last_seen = 0.0
+    
+    def confidence(self, bucket: int, min_launches: int) -> Tuple[float, int, int, Optional[int]]:
+        """Return (confidence, boosts, launches, bucket) preferring time-of-day stats when they have enough support."""
+        if self.bucket_launches[bucket] >= min_launches:
+            launches = self.bucket_launches[bucket]
+            boosts = self.bucket_boosts[bucket]
+            return boosts / launches, boosts, launches, bucket
+        if self.launches == 0:
+            return 0.0, 0, 0, None
+        return self.boosts / self.launches, self.boosts, self.launches, None
+    
+    def to_dict(self) -> Dict:
+        return {
+            "launches": self.launches,
+            "boosts": self.boosts,
+            "bucketLaunches": self.bucket_launches,
+            "bucketBoosts": self.bucket_boosts,
+            "lastSeen": self.last_seen
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'LaunchStats':
+        stats = cls()
+        stats.launches = int(data.get("launches", 0))
+        stats.boosts = min(int(data.get("boosts", 0)), stats.launches)
+        for field, attr in (("bucketLaunches", "bucket_launches"), ("bucketBoosts", "bucket_boosts")):
+            values = data.get(field, [])
+            if isinstance(values, list) and len(values) == len(BUCKET_NAMES):
+                setattr(stats, attr, [int(v) for v in values])
+        stats.last_seen = float(data.get("lastSeen", 0.0))
+        return stats
+
+
+class Prediction:
+    __slots__ = ('name', 'confidence', 'boosts', 'launches', 'bucket', 'expires_at')
+    
+    def __init__(self, name: str, confidence: float, boosts: int, launches: int,
+                 bucket: Optional[int], expires_at: float):
+        self.name = name
+        self.confidence = confidence
+        self.boosts = boosts
+        self.launches = launches
+        self.bucket = bucket
+        self.expires_at = expires_at
+    
+    def explain(self) -> str:
+        scope = f" in the {BUCKET_NAMES[self.bucket]}" if self.bucket is not None else ""
+        return (f"{self.name} launched; {self.boosts}/{self.launches} launches{scope} "
+                f"preceded sustained load ({self.confidence:.0%})")
+
+
+class LaunchPredictor:
+    """Learns which process launches precede sustained boosts.
+
+    Every new process name seen by the monitor counts as a launch. When load
+    stays above a threshold for the promote hold time, every name launched in
+    the preceding lookback window is credited with a boost. Names whose
+    boost/launch ratio is high enough trigger boost as soon as they appear.
+    """
+    
+    def __init__(self, config, model_path: Optional[Path] = None):
+        self.config = config
+        self.model_path = model_path or config.prediction_model_path
+        self._stats: Dict[str, LaunchStats] = {}
+        self._recent_launches: Deque[Tuple[float, str]] = deque()
+        self._known: Optional[Set[str]] = None
+        self._active: Optional[Prediction] = None
+        self._dirty = False
+        self._load()
+    
+    def observe(self, running: Set[str], now: Optional[float] = None) -> Optional[Prediction]:
+        """Feed the current process-name set; returns a new prediction if one fires."""
+        now = time.time() if now is None else now
+        
+        if self._known is None:
+            # Everything already running at startup is not a launch.
+            self._known = set(running)
+            return None
+        
+        launched = running - self._known
+        self._known = set(running)
+        self._expire_launches(now)
+        
+        if not launched:
+            return None
+        
+        bucket = time_bucket(now)
+        best: Optional[Prediction] = None
+        for name in launched:
+            self._recent_launches.append((now, name))
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = LaunchStats()
+                self._stats[name] = stats
+            
+            # Judge on history before counting this launch.
+            candidate = self._predict(name, stats, bucket, now)
+            
+            stats.launches += 1
+            stats.bucket_launches[bucket] += 1
+            stats.last_seen = now
+            self._dirty = True
+            
+            if candidate and (best is None or candidate.confidence > best.confidence):
+                best = candidate
+        
+        self._evict()
+        
+        if best is not None:
+            self._active = best
+            logger.info(f"Predictive boost: {best.explain()}")
+        return best
+    
+    def record_sustained_load(self, load_started_at: float):
+        """Credit every launch in the lookback window before load_started_at."""
+        window_start = load_started_at - self.config.prediction_lookback_seconds
+        credited = {name for launched_at, name in self._recent_launches
+                    if window_start <= launched_at <= load_started_at}
+        
+        for name in credited:
+            stats = self._stats.get(name)
+            if stats is None or stats.boosts >= stats.launches:
+                continue
+            launched_at = max(t for t, n in self._recent_launches if n == name)
+            stats.boosts += 1
+            stats.bucket_boosts[time_bucket(launched_at)] += 1
+            self._dirty = True
+        
+        # A launch is credited at most once.
+        self._recent_launches = deque(
+            (t, n) for t, n in self._recent_launches if n not in credited
+        )
+        
+        if credited:
+            logger.debug(f"Sustained load credited to launches: {', '.join(sorted(credited))}")
+            self.save()
+    
+    def active_prediction(self, running: Set[str], now: Optional[float] = None) -> Optional[Prediction]:
+        now = time.time() if now is None else now
+        prediction = self._active
+        if prediction is None:
+            return None
+        if now >= prediction.expires_at or prediction.name not in running:
+            self._active = None
+            return None
+        return prediction
+    
+    def top_predictors(self, limit: int = 10) -> List[Tuple[str, float, int, int]]:
+        min_launches = self.config.prediction_min_launches
+        rows = [
+            (name, stats.boosts / stats.launches, stats.boosts, stats.launches)
+            for name, stats in self._stats.items()
+            if stats.launches >= min_launches
+        ]
+        rows.sort(key=lambda row: (row[1], row[3]), reverse=True)
+        return rows[:limit]
+    
+    def _predict(self, name: str, stats: LaunchStats, bucket: int, now: float) -> Optional[Prediction]:
+        min_launches = self.config.prediction_min_launches
+        if stats.launches < min_launches:
+            return None
+        
+        confidence, boosts, launches, used_bucket = stats.confidence(bucket, min_launches)
+        if confidence < self.config.prediction_min_confidence:
+            return None
+        
+        return Prediction(name, confidence, boosts, launches, used_bucket,
+                          now + self.config.prediction_boost_seconds)
+    
+    def _expire_launches(self, now: float):
+        cutoff = now - self.config.prediction_lookback_seconds
+        while self._recent_launches and self._recent_launches[0][0] < cutoff:
+            self._recent_launches.popleft()
+    
+    def _evict(self):
+        excess = len(self._stats) - self.config.prediction_max_entries
+        if excess <= 0:
+            return
+        oldest = sorted(self._stats.items(), key=lambda item: item[1].last_seen)[:excess]
+        for name, _ in oldest:
+            del self._stats[name]
+    
+    def _load(self):
+        if not self.model_path or not Path(self.model_path).exists():
+            return
+        
+        try:
+            with open(self.model_path, 'r') as f:
+                data = json.load(f)
+            if data.get("version") != MODEL_VERSION:
+                logger.warning(f"Ignoring launch model with unsupported version: {data.get('version')}")
+                return
+            self._stats = {
+                name: LaunchStats.from_dict(entry)
+                for name, entry in data.get("processes", {}).items()
+            }
+            self._evict()
+            logger.info(f"Loaded launch model with {len(self._stats)} processes")
+        except (json.JSONDecodeError, IOError, TypeError, ValueError) as e:
+            logger.warning(f"Error loading launch model: {e}")
+    
+    def save(self):
+        if not self.model_path or not self._dirty:
+            return
+        
+        path = Path(self.model_path)
+        data = {
+            "version": MODEL_VERSION,
+            "processes": {name: stats.to_dict() for name, stats in self._stats.items()}
+        }
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(path.suffix + '.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, path)
+            self._dirty = False
+        except IOError as e:
+            logger.warning(f"Error saving launch model: {e}")
+
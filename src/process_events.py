@@ -0,0 +1,268 @@
+import logging
+import os
+import platform
+import socket
+import struct
+from abc import ABC, abstractmethod
+from threading import Event, Thread
+from typing import Any, Callable, Iterable, Optional, Set
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+wmi = None
+pythoncom = None
+WMI_AVAILABLE = False
+if platform.system() == "Windows":
+    try:
+        import pythoncom as _pythoncom
+        import wmi as _wmi
+        wmi = _wmi
+        pythoncom = _pythoncom
+        WMI_AVAILABLE = True
+    except Exception:
+        pass
+
+# Linux kernel comm names are truncated to 15 bytes.
+COMM_LENGTH = 15
+
+NETLINK_CONNECTOR = 11
+CN_IDX_PROC = 1
+CN_VAL_PROC = 1
+NLMSG_DONE = 3
+PROC_CN_MCAST_LISTEN = 1
+PROC_CN_MCAST_IGNORE = 2
+PROC_EVENT_EXEC = 0x00000002
+
+_NLMSGHDR = struct.Struct("=IHHII")
+_CN_MSG = struct.Struct("=IIIIHH")
+_PROC_EVENT = struct.Struct("=IIQ")
+_EXEC_EVENT = struct.Struct("=II")
+
+ProcessCallback = Callable[[int, str], None]
+
+
+class ProcessEventSource(ABC):
+    """Reports process starts whose name is in `names` via callback(pid, name).
+
+    Runs on its own daemon thread. Names are lower-case; sources that only see
+    a truncated name match on that first and resolve the full name only for
+    candidates. If the source fails while running, `fallback` (when given)
+    builds a replacement source that is started in its place.
+    """
+    
+    name = "base"
+    
+    def __init__(self, names: Iterable[str], callback: ProcessCallback,
+                 fallback: Optional[Callable[[], 'ProcessEventSource']] = None):
+        self.names: Set[str] = {name.lower() for name in names}
+        self._prefixes: Set[str] = {name[:COMM_LENGTH] for name in self.names}
+        self.callback = callback
+        self.fallback = fallback
+        self.fallback_source: Optional[ProcessEventSource] = None
+        self._stop_event = Event()
+        self._thread: Optional[Thread] = None
+        self.events = 0
+    
+    def start(self):
+        self._stop_event.clear()
+        self._thread = Thread(target=self._run_safely, name=f'ProcessEvents-{self.name}', daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+        if self.fallback_source:
+            self.fallback_source.stop()
+            self.fallback_source = None
+    
+    def _run_safely(self):
+        try:
+            self._run()
+        except Exception as e:
+            if self.fallback is None or self._stop_event.is_set():
+                logger.error(f"Process event source {self.name} stopped: {e}")
+                return
+            source = self.fallback()
+            logger.error(f"Process event source {self.name} failed: {e}; switching to {source.name}")
+            self.fallback_source = source
+            source.start()
+    
+    @abstractmethod
+    def _run(self):
+        """Deliver events until _stop_event is set; raising hands over to the fallback."""
+    
+    def _report(self, pid: int, name: str):
+        if name in self.names:
+            self.events += 1
+            self.callback(pid, name)
+    
+    def _report_candidate(self, pid: int, short_name: str):
+        """Resolve the full name only when the (possibly truncated) name could match."""
+        if short_name.lower() not in self._prefixes:
+            return
+        try:
+            name = psutil.Process(pid).name().lower()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return
+        self._report(pid, name)
+
+
+class NetlinkProcSource(ProcessEventSource):
+    """Linux proc connector: exec events pushed by the kernel. Needs CAP_NET_ADMIN."""
+    
+    name = "netlink"
+    
+    def __init__(self, names: Iterable[str], callback: ProcessCallback, procfs_root: str = '/proc',
+                 fallback: Optional[Callable[[], ProcessEventSource]] = None):
+        super().__init__(names, callback, fallback)
+        self.procfs_root = procfs_root
+        self._socket: Optional[socket.socket] = None
+    
+    def open(self):
+        """Open and subscribe; raises OSError when not permitted so callers can fall back."""
+        sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_CONNECTOR)
+        try:
+            sock.bind((os.getpid(), CN_IDX_PROC))
+            sock.send(self._control_message(PROC_CN_MCAST_LISTEN))
+        except OSError:
+            sock.close()
+            raise
+        sock.settimeout(0.5)
+        self._socket = sock
+    
+    @staticmethod
+    def _control_message(operation: int) -> bytes:
+        payload = struct.pack("=I", operation)
+        cn_msg = _CN_MSG.pack(CN_IDX_PROC, CN_VAL_PROC, 0, 0, len(payload), 0) + payload
+        return _NLMSGHDR.pack(_NLMSGHDR.size + len(cn_msg), NLMSG_DONE, 0, 0, os.getpid()) + cn_msg
+    
+    def _run(self):
+        if self._socket is None:
+            self.open()
+        try:
+            while not self._stop_event.is_set():
+                try:
+                    data = self._socket.recv(4096)
+                except socket.timeout:
+                    continue
+                self.handle_message(data)
+        finally:
+            try:
+                self._socket.send(self._control_message(PROC_CN_MCAST_IGNORE))
+            except OSError:
+                pass
+            self._socket.close()
+            self._socket = None
+    
+    def handle_message(self, data: bytes):
+        offset = 0
+        while offset + _NLMSGHDR.size <= len(data):
+            length = _NLMSGHDR.unpack_from(data, offset)[0]
+            if length < _NLMSGHDR.size:
+                break
+            body = offset + _NLMSGHDR.size + _CN_MSG.size
+            if body + _PROC_EVENT.size + _EXEC_EVENT.size <= offset + length:
+                what = _PROC_EVENT.unpack_from(data, body)[0]
+                if what == PROC_EVENT_EXEC:
+                    pid, tgid = _EXEC_EVENT.unpack_from(data, body + _PROC_EVENT.size)
+                    if pid == tgid:
+                        self._report_comm(pid)
+            offset += (length + 3) & ~3
+    
+    def _report_comm(self, pid: int):
+        try:
+            with open(os.path.join(self.procfs_root, str(pid), 'comm'), 'r') as f:
+                comm = f.read().strip()
+        except OSError:
+            return
+        self._report_candidate(pid, comm)
+
+
+class PollingSource(ProcessEventSource):
+    """Fallback: diff the PID list every pollIntervalMs and name only new PIDs.
+
+    Each poll goes through overhead.run('processEvents.poll', ...) when an
+    OverheadMonitor is given, so its cost counts against the sampler budget
+    and an over-budget poll is strided like any other sampler. A skipped
+    poll loses nothing: the next one diffs against the last PID list.
+    """
+    
+    name = "poll"
+    meter = "processEvents.poll"
+    
+    def __init__(self, names: Iterable[str], callback: ProcessCallback, interval_ms: float,
+                 overhead: Optional[Any] = None):
+        super().__init__(names, callback)
+        self.interval = interval_ms / 1000.0
+        self.overhead = overhead
+        self._known: Set[int] = set()
+    
+    def _run(self):
+        self._known = set(psutil.pids())
+        while not self._stop_event.wait(self.interval):
+            if self.overhead is not None:
+                self.overhead.run(self.meter, self.poll)
+            else:
+                self.poll()
+    
+    def poll(self) -> bool:
+        current = set(psutil.pids())
+        for pid in current - self._known:
+            try:
+                name = psutil.Process(pid).name().lower()
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+            self._report(pid, name)
+        self._known = current
+        return True
+
+
+class WmiProcessStartSource(ProcessEventSource):
+    """Windows Win32_ProcessStartTrace events. Needs the wmi package and administrator rights."""
+    
+    name = "wmi"
+    
+    def _run(self):
+        pythoncom.CoInitialize()
+        try:
+            watcher = wmi.WMI().watch_for(raw_wql="SELECT ProcessID, ProcessName FROM Win32_ProcessStartTrace")
+            while not self._stop_event.is_set():
+                try:
+                    event = watcher(timeout_ms=500)
+                except wmi.x_wmi_timed_out:
+                    continue
+                self._report(int(event.ProcessID), str(event.ProcessName).lower())
+        finally:
+            pythoncom.CoUninitialize()
+
+
+def create_event_source(config, names: Iterable[str], callback: ProcessCallback,
+                        overhead: Optional[Any] = None) -> ProcessEventSource:
+    """Pick the configured source, falling back to PID polling (metered by `overhead`) when it is unavailable."""
+    source = config.process_events_source
+    names = list(names)
+    
+    def polling() -> PollingSource:
+        if overhead is not None:
+            overhead.register(PollingSource.meter)
+        return PollingSource(names, callback, config.process_events_poll_interval_ms, overhead)
+    
+    if source in ("auto", "netlink") and platform.system() == "Linux":
+        netlink = NetlinkProcSource(names, callback, fallback=polling)
+        try:
+            netlink.open()
+            return netlink
+        except OSError as e:
+            logger.info(f"Netlink proc connector unavailable ({e}); polling for process starts")
+    
+    if source in ("auto", "wmi") and platform.system() == "Windows":
+        if WMI_AVAILABLE:
+            # A COM error or lost rights at runtime hands over to polling instead of ending the fast path.
+            return WmiProcessStartSource(names, callback, fallback=polling)
+        logger.info("wmi package not installed; polling for process starts")
+    
+    return polling()
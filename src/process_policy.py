@@ -0,0 +1,230 @@
+import logging
+import os
+from typing import Any, Callable, Dict, List, Optional, Set
+
+import psutil
+
+from .cpu_cores import parse_core_list
+
+logger = logging.getLogger(__name__)
+
+WATCHED_GAMES = "$watched"
+
+if psutil.WINDOWS:
+    PRIORITY_LEVELS = {
+        "idle": psutil.IDLE_PRIORITY_CLASS,
+        "belowNormal": psutil.BELOW_NORMAL_PRIORITY_CLASS,
+        "normal": psutil.NORMAL_PRIORITY_CLASS,
+        "aboveNormal": psutil.ABOVE_NORMAL_PRIORITY_CLASS,
+        "high": psutil.HIGH_PRIORITY_CLASS
+    }
+else:
+    # Lowering a nice value below the current one needs CAP_SYS_NICE on Linux.
+    PRIORITY_LEVELS = {
+        "idle": 19,
+        "belowNormal": 10,
+        "normal": 0,
+        "aboveNormal": -5,
+        "high": -10
+    }
+
+AFFINITY_SUPPORTED = hasattr(psutil.Process, 'cpu_affinity')
+
+CAP_SYS_NICE = 23
+
+
+def lowest_settable_nice() -> int:
+    """Lowest nice value this process may set on POSIX: -20 with CAP_SYS_NICE, else what RLIMIT_NICE allows.
+
+    Without that privilege a nice value can only go up, so lowering a
+    process's priority could never be undone.
+    """
+    if os.geteuid() == 0:
+        return -20
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('CapEff:') and int(line.split()[1], 16) & (1 << CAP_SYS_NICE):
+                    return -20
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        limit = resource.getrlimit(resource.RLIMIT_NICE)[0]
+    except (ImportError, AttributeError, OSError, ValueError):
+        return 20
+    if limit == resource.RLIM_INFINITY:
+        return -20
+    return max(-20, 20 - limit)
+
+
+class PolicyRule:
+    def __init__(self, spec: Dict[str, Any], watched_games: List[str], core_count: int):
+        match = spec.get("match", [])
+        if match == WATCHED_GAMES:
+            match = watched_games
+        elif isinstance(match, str):
+            match = [match]
+        self.names: Set[str] = {name.lower() for name in match}
+        self.priority: Optional[int] = None
+        self.affinity: Optional[List[int]] = None
+        
+        priority = spec.get("priority")
+        if priority is not None:
+            if priority in PRIORITY_LEVELS:
+                self.priority = PRIORITY_LEVELS[priority]
+            else:
+                logger.warning(f"Unknown priority '{priority}' in process policy; expected one of "
+                               f"{', '.join(PRIORITY_LEVELS)}")
+        
+        affinity = spec.get("affinity")
+        if affinity is not None:
+            if not AFFINITY_SUPPORTED:
+                logger.warning("CPU affinity is not supported on this platform; ignoring it in process policy")
+            else:
+                cores = list(parse_core_list(affinity, core_count))
+                self.affinity = cores or None
+
+
+class AppliedChange:
+    """Original settings of a process the policy changed, for restoring it later."""
+    
+    __slots__ = ('process', 'name', 'create_time', 'nice', 'affinity')
+    
+    def __init__(self, process: psutil.Process, name: str, create_time: float,
+                 nice: Optional[int], affinity: Optional[List[int]]):
+        self.process = process
+        self.name = name
+        self.create_time = create_time
+        self.nice = nice
+        self.affinity = affinity
+
+
+class ProcessPolicy:
+    """Adjusts priority and CPU affinity of matched processes while boosted.
+
+    Rules match process names; the special match "$watched" means the
+    configured game list. Each tick only PIDs that appeared or disappeared
+    since the previous tick are touched. Original priority and affinity are
+    restored when the boost ends and on exit. A PID whose create time no
+    longer matches has been reused and is left alone. On POSIX, a nice
+    change is skipped when the original value could not be set again.
+    """
+    
+    def __init__(self, config, process_factory: Callable[[int], psutil.Process] = psutil.Process):
+        self.config = config
+        self._process = process_factory
+        core_count = psutil.cpu_count(logical=True) or 1
+        self.rules = [PolicyRule(spec, config.watched_games, core_count) for spec in config.process_policy_rules]
+        self._by_name: Dict[str, PolicyRule] = {}
+        for rule in reversed(self.rules):
+            for name in rule.names:
+                self._by_name[name] = rule
+        self._applied: Dict[int, AppliedChange] = {}
+        self._failed: Set[int] = set()
+        self._active = False
+        self._lowest_nice = -20 if psutil.WINDOWS else lowest_settable_nice()
+        self._irreversible_logged: Set[str] = set()
+    
+    def update(self, active: bool, processes: Dict[int, str]):
+        """processes maps PID to lower-case name for everything currently running."""
+        if not active:
+            if self._active:
+                self.restore_all()
+            return
+        
+        if not self._active:
+            self._active = True
+            logger.info("Process policy active")
+        
+        targets = {pid: self._by_name[name] for pid, name in processes.items() if name in self._by_name}
+        
+        for pid in [pid for pid in self._applied if pid not in targets]:
+            del self._applied[pid]
+        self._failed &= targets.keys()
+        
+        for pid, rule in targets.items():
+            if pid not in self._applied and pid not in self._failed:
+                self._apply(pid, processes[pid], rule)
+    
+    def _apply(self, pid: int, name: str, rule: PolicyRule):
+        try:
+            process = self._process(pid)
+            with process.oneshot():
+                create_time = process.create_time()
+                original_nice = process.nice() if rule.priority is not None else None
+                original_affinity = process.cpu_affinity() if rule.affinity is not None else None
+        except (psutil.NoSuchProcess, psutil.AccessDenied, OSError) as e:
+            logger.debug(f"Cannot read {name}({pid}) for process policy: {e}")
+            self._failed.add(pid)
+            return
+        
+        # Each change is only remembered for restore once it has succeeded.
+        if (rule.priority is None or original_nice == rule.priority
+                or not self._reversible(original_nice, rule, name)
+                or not self._set(process, 'nice', rule.priority, name, pid)):
+            original_nice = None
+        if rule.affinity is None or sorted(original_affinity) == rule.affinity or not self._set(
+                process, 'cpu_affinity', rule.affinity, name, pid):
+            original_affinity = None
+        
+        self._applied[pid] = AppliedChange(process, name, create_time, original_nice, original_affinity)
+        if original_nice is not None or original_affinity is not None:
+            logger.info(f"Process policy applied to {name}({pid})"
+                        + (f" priority {original_nice}->{rule.priority}" if original_nice is not None else "")
+                        + (f" affinity ->{rule.affinity}" if original_affinity is not None else ""))
+    
+    def _reversible(self, original_nice: int, rule: PolicyRule, name: str) -> bool:
+        if psutil.WINDOWS or min(original_nice, rule.priority) >= self._lowest_nice:
+            return True
+        if name not in self._irreversible_logged:
+            self._irreversible_logged.add(name)
+            logger.warning(f"Not changing the priority of {name}: nice {original_nice}->{rule.priority} "
+                           f"could not be undone without CAP_SYS_NICE (lowest settable nice is {self._lowest_nice})")
+        return False
+    
+    @staticmethod
+    def _set(process: psutil.Process, method: str, value, name: str, pid: int) -> bool:
+        try:
+            getattr(process, method)(value)
+            return True
+        except (psutil.NoSuchProcess, psutil.AccessDenied, OSError) as e:
+            logger.debug(f"Cannot set {method} of {name}({pid}): {e}")
+            return False
+    
+    def restore_all(self):
+        restored = 0
+        for pid, change in self._applied.items():
+            if self._restore(pid, change):
+                restored += 1
+        if self._active:
+            logger.info(f"Process policy released; restored {restored} process(es)")
+        self._applied.clear()
+        self._failed.clear()
+        self._active = False
+    
+    def _restore(self, pid: int, change: AppliedChange) -> bool:
+        if change.nice is None and change.affinity is None:
+            return False
+        try:
+            # psutil caches create_time() per Process object, so only a fresh one can reveal a reused PID.
+            if self._process(pid).create_time() != change.create_time:
+                logger.debug(f"Not restoring {change.name}({pid}): the PID now belongs to another process")
+                return False
+            if change.nice is not None:
+                change.process.nice(change.nice)
+            if change.affinity is not None:
+                change.process.cpu_affinity(change.affinity)
+            return True
+        except psutil.NoSuchProcess:
+            return False
+        except (psutil.AccessDenied, OSError) as e:
+            logger.warning(f"Cannot restore priority/affinity of {change.name}({pid}): {e}")
+            return False
+    
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "active": self._active,
+            "managed": sum(1 for c in list(self._applied.values()) if c.nice is not None or c.affinity is not None),
+            "failed": len(self._failed)
+        }
@@ -0,0 +1,219 @@
+import logging
+import platform
+import re
+import subprocess
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SUBPROCESS_FLAGS = subprocess.CREATE_NO_WINDOW if platform.system() == "Windows" else 0
+
+SCHEME_CURRENT = "SCHEME_CURRENT"
+SUB_PROCESSOR = "54533251-82be-4824-96c1-47b60b740d00"
+
+# Config name -> powercfg setting GUID (alias in the comment).
+PROCESSOR_SETTINGS = {
+    "minProcessorState": "893dee8e-2bef-41e0-89c6-b55d0929964c",    # PROCTHROTTLEMIN
+    "maxProcessorState": "bc5038f7-23e0-4960-96da-33abaf5935ec",    # PROCTHROTTLEMAX
+    "boostMode": "be337238-0d82-4146-a960-4f3749d470c7",            # PERFBOOSTMODE
+    "epp": "36687f9e-e3a5-4dbf-b1dc-15eb381c6863",                  # PERFEPP
+    "coreParkingMinCores": "0cc5b647-c1df-4637-891a-dec35c318583"   # CPMINCORES
+}
+
+BOOST_MODES = {
+    "disabled": 0,
+    "enabled": 1,
+    "aggressive": 2,
+    "efficientEnabled": 3,
+    "efficientAggressive": 4,
+    "aggressiveAtGuaranteed": 5,
+    "efficientAggressiveAtGuaranteed": 6
+}
+
+POWER_SOURCES = {"ac": "/setacvalueindex", "dc": "/setdcvalueindex"}
+
+# Labels are localized ("Power Setting GUID:", "GUID der Energieeinstellung:"), so match any "label: <guid>".
+_GUID_LINE = re.compile(r':\s*([0-9a-fA-F]{8}-(?:[0-9a-fA-F]{4}-){3}[0-9a-fA-F]{12})\b')
+_HEX_VALUE = re.compile(r':\s*0x([0-9a-fA-F]+)\s*$')
+
+
+def parse_query_output(output: str) -> Dict[Tuple[str, str], int]:
+    """Parse `powercfg /qh` output into {(setting guid, 'ac'|'dc'): value}.
+
+    Labels are localized, so each setting block is read positionally: the
+    last two hex values in a block are the current AC and DC indexes.
+    """
+    values: Dict[Tuple[str, str], int] = {}
+    current: Optional[str] = None
+    hex_values: List[int] = []
+    
+    def close_block():
+        if current and len(hex_values) >= 2:
+            values[(current, "ac")] = hex_values[-2]
+            values[(current, "dc")] = hex_values[-1]
+    
+    for line in output.splitlines():
+        guid = _GUID_LINE.search(line)
+        if guid:
+            close_block()
+            current = guid.group(1).lower()
+            hex_values = []
+            continue
+        match = _HEX_VALUE.search(line)
+        if match and current:
+            hex_values.append(int(match.group(1), 16))
+    close_block()
+    return values
+
+
+class PowercfgRunner:
+    """Runs powercfg; a batch of commands shares a single cmd.exe process."""
+    
+    def query(self) -> Optional[str]:
+        try:
+            result = subprocess.run(
+                ['powercfg', '/qh', SCHEME_CURRENT, SUB_PROCESSOR],
+                capture_output=True,
+                text=True,
+                timeout=10,
+                creationflags=SUBPROCESS_FLAGS
+            )
+        except Exception as e:
+            logger.error(f"Error querying processor settings: {e}")
+            return None
+        return result.stdout if result.returncode == 0 else None
+    
+    def run_batch(self, commands: List[List[str]]) -> bool:
+        script = " && ".join(" ".join(['powercfg'] + args) for args in commands)
+        try:
+            result = subprocess.run(
+                ['cmd', '/d', '/c', script],
+                capture_output=True,
+                text=True,
+                timeout=10 + 2 * len(commands),
+                creationflags=SUBPROCESS_FLAGS
+            )
+        except Exception as e:
+            logger.error(f"Error applying processor settings: {e}")
+            return False
+        if result.returncode != 0:
+            logger.error(f"powercfg batch failed: {result.stderr.strip() or result.stdout.strip()}")
+            return False
+        return True
+
+
+class RecordingPowercfg:
+    """Stand-in for PowercfgRunner that records batches and keeps values in memory.
+
+    Used on non-Windows systems as a simulation and in tests to assert which
+    commands would have been issued.
+    """
+    
+    def __init__(self, values: Optional[Dict[Tuple[str, str], int]] = None):
+        self.values: Dict[Tuple[str, str], int] = dict(values or {})
+        self.batches: List[List[List[str]]] = []
+        self.queries = 0
+    
+    def query(self) -> Optional[str]:
+        self.queries += 1
+        lines = []
+        for guid in sorted({guid for guid, _ in self.values}):
+            lines.append(f"    Power Setting GUID: {guid}")
+            for source in ("ac", "dc"):
+                if (guid, source) in self.values:
+                    lines.append(f"    Current {source.upper()} Power Setting Index: 0x{self.values[(guid, source)]:08x}")
+        return "\n".join(lines)
+    
+    def run_batch(self, commands: List[List[str]]) -> bool:
+        self.batches.append([list(args) for args in commands])
+        for args in commands:
+            if args[0] in POWER_SOURCES.values():
+                source = "ac" if args[0] == "/setacvalueindex" else "dc"
+                self.values[(args[3].lower(), source)] = int(args[4])
+        logger.info(f"[Simulated] powercfg batch: {'; '.join(' '.join(args) for args in commands)}")
+        return True
+
+
+def resolve_settings(state_settings: Dict) -> Dict[str, int]:
+    """Validate one state's settings block into {setting guid: index value}."""
+    resolved = {}
+    for name, value in state_settings.items():
+        guid = PROCESSOR_SETTINGS.get(name)
+        if guid is None:
+            logger.warning(f"Unknown processor setting '{name}' ignored")
+            continue
+        if name == "boostMode" and isinstance(value, str):
+            if value not in BOOST_MODES:
+                logger.warning(f"Unknown boostMode '{value}' ignored")
+                continue
+            value = BOOST_MODES[value]
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            logger.warning(f"Invalid value for processor setting '{name}': {value!r}")
+            continue
+        if name != "boostMode":
+            value = max(0, min(100, value))
+        resolved[guid] = value
+    return resolved
+
+
+class ProcessorSettingsController:
+    """Applies per-state processor settings to the active plan.
+
+    Only values that differ from the last known ones are written, as one
+    batch of /setacvalueindex and /setdcvalueindex commands followed by a
+    single /setactive. Current values are queried once and then tracked.
+    """
+    
+    def __init__(self, config, runner=None):
+        self.config = config
+        self.runner = runner or PowercfgRunner()
+        self._current: Optional[Dict[Tuple[str, str], int]] = None
+        self.applied_batches = 0
+    
+    def refresh(self) -> bool:
+        output = self.runner.query()
+        if output is None:
+            return False
+        self._current = parse_query_output(output)
+        return True
+    
+    def pending_changes(self, boost: bool) -> List[Tuple[str, str, int]]:
+        desired = resolve_settings(self.config.processor_settings_for(boost))
+        current = self._current or {}
+        changes = []
+        for source in self.config.processor_power_sources:
+            if source not in POWER_SOURCES:
+                continue
+            for guid, value in desired.items():
+                if current.get((guid, source)) != value:
+                    changes.append((guid, source, value))
+        return changes
+    
+    def apply(self, boost: bool, refresh: bool = False) -> Optional[int]:
+        """Apply the settings for a state. Returns the number of values changed, or None on failure."""
+        if (refresh or self._current is None) and not self.refresh():
+            logger.warning("Could not read current processor settings; applying all values")
+            self._current = {}
+        
+        changes = self.pending_changes(boost)
+        if not changes:
+            logger.debug("Processor settings already match")
+            return 0
+        
+        commands = [[POWER_SOURCES[source], SCHEME_CURRENT, SUB_PROCESSOR, guid, str(value)]
+                    for guid, source, value in changes]
+        commands.append(['/setactive', SCHEME_CURRENT])
+        if not self.runner.run_batch(commands):
+            # The batch may have been applied partially; re-read next time.
+            self._current = None
+            return None
+        
+        for guid, source, value in changes:
+            self._current[(guid, source)] = value
+        self.applied_batches += 1
+        names = {guid: name for name, guid in PROCESSOR_SETTINGS.items()}
+        logger.info(f"Applied {len(changes)} processor setting(s) for {'BOOST' if boost else 'NORMAL'}: "
+                    + ", ".join(f"{names[guid]}/{source}={value}" for guid, source, value in changes))
+        return len(changes)
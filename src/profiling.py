@@ -0,0 +1,172 @@
+import cProfile
+import logging
+import os
+import pstats
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Event, Lock, Thread, current_thread, get_ident
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def collapse_stack(frame) -> str:
+    """Render a frame chain root-first as "a (x.py:1);b (y.py:7)", the collapsed-stack format."""
+    labels: List[str] = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return ";".join(labels)
+
+
+class TickProfiler:
+    """Profiles the monitor thread and the actuator worker threads for a number of monitor ticks.
+    
+    cProfile is enabled on the monitor thread only between tick_started() and
+    tick_finished(), and on a worker thread only inside profiled_section()
+    (the service restart and fan file write), so idle waits are not counted.
+    A sampler thread records the stacks of whichever of those threads are
+    busy every sampleIntervalMs for the collapsed-stack output; it sleeps
+    while none is. Nothing is installed until the first tick_started() and
+    everything is removed after the last tick.
+    """
+    
+    def __init__(self, ticks: int, output_dir: Path, sample_interval_ms: float):
+        self.ticks = max(1, ticks)
+        self.output_dir = Path(output_dir)
+        self.sample_interval = sample_interval_ms / 1000.0
+        self.completed = 0
+        self._profile = cProfile.Profile()
+        self._worker_profiles: List[cProfile.Profile] = []
+        self._stacks: Counter = Counter()
+        self._lock = Lock()
+        self._thread_id: Optional[int] = None
+        self._busy: Dict[int, str] = {}
+        self._busy_event = Event()
+        self._stop_event = Event()
+        self._sampler: Optional[Thread] = None
+        self._started = 0.0
+        self._finished = False
+    
+    def tick_started(self):
+        global _active
+        if self._thread_id is None:
+            self._thread_id = get_ident()
+            self._started = time.monotonic()
+            self._sampler = Thread(target=self._sample, name='ProfileSampler', daemon=True)
+            self._sampler.start()
+            _active = self
+            logger.info(f"Profiling the monitor for {self.ticks} ticks")
+        self._set_busy(self._thread_id, current_thread().name)
+        self._profile.enable()
+    
+    def tick_finished(self) -> bool:
+        """End the current tick; returns True once the requested ticks are done and the files are written."""
+        self._profile.disable()
+        self._set_busy(self._thread_id, None)
+        self.completed += 1
+        if self.completed < self.ticks:
+            return False
+        self.finish()
+        return True
+    
+    def section_started(self) -> Optional[cProfile.Profile]:
+        """Start profiling the calling worker thread; returns None once profiling has finished."""
+        if self._finished:
+            return None
+        profile = cProfile.Profile()
+        self._set_busy(get_ident(), current_thread().name)
+        profile.enable()
+        return profile
+    
+    def section_finished(self, profile: cProfile.Profile):
+        profile.disable()
+        self._set_busy(get_ident(), None)
+        with self._lock:
+            if not self._finished:
+                self._worker_profiles.append(profile)
+    
+    def _set_busy(self, thread_id: int, name: Optional[str]):
+        with self._lock:
+            if name is None:
+                self._busy.pop(thread_id, None)
+            else:
+                self._busy[thread_id] = name
+            if self._busy or self._stop_event.is_set():
+                self._busy_event.set()
+            else:
+                self._busy_event.clear()
+    
+    def finish(self):
+        global _active
+        self._profile.disable()
+        if _active is self:
+            _active = None
+        with self._lock:
+            self._finished = True
+            self._busy.clear()
+            self._stop_event.set()
+            self._busy_event.set()
+        if self._sampler:
+            self._sampler.join(timeout=2)
+            self._sampler = None
+        if self.completed == 0:
+            return
+        try:
+            paths = self.write()
+        except OSError as e:
+            logger.error(f"Writing profile to {self.output_dir} failed: {e}")
+            return
+        logger.info(f"Profiled {self.completed} ticks over {time.monotonic() - self._started:.0f}s: "
+                    f"{paths[0]} and {paths[1]}")
+    
+    def _sample(self):
+        while not self._stop_event.is_set():
+            # Blocks between ticks and sections instead of waking every interval.
+            self._busy_event.wait()
+            with self._lock:
+                busy = list(self._busy.items())
+            frames = sys._current_frames()
+            for thread_id, name in busy:
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    self._stacks[f"{name};{collapse_stack(frame)}"] += 1
+            self._stop_event.wait(self.sample_interval)
+    
+    def write(self) -> Tuple[Path, Path]:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        stem = self.output_dir / f"monitor-{time.strftime('%Y%m%d-%H%M%S')}"
+        pstats_path = stem.with_suffix('.pstats')
+        collapsed_path = stem.with_suffix('.collapsed')
+        stats = pstats.Stats(self._profile)
+        for profile in self._worker_profiles:
+            stats.add(profile)
+        stats.dump_stats(str(pstats_path))
+        with open(collapsed_path, 'w') as f:
+            for stack, count in self._stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        return pstats_path, collapsed_path
+
+
+_active: Optional[TickProfiler] = None
+
+
+@contextmanager
+def profiled_section():
+    """Profile the calling worker thread for the duration of the block while a TickProfiler runs."""
+    profiler = _active
+    profile = profiler.section_started() if profiler is not None else None
+    try:
+        yield
+    finally:
+        if profile is not None:
+            profiler.section_finished(profile)
@@ -0,0 +1,87 @@
+import time
+from typing import Dict
+
+
+class AdaptiveInterval:
+    """Chooses the next sampling interval from how close metrics are to a threshold.
+
+    Far below every threshold (and with nothing pending) the interval backs off
+    gradually toward maxIntervalMs; near a threshold, while a hold timer runs or
+    while boosted it snaps straight back to minIntervalMs.
+    """
+    
+    BACKOFF_FACTOR = 1.5
+    
+    def __init__(self, config):
+        self.config = config
+        self._current_ms = float(config.sampling_min_interval_ms)
+    
+    def next_interval_ms(self, headroom: float, urgent: bool) -> float:
+        """headroom is the smallest distance below any threshold, in percentage points."""
+        if not self.config.adaptive_sampling:
+            return float(self.config.sampling_interval_ms)
+        
+        min_ms = float(self.config.sampling_min_interval_ms)
+        max_ms = float(self.config.sampling_max_interval_ms)
+        
+        if urgent:
+            self._current_ms = min_ms
+            return self._current_ms
+        
+        near = self.config.sampling_near_margin_percent
+        far = self.config.sampling_far_margin_percent
+        
+        if headroom <= near:
+            target = min_ms
+        elif headroom >= far:
+            target = max_ms
+        else:
+            target = min_ms + (max_ms - min_ms) * (headroom - near) / (far - near)
+        
+        if target <= self._current_ms:
+            self._current_ms = target
+        else:
+            self._current_ms = min(target, self._current_ms * self.BACKOFF_FACTOR)
+        return self._current_ms
+
+
+class SamplingStats:
+    """Tracks the monitor loop's own cost and the ticks saved versus a fixed interval."""
+    
+    def __init__(self, fixed_interval_ms: float):
+        self.fixed_interval_ms = fixed_interval_ms
+        self.reset()
+    
+    def reset(self):
+        self._started = time.monotonic()
+        self.ticks = 0
+        self.busy_wall = 0.0
+        self.busy_cpu = 0.0
+        self.interval_total_ms = 0.0
+        self.last_interval_ms = 0.0
+    
+    def record_tick(self, wall: float, cpu: float, interval_ms: float):
+        self.ticks += 1
+        self.busy_wall += wall
+        self.busy_cpu += cpu
+        self.interval_total_ms += interval_ms
+        self.last_interval_ms = interval_ms
+    
+    def snapshot(self) -> Dict[str, float]:
+        elapsed = max(time.monotonic() - self._started, 1e-9)
+        fixed_ticks = elapsed * 1000.0 / self.fixed_interval_ms if self.fixed_interval_ms > 0 else 0.0
+        return {
+            "elapsedSeconds": elapsed,
+            "ticks": self.ticks,
+            "lastIntervalMs": self.last_interval_ms,
+            "avgIntervalMs": self.interval_total_ms / self.ticks if self.ticks else 0.0,
+            "avgTickMs": self.busy_wall / self.ticks * 1000.0 if self.ticks else 0.0,
+            "cpuPercentOfCore": self.busy_cpu / elapsed * 100.0,
+            "ticksSavedPercent": max(0.0, 100.0 * (1.0 - self.ticks / fixed_ticks)) if fixed_ticks else 0.0
+        }
+
+
+def format_sampling_stats(stats: Dict[str, float]) -> str:
+    return (f"{stats['ticks']} ticks, avg interval {stats['avgIntervalMs']:.0f}ms, "
+            f"avg tick {stats['avgTickMs']:.1f}ms, {stats['cpuPercentOfCore']:.3f}% of one core, "
+            f"{stats['ticksSavedPercent']:.0f}% fewer ticks than fixed interval")
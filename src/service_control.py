@@ -0,0 +1,286 @@
+import logging
+import platform
+import shutil
+import subprocess
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+win32service = None
+win32serviceutil = None
+PYWIN32_AVAILABLE = False
+if platform.system() == "Windows":
+    try:
+        import win32service as _win32service
+        import win32serviceutil as _win32serviceutil
+        win32service = _win32service
+        win32serviceutil = _win32serviceutil
+        PYWIN32_AVAILABLE = True
+    except Exception:
+        pass
+
+SUBPROCESS_FLAGS = subprocess.CREATE_NO_WINDOW if platform.system() == "Windows" else 0
+
+STOPPED = "stopped"
+START_PENDING = "startPending"
+STOP_PENDING = "stopPending"
+RUNNING = "running"
+UNKNOWN = "unknown"
+
+# SERVICE_STATUS.dwCurrentState values; the paused states count as running for a restart.
+WINDOWS_STATES = {1: STOPPED, 2: START_PENDING, 3: STOP_PENDING, 4: RUNNING, 5: START_PENDING,
+                  6: STOP_PENDING, 7: RUNNING}
+SYSTEMD_STATES = {"active": RUNNING, "reloading": RUNNING, "inactive": STOPPED, "failed": STOPPED,
+                  "activating": START_PENDING, "deactivating": STOP_PENDING}
+
+
+class ServiceBackend:
+    """Queries a service and issues non-blocking start/stop requests; ServiceController does the waiting.
+
+    query() returns UNKNOWN when the service does not exist or cannot be
+    queried. A request that is rejected raises.
+    """
+    
+    name = "base"
+    
+    def query(self, service: str) -> str:
+        raise NotImplementedError
+    
+    def request_stop(self, service: str):
+        raise NotImplementedError
+    
+    def request_start(self, service: str):
+        raise NotImplementedError
+
+
+class WindowsServiceBackend(ServiceBackend):
+    """Service Control Manager via pywin32 when installed, otherwise sc.exe.
+
+    Unlike `net stop`/`net start`, both only send the control request and
+    return at once.
+    """
+    
+    name = "windows"
+    
+    def query(self, service: str) -> str:
+        if PYWIN32_AVAILABLE:
+            return WINDOWS_STATES.get(win32serviceutil.QueryServiceStatus(service)[1], UNKNOWN)
+        result = self._sc('query', service)
+        for line in result.stdout.splitlines():
+            key, _, value = line.partition(':')
+            if key.strip() == 'STATE':
+                code = value.split()[0] if value.split() else ""
+                return WINDOWS_STATES.get(int(code), UNKNOWN) if code.isdigit() else UNKNOWN
+        return UNKNOWN
+    
+    def request_stop(self, service: str):
+        if PYWIN32_AVAILABLE:
+            win32serviceutil.ControlService(service, win32service.SERVICE_CONTROL_STOP)
+        else:
+            _check(self._sc('stop', service))
+    
+    def request_start(self, service: str):
+        if PYWIN32_AVAILABLE:
+            win32serviceutil.StartService(service)
+        else:
+            _check(self._sc('start', service))
+    
+    @staticmethod
+    def _sc(command: str, service: str) -> subprocess.CompletedProcess:
+        return subprocess.run(['sc', command, service], capture_output=True, text=True, timeout=5,
+                              creationflags=SUBPROCESS_FLAGS)
+
+
+class SystemdServiceBackend(ServiceBackend):
+    """systemd units via systemctl --no-block; user=True manages user units, which need no root."""
+    
+    name = "systemd"
+    
+    def __init__(self, user: bool = False):
+        self.scope = ['--user'] if user else []
+    
+    def query(self, service: str) -> str:
+        result = subprocess.run(['systemctl', *self.scope, 'show', '-p', 'ActiveState', '--value', service],
+                                capture_output=True, text=True, timeout=5)
+        return SYSTEMD_STATES.get(result.stdout.strip(), UNKNOWN)
+    
+    def request_stop(self, service: str):
+        _check(subprocess.run(['systemctl', *self.scope, '--no-block', 'stop', service],
+                              capture_output=True, text=True, timeout=5))
+    
+    def request_start(self, service: str):
+        _check(subprocess.run(['systemctl', *self.scope, '--no-block', 'start', service],
+                              capture_output=True, text=True, timeout=5))
+
+
+def _check(result: subprocess.CompletedProcess):
+    if result.returncode != 0:
+        output = (result.stderr or result.stdout or "").strip().splitlines()
+        raise OSError(f"{' '.join(result.args)} exited with {result.returncode}"
+                      + (f": {output[-1].strip()}" if output else ""))
+
+
+class SimulatedServiceBackend(ServiceBackend):
+    """In-memory service that takes stop_seconds to stop and start_seconds to start."""
+    
+    name = "simulated"
+    
+    def __init__(self, stop_seconds: float = 0.0, start_seconds: float = 0.0,
+                 clock: Callable[[], float] = time.monotonic, state: str = RUNNING):
+        self.stop_seconds = stop_seconds
+        self.start_seconds = start_seconds
+        self.clock = clock
+        self._state = state
+        self._pending_until = 0.0
+        self.requests = []
+        self.queries = 0
+    
+    def query(self, service: str) -> str:
+        self.queries += 1
+        if self._state in (STOP_PENDING, START_PENDING) and self.clock() >= self._pending_until:
+            self._state = STOPPED if self._state == STOP_PENDING else RUNNING
+        return self._state
+    
+    def request_stop(self, service: str):
+        self.requests.append(('stop', service))
+        if self._state == UNKNOWN:
+            raise OSError(f"service {service} does not exist")
+        if self.query(service) in (RUNNING, START_PENDING):
+            self._state = STOP_PENDING
+            self._pending_until = self.clock() + self.stop_seconds
+    
+    def request_start(self, service: str):
+        self.requests.append(('start', service))
+        if self._state == UNKNOWN:
+            raise OSError(f"service {service} does not exist")
+        if self.query(service) == STOPPED:
+            self._state = START_PENDING
+            self._pending_until = self.clock() + self.start_seconds
+
+
+class RestartResult:
+    __slots__ = ('ok', 'stop_seconds', 'start_seconds', 'state', 'error')
+    
+    def __init__(self, ok: bool, stop_seconds: float, start_seconds: float, state: str,
+                 error: Optional[str] = None):
+        self.ok = ok
+        self.stop_seconds = stop_seconds
+        self.start_seconds = start_seconds
+        self.state = state
+        self.error = error
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "ok": self.ok,
+            "stopSeconds": self.stop_seconds,
+            "startSeconds": self.start_seconds,
+            "state": self.state,
+            "error": self.error
+        }
+
+
+class ServiceController:
+    """Restarts a service by polling its state instead of trusting fixed timeouts.
+
+    Polling starts at poll_seconds and backs off to 4x that. The start is
+    requested as soon as the service reports stopped, and the whole restart
+    is bounded by deadline_seconds. A service that cannot be queried, or a
+    rejected request that leaves the service where it was, fails at once
+    instead of polling until the deadline. during_stop() (e.g. writing the
+    fan config) runs right after the stop request, overlapping the stop
+    phase; if it fails the service is still started again before the error
+    is re-raised.
+    """
+    
+    def __init__(self, backend: ServiceBackend, poll_seconds: float = 0.05, deadline_seconds: float = 20.0,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self.backend = backend
+        self.poll_seconds = poll_seconds
+        self.deadline_seconds = deadline_seconds
+        self.clock = clock
+        self.sleep = sleep
+    
+    def restart(self, service: str, during_stop: Optional[Callable[[], None]] = None) -> RestartResult:
+        started = self.clock()
+        deadline = started + self.deadline_seconds
+        failure: Optional[BaseException] = None
+        
+        state = self._query(service)
+        error = None
+        if state == UNKNOWN:
+            error = "service not found or cannot be queried"
+        elif state != STOPPED:
+            error = self._request(self.backend.request_stop, service, (STOP_PENDING, STOPPED))
+        if during_stop:
+            try:
+                during_stop()
+            except Exception as e:
+                failure = e
+        if error is None:
+            state, error = self._wait_for(service, STOPPED, deadline)
+        stopped = self.clock()
+        
+        if error is not None:
+            result = RestartResult(False, stopped - started, 0.0, state, error)
+        else:
+            error = self._request(self.backend.request_start, service, (START_PENDING, RUNNING))
+            if error is None:
+                state, error = self._wait_for(service, RUNNING, deadline)
+            else:
+                state = self._query(service)
+            result = RestartResult(error is None, stopped - started, self.clock() - stopped, state, error)
+        
+        if failure is not None:
+            raise failure
+        return result
+    
+    def _query(self, service: str) -> str:
+        try:
+            return self.backend.query(service)
+        except Exception as e:
+            logger.debug(f"Querying service {service} failed: {e}")
+            return UNKNOWN
+    
+    def _request(self, action: Callable[[str], None], service: str, progressing: Tuple[str, ...]) -> Optional[str]:
+        """Send a request; returns an error unless it succeeded or the service is already on its way."""
+        try:
+            action(service)
+            return None
+        except Exception as e:
+            # Rejected because it is already stopping or starting (e.g. ERROR_SERVICE_CANNOT_ACCEPT_CTRL).
+            if self._query(service) in progressing:
+                return None
+            return f"{action.__name__} failed: {e}"
+    
+    def _wait_for(self, service: str, target: str, deadline: float) -> Tuple[str, Optional[str]]:
+        interval = self.poll_seconds
+        while True:
+            state = self._query(service)
+            if state == target:
+                return state, None
+            if state == UNKNOWN:
+                return state, "service could no longer be queried"
+            remaining = deadline - self.clock()
+            if remaining <= 0:
+                return state, f"did not reach {target} within {self.deadline_seconds:g}s"
+            self.sleep(min(interval, remaining))
+            interval = min(interval * 2, self.poll_seconds * 4)
+
+
+def create_service_backend(config) -> ServiceBackend:
+    backend = config.service_backend
+    if backend == "auto":
+        if platform.system() == "Windows":
+            backend = "windows"
+        elif platform.system() == "Linux" and shutil.which('systemctl'):
+            backend = "systemd"
+        else:
+            backend = "simulated"
+    if backend == "windows":
+        return WindowsServiceBackend()
+    if backend in ("systemd", "systemd-user"):
+        return SystemdServiceBackend(user=backend == "systemd-user")
+    if backend != "simulated":
+        logger.warning(f"Unknown service backend '{backend}'; using the simulated one")
+    return SimulatedServiceBackend()
@@ -0,0 +1,57 @@
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+STATE_VERSION = 1
+
+OVERRIDE_AUTO = "auto"
+OVERRIDE_BOOST = "boost"
+OVERRIDE_NORMAL = "normal"
+
+
+class StateStore:
+    """Persists the last applied power state so a restart can resume without re-actuating."""
+    
+    def __init__(self, path):
+        self.path = Path(path)
+    
+    def load(self) -> Optional[Dict[str, Any]]:
+        if not self.path.exists():
+            return None
+        
+        try:
+            with open(self.path, 'r') as f:
+                state = json.load(f)
+        except (json.JSONDecodeError, IOError) as e:
+            logger.warning(f"Ignoring unreadable state file {self.path}: {e}")
+            return None
+        
+        if not isinstance(state, dict) or state.get("version") != STATE_VERSION or "boosted" not in state:
+            logger.warning(f"Ignoring state file with unexpected format: {self.path}")
+            return None
+        if state.get("overrideMode") not in (OVERRIDE_AUTO, OVERRIDE_BOOST, OVERRIDE_NORMAL):
+            state["overrideMode"] = OVERRIDE_AUTO
+        return state
+    
+    def save(self, boosted: bool, override_mode: str, applied: Dict[str, Any]):
+        state = {
+            "version": STATE_VERSION,
+            "savedAt": time.time(),
+            "boosted": boosted,
+            "overrideMode": override_mode
+        }
+        state.update(applied)
+        
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump(state, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except IOError as e:
+            logger.warning(f"Could not persist state to {self.path}: {e}")
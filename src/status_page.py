@@ -0,0 +1,48 @@
+import logging
+import mmap
+from pathlib import Path
+from typing import Optional
+
+from .status_reader import (BODY, BODY_OFFSET, FLAG_BOOSTED, FLAG_MANUAL, HEADER, LAYOUT_VERSION, MAGIC,
+                            PAGE_SIZE, REASON_BYTES, SEQUENCE, SEQUENCE_OFFSET)
+
+logger = logging.getLogger(__name__)
+
+
+class StatusPage:
+    """Publishes the monitor state into a fixed-layout memory-mapped file (seqlock writer).
+
+    Only the monitor thread writes. The sequence counter is made odd before
+    the body is written and even afterwards; readers retry when it is odd or
+    changed under them. See status_reader for the layout and a reader.
+    """
+    
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'a+b') as f:
+            f.truncate(PAGE_SIZE)
+            self._map: Optional[mmap.mmap] = mmap.mmap(f.fileno(), PAGE_SIZE)
+        self._sequence = SEQUENCE.unpack_from(self._map, SEQUENCE_OFFSET)[0] & ~1
+        SEQUENCE.pack_into(self._map, SEQUENCE_OFFSET, self._sequence + 1)
+        HEADER.pack_into(self._map, 0, MAGIC, LAYOUT_VERSION, PAGE_SIZE)
+        SEQUENCE.pack_into(self._map, SEQUENCE_OFFSET, self._sequence)
+    
+    def publish(self, timestamp: float, cpu: float, gpu: float, boosted: bool, manual_override: bool,
+                transitions: int, boost_seconds: float, reason: str):
+        page = self._map
+        if page is None:
+            return
+        encoded = reason.encode('utf-8')[:REASON_BYTES]
+        flags = (FLAG_BOOSTED if boosted else 0) | (FLAG_MANUAL if manual_override else 0)
+        sequence = self._sequence
+        SEQUENCE.pack_into(page, SEQUENCE_OFFSET, sequence + 1)
+        BODY.pack_into(page, BODY_OFFSET, timestamp, cpu, gpu, flags, transitions, boost_seconds,
+                       len(encoded), encoded)
+        SEQUENCE.pack_into(page, SEQUENCE_OFFSET, sequence + 2)
+        self._sequence = sequence + 2
+    
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Reader for the Dynamic Power Plan status page.
+
+The monitor publishes its current state into a small memory-mapped file
+(statusPage.file in the config). This module has no dependencies on the
+rest of the app, so overlay and streaming tools can copy it as is. A read
+is a few struct.unpack_from calls on the mapping: no syscalls and no copy
+of the page.
+
+Usage:
+    python -m src.status_reader PATH [--hz 10]
+"""
+
+import argparse
+import mmap
+import struct
+import sys
+import time
+from typing import NamedTuple, Optional
+
+MAGIC = b"DPPS"
+LAYOUT_VERSION = 1
+PAGE_SIZE = 256
+REASON_BYTES = 128
+
+FLAG_BOOSTED = 0x1
+FLAG_MANUAL = 0x2
+
+# Little-endian, naturally aligned. The sequence counter is odd while the
+# writer is updating the page and is bumped again once it is done.
+HEADER = struct.Struct("<4sHH")          # magic, layout version, page size
+SEQUENCE = struct.Struct("<Q")           # at offset 8
+BODY = struct.Struct(f"<dffIIdI{REASON_BYTES}s")
+SEQUENCE_OFFSET = 8
+BODY_OFFSET = 16
+
+
+class StatusSnapshot(NamedTuple):
+    sequence: int
+    timestamp: float
+    cpu: float
+    gpu: float
+    boosted: bool
+    manual_override: bool
+    transitions: int
+    boost_seconds: float
+    reason: str
+
+
+class StatusPageReader:
+    """Maps the page read-only; read() returns a consistent snapshot or None if the writer kept racing."""
+    
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), PAGE_SIZE, access=mmap.ACCESS_READ)
+        magic, version, size = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or size != PAGE_SIZE:
+            self.close()
+            raise ValueError(f"{path} is not a status page")
+        if version != LAYOUT_VERSION:
+            self.close()
+            raise ValueError(f"Status page layout {version} is not supported (expected {LAYOUT_VERSION})")
+        self._last_sequence = 0
+    
+    def read(self, retries: int = 100) -> Optional[StatusSnapshot]:
+        page = self._map
+        for _ in range(retries):
+            before = SEQUENCE.unpack_from(page, SEQUENCE_OFFSET)[0]
+            if before & 1:
+                continue
+            fields = BODY.unpack_from(page, BODY_OFFSET)
+            if SEQUENCE.unpack_from(page, SEQUENCE_OFFSET)[0] != before:
+                continue
+            timestamp, cpu, gpu, flags, transitions, boost_seconds, reason_length, reason = fields
+            self._last_sequence = before
+            return StatusSnapshot(before, timestamp, cpu, gpu, bool(flags & FLAG_BOOSTED),
+                                  bool(flags & FLAG_MANUAL), transitions, boost_seconds,
+                                  reason[:reason_length].decode('utf-8', errors='replace'))
+        return None
+    
+    def changed(self) -> bool:
+        """Cheap check whether the writer published since the last read()."""
+        return SEQUENCE.unpack_from(self._map, SEQUENCE_OFFSET)[0] != self._last_sequence
+    
+    def close(self):
+        self._map.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Print the Dynamic Power Plan status page')
+    parser.add_argument('path', help='Status page file (statusPage.file)')
+    parser.add_argument('--hz', type=float, default=10.0, help='Reads per second')
+    args = parser.parse_args(argv)
+    
+    try:
+        reader = StatusPageReader(args.path)
+    except (OSError, ValueError) as e:
+        print(f"Cannot open status page: {e}", file=sys.stderr)
+        sys.exit(1)
+    
+    try:
+        while True:
+            if reader.changed():
+                snapshot = reader.read()
+                if snapshot:
+                    mode = "BOOST" if snapshot.boosted else "Normal"
+                    manual = " (Manual)" if snapshot.manual_override else ""
+                    print(f"CPU {snapshot.cpu:5.1f}% | GPU {snapshot.gpu:5.1f}% | {mode}{manual} | "
+                          f"{snapshot.reason}", flush=True)
+            time.sleep(1.0 / args.hz)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        reader.close()
+
+
+if __name__ == '__main__':
+    main()
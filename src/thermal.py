@@ -0,0 +1,176 @@
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+CPU_SENSOR_CHIPS = ("coretemp", "k10temp", "zenpower", "cpu_thermal", "cpu-thermal", "acpitz")
+
+BATTERY_ALLOW = "allow"
+BATTERY_BLOCK = "block"
+BATTERY_THRESHOLDS = "thresholds"
+
+
+class Limit:
+    """A latched limit: trips at `limit`, clears once the value is `hysteresis` back on the safe side.
+
+    Ceilings trip at or above the limit; floors (floor=True) at or below it.
+    """
+    
+    __slots__ = ('name', 'limit', 'hysteresis', 'unit', 'floor', 'tripped', 'value')
+    
+    def __init__(self, name: str, limit: Optional[float], hysteresis: float, unit: str, floor: bool = False):
+        self.name = name
+        self.limit = limit
+        self.hysteresis = hysteresis
+        self.unit = unit
+        self.floor = floor
+        self.tripped = False
+        self.value: Optional[float] = None
+    
+    def update(self, value: Optional[float]) -> bool:
+        self.value = value
+        if self.limit is None or value is None:
+            self.tripped = False
+            return False
+        
+        sign = -1.0 if self.floor else 1.0
+        if sign * value >= sign * self.limit:
+            if not self.tripped:
+                logger.warning(f"{self.name} at {value:.0f}{self.unit} reached limit {self.limit:.0f}{self.unit}")
+            self.tripped = True
+        elif self.tripped and sign * value < sign * self.limit - self.hysteresis:
+            logger.info(f"{self.name} back to {value:.0f}{self.unit}; limit {self.limit:.0f}{self.unit} cleared")
+            self.tripped = False
+        return self.tripped
+    
+    def describe(self) -> str:
+        return f"{self.name} {self.value:.0f}{self.unit} (limit {self.limit:.0f}{self.unit})"
+
+
+class ThermalGate:
+    """Temperature, power and battery inputs that can veto or end a boost.
+
+    "block" limits stop new promotions; "demote" limits end an active boost
+    without waiting for the demote hold. Each limit latches until the value
+    is back on the safe side by hysteresisC (temperatures), hysteresisW (GPU
+    power) or 5 points (battery charge).
+    On battery the CPU/GPU thresholds can be raised, or boosting blocked.
+    """
+    
+    def __init__(self, config, sensors=psutil):
+        self.config = config
+        self.sensors = sensors
+        hysteresis_c = config.thermal_hysteresis_c
+        cpu = config.thermal_cpu
+        gpu = config.thermal_gpu
+        self._block_limits = [
+            Limit("CPU temperature", cpu.get("blockAboveC"), hysteresis_c, "°C"),
+            Limit("GPU temperature", gpu.get("blockAboveC"), hysteresis_c, "°C")
+        ]
+        self._demote_limits = [
+            Limit("CPU temperature", cpu.get("demoteAboveC"), hysteresis_c, "°C"),
+            Limit("GPU temperature", gpu.get("demoteAboveC"), hysteresis_c, "°C"),
+            Limit("GPU power", gpu.get("demoteAbovePowerW"), config.thermal_hysteresis_w, "W")
+        ]
+        self._battery_limit = Limit("Battery", config.thermal_battery.get("minPercent"), 5.0, "%", floor=True)
+        self._cpu_sensors: List[str] = list(cpu.get("sensors") or [])
+        self._has_temperatures = hasattr(sensors, 'sensors_temperatures')
+        self._next_read = 0.0
+        self.cpu_temp: Optional[float] = None
+        self.gpu_temp: Optional[float] = None
+        self.gpu_power: Optional[float] = None
+        self.on_battery = False
+        self.battery_percent: Optional[float] = None
+    
+    def update(self, gpu_devices: Iterable, now: Optional[float] = None):
+        """Refresh inputs. GPU values come from the latest GPU sample; sensors are read every sampleSeconds."""
+        temps = [d.temperature_c for d in gpu_devices if d.temperature_c is not None]
+        powers = [d.power_w for d in gpu_devices if d.power_w is not None]
+        self.gpu_temp = max(temps) if temps else None
+        self.gpu_power = sum(powers) if powers else None
+        
+        now = time.monotonic() if now is None else now
+        if now >= self._next_read:
+            self._next_read = now + self.config.thermal_sample_seconds
+            self.cpu_temp = self._read_cpu_temperature()
+            self._read_battery()
+        
+        self._block_limits[0].update(self.cpu_temp)
+        self._block_limits[1].update(self.gpu_temp)
+        self._demote_limits[0].update(self.cpu_temp)
+        self._demote_limits[1].update(self.gpu_temp)
+        self._demote_limits[2].update(self.gpu_power)
+        self._battery_limit.update(self.battery_percent if self.on_battery else None)
+    
+    def _read_cpu_temperature(self) -> Optional[float]:
+        if not self._has_temperatures:
+            return None
+        try:
+            chips = self.sensors.sensors_temperatures()
+        except Exception as e:
+            logger.debug(f"Reading temperatures failed: {e}")
+            return None
+        
+        names = self._cpu_sensors or [name for name in CPU_SENSOR_CHIPS if name in chips]
+        for name in names:
+            readings = [entry.current for entry in chips.get(name, []) if entry.current]
+            if readings:
+                return max(readings)
+        return None
+    
+    def _read_battery(self):
+        try:
+            battery = self.sensors.sensors_battery()
+        except Exception as e:
+            logger.debug(f"Reading battery state failed: {e}")
+            battery = None
+        on_battery = battery is not None and battery.power_plugged is False
+        if on_battery != self.on_battery:
+            logger.info(f"Power source: {'battery' if on_battery else 'AC'}")
+        self.on_battery = on_battery
+        self.battery_percent = battery.percent if battery is not None else None
+    
+    def demote_reason(self) -> Optional[str]:
+        for limit in self._demote_limits:
+            if limit.tripped:
+                return f"Thermal limit: {limit.describe()}"
+        if self._battery_limit.tripped:
+            return f"Power limit: {self._battery_limit.describe()}"
+        return None
+    
+    def block_reason(self) -> Optional[str]:
+        reason = self.demote_reason()
+        if reason:
+            return reason
+        for limit in self._block_limits:
+            if limit.tripped:
+                return f"Thermal block: {limit.describe()}"
+        if self.on_battery and self.config.thermal_battery.get("mode") == BATTERY_BLOCK:
+            return "On battery"
+        return None
+    
+    def cpu_threshold(self, base: float) -> float:
+        return self._battery_threshold(base, "cpuPercent")
+    
+    def gpu_threshold(self, base: float) -> float:
+        return self._battery_threshold(base, "gpuPercent")
+    
+    def _battery_threshold(self, base: float, key: str) -> float:
+        battery = self.config.thermal_battery
+        if self.on_battery and battery.get("mode") == BATTERY_THRESHOLDS and battery.get(key) is not None:
+            return max(base, float(battery[key]))
+        return base
+    
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "cpuTempC": self.cpu_temp,
+            "gpuTempC": self.gpu_temp,
+            "gpuPowerW": self.gpu_power,
+            "onBattery": self.on_battery,
+            "batteryPercent": self.battery_percent,
+            "blocking": self.block_reason(),
+            "demoting": self.demote_reason()
+        }
@@ -9,8 +9,11 @@ import pystray
 from PIL import Image, ImageDraw
 
 from .config import Config
+from .fleet_client import FleetClient
+from .logging_setup import shutdown_logging
 from .monitor import SystemMonitor
 from .power_manager import PowerManager
+from .state_store import OVERRIDE_AUTO, OVERRIDE_BOOST, OVERRIDE_NORMAL, StateStore
 
 
 def create_icon_image(color: str, size: int = 64) -> Image.Image:
@@ -69,14 +72,52 @@ class TrayApp:
         self._icon_normal = load_icon_image(str(resources_dir / 'tray_normal.ico'), 'green')
         self._icon_boost = load_icon_image(str(resources_dir / 'tray_boost.ico'), 'red')
         
+        self.fleet = FleetClient(config, self.get_status) if config.fleet_enabled else None
+        
+        self.state_store = StateStore(config.state_file_path) if config.state_persist else None
+        self._restore_state()
+        
         self.monitor.set_state_change_callback(self._on_state_change)
         self.monitor.set_verify_callback(self._on_verify)
     
+    def _restore_state(self):
+        if not self.state_store:
+            return
+        state = self.state_store.load()
+        if state is None:
+            return
+        
+        override_mode = state["overrideMode"]
+        boosted = bool(state["boosted"])
+        if override_mode != OVERRIDE_AUTO:
+            boosted = override_mode == OVERRIDE_BOOST
+            state["boosted"] = boosted
+        self.monitor.restore_state(boosted, override_mode != OVERRIDE_AUTO)
+        self.power_manager.resume(state)
+        self._save_state()
+    
+    def _save_state(self):
+        if not self.state_store:
+            return
+        if not self.monitor.is_manual_override:
+            override_mode = OVERRIDE_AUTO
+        else:
+            override_mode = OVERRIDE_BOOST if self.monitor.is_boosted else OVERRIDE_NORMAL
+        self.state_store.save(self.monitor.is_boosted, override_mode, self.power_manager.applied_state())
+    
     def _on_state_change(self, boost: bool):
         self.power_manager.reset_fan_verification()
         self.power_manager.apply_boost_mode(boost)
+        self._save_state()
+        if self.fleet:
+            self.fleet.record_transition(boost, self.monitor.last_transition_reason)
         self._update_icon()
     
+    def get_status(self) -> dict:
+        status = self.monitor.get_status()
+        status["actuator"] = self.power_manager.get_status()
+        return status
+    
     def _on_verify(self, is_boosted: bool):
         self.power_manager.verify_fan_state(is_boosted)
     
@@ -98,14 +139,17 @@ class TrayApp:
     
     def _set_boost_mode(self, icon, item):
         self.monitor.set_manual_boost(True)
+        self._save_state()
         self._update_icon()
     
     def _set_normal_mode(self, icon, item):
         self.monitor.set_manual_boost(False)
+        self._save_state()
         self._update_icon()
     
     def _set_auto_mode(self, icon, item):
         self.monitor.clear_manual_override()
+        self._save_state()
     
     def _is_boost_checked(self, item) -> bool:
         return self.monitor.is_boosted and self.monitor.is_manual_override
@@ -187,9 +231,19 @@ class TrayApp:
         except Exception:
             pass
     
+    def _toggle_profiling(self, icon, item):
+        if self.monitor.is_profiling:
+            self.monitor.stop_profiling()
+        else:
+            self.monitor.start_profiling()
+    
     def _quit(self, icon, item):
         self._running = False
         self.monitor.stop()
+        self.power_manager.wait_idle(timeout=self.config.service_deadline_seconds)
+        if self.fleet:
+            self.fleet.stop()
+        shutdown_logging()
         icon.stop()
     
     def _create_menu(self) -> pystray.Menu:
@@ -232,6 +286,11 @@ class TrayApp:
                 "Open Config Folder",
                 self._open_config_folder
             ),
+            pystray.MenuItem(
+                "Profile Monitor",
+                self._toggle_profiling,
+                checked=lambda item: self.monitor.is_profiling
+            ),
             pystray.Menu.SEPARATOR,
             pystray.MenuItem(
                 "Exit",
@@ -243,11 +302,14 @@ class TrayApp:
         self._running = True
         
         self.monitor.start()
+        if self.fleet:
+            self.fleet.start()
         
+        boosted = self.monitor.is_boosted
         self._icon = pystray.Icon(
             "DynamicPowerPlan",
-            self._icon_normal,
-            "Dynamic Power Plan - Normal",
+            self._icon_boost if boosted else self._icon_normal,
+            "Dynamic Power Plan - BOOST MODE" if boosted else "Dynamic Power Plan - Normal",
             menu=self._create_menu()
         )
         
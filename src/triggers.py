@@ -0,0 +1,300 @@
+import logging
+import re
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# A compiled condition returns the text of the clause that fired, or None.
+Condition = Callable[["TriggerContext"], Optional[str]]
+Value = Callable[["TriggerContext"], Any]
+
+NUMERIC_VARIABLES = ("cpu", "gpu", "cpu_temp", "gpu_temp", "gpu_power", "battery")
+BOOLEAN_VARIABLES = ("on_battery", "boosted")
+COMPARISONS = {
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b
+}
+DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0}
+
+_TOKEN = re.compile(r"""
+    \s*(?:
+        (?P<duration>\d+(?:\.\d+)?(?:ms|s|m))\b |
+        (?P<number>\d+(?:\.\d+)?) |
+        (?P<string>'[^']*'|"[^"]*") |
+        (?P<name>[A-Za-z_][A-Za-z0-9_]*) |
+        (?P<op>>=|<=|==|!=|[<>(),])
+    )""", re.VERBOSE)
+
+
+class TriggerSyntaxError(ValueError):
+    def __init__(self, message: str, expression: str, position: int):
+        super().__init__(f"{message} at column {position + 1} in: {expression}")
+        self.position = position
+
+
+class TriggerContext:
+    """Per-tick inputs for trigger expressions; updated in place by the monitor."""
+    
+    __slots__ = ('cpu', 'gpu', 'cpu_temp', 'gpu_temp', 'gpu_power', 'battery', 'on_battery',
+                 'boosted', 'cores', 'processes', 'devices', 'now')
+    
+    def __init__(self):
+        self.cpu = 0.0
+        self.gpu = 0.0
+        self.cpu_temp: Optional[float] = None
+        self.gpu_temp: Optional[float] = None
+        self.gpu_power: Optional[float] = None
+        self.battery: Optional[float] = None
+        self.on_battery = False
+        self.boosted = False
+        self.cores: Sequence[float] = ()
+        self.processes: Set[str] = set()
+        self.devices: Dict[str, Any] = {}
+        self.now = 0.0
+
+
+def _tokenize(expression: str) -> List[Tuple[str, str, int]]:
+    tokens = []
+    position = 0
+    while position < len(expression):
+        if expression[position:].strip() == "":
+            break
+        match = _TOKEN.match(expression, position)
+        if not match or match.end() == position:
+            rest = expression[position:]
+            raise TriggerSyntaxError("Unexpected character", expression, position + len(rest) - len(rest.lstrip()))
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind), match.start(kind)))
+        position = match.end()
+    tokens.append(("end", "", len(expression)))
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent parser that compiles straight to closures.
+
+    expr := and ('or' and)*
+    and  := not ('and' not)*
+    not  := 'not' not | timed
+    timed := atom ('for' DURATION)?
+    atom := '(' expr ')' | 'true' | 'false' | BOOLVAR | proc(NAME) | value CMP value
+    value := NUMBER | NUMVAR | core(N) | device(NAME)
+    """
+    
+    def __init__(self, expression: str):
+        self.expression = expression
+        self.tokens = _tokenize(expression)
+        self.index = 0
+        self.uses_cores = False
+    
+    def _peek(self) -> Tuple[str, str, int]:
+        return self.tokens[self.index]
+    
+    def _next(self) -> Tuple[str, str, int]:
+        token = self.tokens[self.index]
+        self.index += 1
+        return token
+    
+    def _error(self, message: str, token: Optional[Tuple[str, str, int]] = None):
+        token = token or self._peek()
+        raise TriggerSyntaxError(message, self.expression, token[2])
+    
+    def _expect(self, value: str):
+        token = self._next()
+        if token[1] != value:
+            self._error(f"Expected '{value}'", token)
+    
+    def _keyword(self, word: str) -> bool:
+        kind, value, _ = self._peek()
+        if kind == "name" and value == word:
+            self.index += 1
+            return True
+        return False
+    
+    def parse(self) -> Tuple[Condition, str]:
+        condition, text = self._or()
+        if self._peek()[0] != "end":
+            self._error("Unexpected token")
+        return condition, text
+    
+    def _or(self) -> Tuple[Condition, str]:
+        parts = [self._and()]
+        while self._keyword("or"):
+            parts.append(self._and())
+        if len(parts) == 1:
+            return parts[0]
+        conditions = tuple(c for c, _ in parts)
+        
+        def any_of(ctx, conditions=conditions):
+            # No short-circuit: every "for" timer must see every tick.
+            result = None
+            for condition in conditions:
+                fired = condition(ctx)
+                if result is None:
+                    result = fired
+            return result
+        return any_of, " or ".join(t for _, t in parts)
+    
+    def _and(self) -> Tuple[Condition, str]:
+        parts = [self._not()]
+        while self._keyword("and"):
+            parts.append(self._not())
+        if len(parts) == 1:
+            return parts[0]
+        conditions = tuple(c for c, _ in parts)
+        text = " and ".join(t for _, t in parts)
+        
+        def all_of(ctx, conditions=conditions, text=text):
+            result = text
+            for condition in conditions:
+                if condition(ctx) is None:
+                    result = None
+            return result
+        return all_of, text
+    
+    def _not(self) -> Tuple[Condition, str]:
+        if self._keyword("not"):
+            inner, inner_text = self._not()
+            text = f"not {inner_text}"
+            return (lambda ctx: text if inner(ctx) is None else None), text
+        return self._timed()
+    
+    def _timed(self) -> Tuple[Condition, str]:
+        condition, text = self._atom()
+        if not self._keyword("for"):
+            return condition, text
+        token = self._next()
+        if token[0] != "duration":
+            self._error("Expected a duration such as 3s, 500ms or 2m", token)
+        number, unit = re.match(r"(\d+(?:\.\d+)?)(ms|s|m)", token[1]).groups()
+        seconds = float(number) * DURATION_UNITS[unit]
+        text = f"{text} for {token[1]}"
+        state = [None]
+        
+        def sustained(ctx):
+            if condition(ctx) is None:
+                state[0] = None
+                return None
+            if state[0] is None:
+                state[0] = ctx.now
+            return text if ctx.now - state[0] >= seconds else None
+        return sustained, text
+    
+    def _atom(self) -> Tuple[Condition, str]:
+        kind, value, _ = self._peek()
+        if value == "(":
+            self.index += 1
+            condition, text = self._or()
+            self._expect(")")
+            return condition, f"({text})"
+        if kind == "name" and value in ("true", "false"):
+            self.index += 1
+            return (lambda ctx: value) if value == "true" else (lambda ctx: None), value
+        if kind == "name" and value in BOOLEAN_VARIABLES:
+            self.index += 1
+            return (lambda ctx: value if getattr(ctx, value) else None), value
+        if kind == "name" and value == "proc":
+            self.index += 1
+            name = self._string_argument().lower()
+            text = f"proc('{name}')"
+            return (lambda ctx: text if name in ctx.processes else None), text
+        return self._comparison()
+    
+    def _comparison(self) -> Tuple[Condition, str]:
+        left, left_text = self._value()
+        token = self._next()
+        compare = COMPARISONS.get(token[1])
+        if token[0] != "op" or compare is None:
+            self._error("Expected a comparison (>, >=, <, <=, ==, !=)", token)
+        right, right_text = self._value()
+        text = f"{left_text} {token[1]} {right_text}"
+        
+        def comparison(ctx):
+            a = left(ctx)
+            b = right(ctx)
+            if a is None or b is None:
+                return None
+            return text if compare(a, b) else None
+        return comparison, text
+    
+    def _value(self) -> Tuple[Value, str]:
+        token = self._next()
+        kind, value, _ = token
+        if kind == "number":
+            number = float(value)
+            return (lambda ctx: number), value
+        if kind == "name" and value in NUMERIC_VARIABLES:
+            return (lambda ctx: getattr(ctx, value)), value
+        if kind == "name" and value == "core":
+            self._expect("(")
+            index_token = self._next()
+            if index_token[0] != "number" or "." in index_token[1]:
+                self._error("core() takes a core index", index_token)
+            self._expect(")")
+            index = int(index_token[1])
+            self.uses_cores = True
+            return (lambda ctx: ctx.cores[index] if index < len(ctx.cores) else None), f"core({index})"
+        if kind == "name" and value == "device":
+            pattern = self._string_argument()
+            cache: List[Any] = []
+            
+            def device_utilization(ctx):
+                if not cache:
+                    for device in ctx.devices.values():
+                        if device.matches(pattern):
+                            cache.append(device)
+                            break
+                    else:
+                        return None
+                return cache[0].utilization
+            return device_utilization, f"device('{pattern}')"
+        self._error("Expected a number, a metric or a function", token)
+    
+    def _string_argument(self) -> str:
+        self._expect("(")
+        token = self._next()
+        if token[0] != "string":
+            self._error("Expected a quoted name", token)
+        self._expect(")")
+        return token[1][1:-1]
+
+
+class Trigger:
+    def __init__(self, name: str, expression: str):
+        parser = _Parser(expression)
+        self.condition, self.text = parser.parse()
+        self.name = name
+        self.expression = expression
+        self.uses_cores = parser.uses_cores
+    
+    def evaluate(self, ctx: TriggerContext) -> Optional[str]:
+        fired = self.condition(ctx)
+        if fired is None:
+            return None
+        return f"Trigger '{self.name}': {fired}"
+
+
+def compile_triggers(specs: List[Dict[str, Any]]) -> List[Trigger]:
+    """Compile the configured rules once; invalid ones are logged and skipped."""
+    if not isinstance(specs, list):
+        logger.error(f"triggers.rules must be a list, not {type(specs).__name__}")
+        return []
+    triggers = []
+    for i, spec in enumerate(specs):
+        if not isinstance(spec, dict):
+            logger.error(f"Ignoring trigger rule {i + 1}: expected an object with \"when\", got {spec!r}")
+            continue
+        name = str(spec.get("name") or f"rule{i + 1}")
+        expression = spec.get("when", "")
+        if not isinstance(expression, str):
+            logger.error(f"Invalid trigger '{name}': \"when\" must be a string, got {expression!r}")
+            continue
+        try:
+            triggers.append(Trigger(name, expression))
+        except TriggerSyntaxError as e:
+            logger.error(f"Invalid trigger '{name}': {e}")
+    return triggers
@@ -0,0 +1,18 @@
+from src.config import Config
+
+
+def test_read_only_config_does_not_create_the_file(tmp_path):
+    path = tmp_path / "config.json"
+    
+    config = Config(str(path), read_only=True)
+    
+    assert not path.exists()
+    assert config.history_enabled is False
+
+
+def test_missing_config_is_written_with_defaults(tmp_path):
+    path = tmp_path / "config.json"
+    
+    Config(str(path))
+    
+    assert path.exists()
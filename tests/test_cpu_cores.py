@@ -0,0 +1,52 @@
+from array import array
+
+import pytest
+
+from src.cpu_cores import CoreTrigger, parse_core_list
+
+
+def _trigger(mode: str, count: int, percent: float = 90.0, cores: int = 8) -> CoreTrigger:
+    return CoreTrigger(mode, count, percent, "all", tuple(range(cores)))
+
+
+def test_parse_core_list_accepts_ranges_and_drops_unknown_cores():
+    assert parse_core_list("0-3, 6,6,10-11", 8) == (0, 1, 2, 3, 6)
+    assert parse_core_list([7, 2, 9], 8) == (2, 7)
+    with pytest.raises(ValueError):
+        parse_core_list("0-x", 8)
+
+
+def test_any_k_is_the_kth_busiest_core():
+    values = array('d', [10, 95, 20, 91, 30, 99, 5, 40])
+    
+    assert _trigger("anyK", 1).metric(values) == 99
+    assert _trigger("anyK", 3).metric(values) == 91
+    assert _trigger("anyK", 4).metric(values) == 40
+
+
+def test_top_n_mean_averages_the_busiest_cores():
+    values = array('d', [10, 95, 20, 91, 30, 99, 5, 40])
+    
+    assert _trigger("topNMean", 2).metric(values) == pytest.approx(97.0)
+    assert _trigger("topNMean", 4).metric(values) == pytest.approx(81.25)
+
+
+def test_only_the_group_cores_are_considered():
+    values = array('d', [100, 100, 0, 10, 20, 30])
+    trigger = CoreTrigger("anyK", 1, 90.0, "efficiency", (2, 3, 4, 5))
+    
+    assert trigger.metric(values) == 30
+
+
+def test_count_is_clamped_to_the_group_size():
+    trigger = CoreTrigger("topNMean", 16, 90.0, "pair", (0, 1))
+    
+    assert trigger.count == 2
+    assert trigger.metric(array('d', [80, 100])) == pytest.approx(90.0)
+
+
+def test_repeated_evaluation_does_not_carry_over_values():
+    trigger = _trigger("anyK", 2, cores=4)
+    
+    assert trigger.metric(array('d', [100, 100, 0, 0])) == 100
+    assert trigger.metric(array('d', [0, 0, 10, 0])) == 0
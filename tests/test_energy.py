@@ -0,0 +1,110 @@
+from pathlib import Path
+
+import pytest
+
+from src.energy import EnergyMeter, discover_rapl_zones, reason_category
+
+MAX_RANGE = 262143328850
+
+
+class FakeConfig:
+    sampling_interval_ms = 1000
+    sampling_max_interval_ms = 4000
+
+
+class FakeGPU:
+    def __init__(self, power_w):
+        self.power_w = power_w
+
+
+def _zone(root: Path, directory: str, name: str, energy_uj: int):
+    zone = root / directory
+    zone.mkdir(parents=True)
+    (zone / 'name').write_text(f"{name}\n")
+    (zone / 'energy_uj').write_text(f"{energy_uj}\n")
+    (zone / 'max_energy_range_uj').write_text(f"{MAX_RANGE}\n")
+    return zone
+
+
+def _set_energy(zone: Path, energy_uj: int):
+    (zone / 'energy_uj').write_text(f"{energy_uj}\n")
+
+
+def test_discovers_package_zones_only(tmp_path):
+    _zone(tmp_path, 'intel-rapl:0', 'package-0', 1)
+    _zone(tmp_path, 'intel-rapl:0:0', 'core', 1)
+    _zone(tmp_path, 'intel-rapl:1', 'package-1', 1)
+    _zone(tmp_path, 'intel-rapl-mmio:0', 'package-0', 1)
+    
+    assert [zone.name for zone in discover_rapl_zones(str(tmp_path))] == ['package-0', 'package-1']
+    assert discover_rapl_zones(str(tmp_path / 'missing')) == []
+
+
+def test_counter_wraparound(tmp_path):
+    zone_dir = _zone(tmp_path, 'intel-rapl:0', 'package-0', MAX_RANGE - 2_000_000)
+    zone = discover_rapl_zones(str(tmp_path))[0]
+    
+    _set_energy(zone_dir, 3_000_000)
+    assert zone.delta_uj() == 5_000_000
+    _set_energy(zone_dir, 4_000_000)
+    assert zone.delta_uj() == 1_000_000
+
+
+def test_intervals_are_charged_to_the_previous_state_and_reason(tmp_path):
+    zone_dir = _zone(tmp_path, 'intel-rapl:0', 'package-0', 0)
+    meter = EnergyMeter(FakeConfig(), powercap_root=str(tmp_path))
+    
+    meter.sample([FakeGPU(20.0)], False, "Normal usage", now=100.0)
+    _set_energy(zone_dir, 10_000_000)
+    meter.sample([FakeGPU(100.0)], True, "CPU at 91.0% [top: game.exe(1) 80.0% cpu]", now=102.0)
+    _set_energy(zone_dir, 70_000_000)
+    meter.sample([FakeGPU(200.0)], True, "CPU at 91.0%", now=104.0)
+    
+    snapshot = meter.snapshot()
+    normal = snapshot["states"]["normal"]
+    boost = snapshot["states"]["boost"]
+    assert normal["seconds"] == pytest.approx(2.0)
+    assert normal["cpuJoules"] == pytest.approx(10.0)
+    assert normal["gpuJoules"] == pytest.approx(120.0)
+    assert boost["cpuJoules"] == pytest.approx(60.0)
+    assert boost["gpuJoules"] == pytest.approx(300.0)
+    assert snapshot["reasons"]["CPU"]["seconds"] == pytest.approx(2.0)
+    assert snapshot["cpuWatts"] == pytest.approx(30.0)
+    meter.close()
+
+
+def test_long_gaps_are_not_charged(tmp_path):
+    zone_dir = _zone(tmp_path, 'intel-rapl:0', 'package-0', 0)
+    meter = EnergyMeter(FakeConfig(), powercap_root=str(tmp_path))
+    
+    meter.sample([], False, "Normal usage", now=0.0)
+    _set_energy(zone_dir, 500_000_000)
+    meter.sample([], False, "Normal usage", now=3600.0)
+    
+    assert meter.snapshot()["states"]["normal"]["seconds"] == 0.0
+    meter.close()
+
+
+def test_fixed_interval_longer_than_max_is_charged(tmp_path):
+    zone_dir = _zone(tmp_path, 'intel-rapl:0', 'package-0', 0)
+    config = FakeConfig()
+    config.sampling_interval_ms = 10000
+    meter = EnergyMeter(config, powercap_root=str(tmp_path))
+    
+    meter.sample([], False, "Normal usage", now=0.0)
+    _set_energy(zone_dir, 100_000_000)
+    meter.sample([], False, "Normal usage", now=10.0)
+    
+    assert meter.snapshot()["states"]["normal"]["cpuJoules"] == pytest.approx(100.0)
+    meter.close()
+
+
+@pytest.mark.parametrize("reason, category", [
+    ("CPU at 91.2% [top: game.exe(1) 80.0% cpu]", "CPU"),
+    ("GPU NVIDIA GeForce RTX 3080 at 97.0%", "GPU"),
+    ("Predicted: steam.exe launched", "Predicted"),
+    ("Disk I/O nvme0n1 at 310.0 MB/s", "Disk I/O"),
+    ("Watched game detected", "Watched game detected")
+])
+def test_reason_category(reason, category):
+    assert reason_category(reason) == category
@@ -0,0 +1,122 @@
+import math
+import threading
+
+import pytest
+
+from src.flap import MODE_EXTEND, MODE_PIN, FlapDetector, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+    
+    def monotonic(self) -> float:
+        return self.now
+
+
+class FlapConfig:
+    def __init__(self, mode=MODE_EXTEND):
+        self.flap_mode = mode
+        self.flap_window_seconds = 60.0
+        self.flap_max_transitions = 3
+        self.flap_hold_multiplier = 2.0
+        self.flap_max_hold_multiplier = 8.0
+        self.flap_cooldown_seconds = 30.0
+
+
+def test_extend_multiplies_holds_per_excess_transition_up_to_the_cap():
+    flap = FlapDetector(FlapConfig())
+    for t in range(3):
+        flap.record(100.0 + t)
+    assert flap.hold(2.0, 103.0) == 2.0
+    
+    flap.record(104.0)
+    assert flap.hold(2.0, 104.0) == 4.0
+    flap.record(105.0)
+    assert flap.hold(2.0, 105.0) == 8.0
+    for t in range(5):
+        flap.record(106.0 + t)
+    assert flap.hold(2.0, 111.0) == 16.0
+    assert "x8" in flap.decision
+
+
+def test_extend_relaxes_as_transitions_leave_the_window():
+    flap = FlapDetector(FlapConfig())
+    for t in range(5):
+        flap.record(100.0 + t)
+    assert flap.hold(1.0, 104.0) == 4.0
+    
+    assert flap.hold(1.0, 160.5) == 2.0
+    assert flap.hold(1.0, 200.0) == 1.0
+    assert flap.decision == "none"
+
+
+def test_pin_holds_the_state_for_the_cooldown():
+    flap = FlapDetector(FlapConfig(mode=MODE_PIN))
+    for t in range(3):
+        flap.record(100.0 + t)
+    assert not flap.is_pinned(102.0)
+    
+    flap.record(103.0)
+    assert flap.is_pinned(103.0)
+    assert flap.is_pinned(132.9)
+    assert flap.snapshot(now=120.0)["pinnedSeconds"] == pytest.approx(13.0)
+    assert flap.hold(2.0, 110.0) == 2.0
+    
+    assert not flap.is_pinned(133.0)
+    assert flap.snapshot(now=133.0)["recentTransitions"] == 0
+    assert flap.decision == "none"
+
+
+def test_pinned_demand_counts_each_stretch_once():
+    flap = FlapDetector(FlapConfig(mode=MODE_PIN))
+    for wants in (True, True, False, True, False, False):
+        flap.note_pinned_demand(wants)
+    assert flap.suppressed == 2
+
+
+def test_bucket_allows_a_burst_then_refills_at_the_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(2, 0.5, clock=clock.monotonic)
+    
+    assert bucket.try_take() and bucket.try_take()
+    assert not bucket.try_take()
+    assert bucket.denied == 1
+    assert bucket.seconds_until_available() == pytest.approx(2.0)
+    
+    clock.now += 1.0
+    assert bucket.seconds_until_available() == pytest.approx(1.0)
+    clock.now += 1.0
+    assert bucket.try_take()
+    
+    clock.now += 100.0
+    assert bucket.snapshot()["tokens"] == 2
+
+
+def test_bucket_with_zero_rate_never_becomes_available():
+    clock = FakeClock()
+    bucket = TokenBucket(1, 0.0, clock=clock.monotonic)
+    
+    assert bucket.try_take()
+    clock.now += 86400.0
+    assert not bucket.try_take()
+    assert bucket.seconds_until_available() == math.inf
+    assert bucket.snapshot()["nextTokenSeconds"] is None
+
+
+def test_bucket_hands_out_each_token_once_across_threads():
+    bucket = TokenBucket(100, 0.0)
+    taken = []
+    
+    def take():
+        for _ in range(50):
+            if bucket.try_take():
+                taken.append(1)
+    threads = [threading.Thread(target=take) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert len(taken) == 100
+    assert bucket.denied == 300
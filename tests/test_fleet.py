@@ -0,0 +1,185 @@
+import asyncio
+import gzip
+import socket
+import threading
+import time
+
+import pytest
+
+from src.fleet_client import BatchTooLarge, FleetClient, decode_batch, encode_batch
+from src.fleet_collector import FleetCollector, serve
+
+
+class FleetConfig:
+    def __init__(self, url: str, spool_dir):
+        self.fleet_url = url
+        self.fleet_node_id = "node-a"
+        self.fleet_spool_dir = str(spool_dir)
+        self.fleet_metrics_seconds = 10
+        self.fleet_flush_seconds = 1
+        self.fleet_max_batch_records = 2
+        self.fleet_max_queue_records = 100
+        self.fleet_max_spool_bytes = 1 << 20
+        self.fleet_max_backoff_seconds = 4
+        self.fleet_timeout_seconds = 2
+
+
+class Collector:
+    """Runs serve() on an event loop in a background thread, on a fixed localhost port."""
+    
+    def __init__(self, port: int, read_timeout_seconds: float = 30.0):
+        self.port = port
+        self.collector = FleetCollector(read_timeout_seconds=read_timeout_seconds)
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        self.server = asyncio.run_coroutine_threadsafe(
+            serve('127.0.0.1', port, self.collector), self.loop
+        ).result(timeout=5)
+    
+    def close(self):
+        # asyncio servers are not thread-safe, so close on the loop's own thread.
+        async def shutdown():
+            self.server.close()
+            await self.server.wait_closed()
+        asyncio.run_coroutine_threadsafe(shutdown(), self.loop).result(timeout=5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=5)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def port():
+    return _free_port()
+
+
+def _client(port, tmp_path) -> FleetClient:
+    return FleetClient(FleetConfig(f"http://127.0.0.1:{port}/ingest", tmp_path / "spool"))
+
+
+def test_batches_are_delivered(port, tmp_path):
+    collector = Collector(port)
+    try:
+        client = _client(port, tmp_path)
+        for i in range(5):
+            client.record_transition(i % 2 == 0, f"reason {i}")
+        
+        assert client.flush()
+        
+        node = collector.collector.nodes["node-a"]
+        assert client.sent_records == 5
+        assert collector.collector.batches == 3
+        assert [t["reason"] for t in node.transitions] == [f"reason {i}" for i in range(5)]
+    finally:
+        collector.close()
+
+
+def test_records_are_spooled_while_the_collector_is_down(port, tmp_path):
+    client = _client(port, tmp_path)
+    client.record_transition(True, "load")
+    
+    assert not client.flush()
+    assert len(client._spool_files()) == 1
+    
+    collector = Collector(port)
+    try:
+        client._next_attempt = 0.0
+        client.record_transition(False, "idle")
+        assert client.flush()
+        
+        assert client._spool_files() == []
+        node = collector.collector.nodes["node-a"]
+        assert [t["reason"] for t in node.transitions] == ["load", "idle"]
+    finally:
+        collector.close()
+
+
+def test_failures_back_off_exponentially_up_to_the_cap(port, tmp_path):
+    client = _client(port, tmp_path)
+    waits = []
+    for _ in range(5):
+        client._next_attempt = 0.0
+        client.record("metrics", cpu=1.0)
+        before = time.monotonic()
+        assert not client.flush()
+        waits.append(client._next_attempt - before)
+    
+    # flushSeconds 1, doubling per failure, jittered to 50-100% and capped at 4.
+    # The refused connection itself takes a moment, so allow some slack above the ceiling.
+    for wait, ceiling in zip(waits, [1, 2, 4, 4, 4]):
+        assert ceiling / 2 <= wait <= ceiling + 0.5
+    
+    # While backing off, flush() spools instead of posting.
+    client.record("metrics", cpu=2.0)
+    spooled = len(client._spool_files())
+    assert not client.flush()
+    assert len(client._spool_files()) == spooled + 1
+
+
+def test_replayed_spool_is_deduplicated_across_client_restarts(port, tmp_path):
+    collector = Collector(port)
+    try:
+        first = _client(port, tmp_path)
+        first.record_transition(True, "load")
+        body = encode_batch(list(first._pending))
+        assert first.flush()
+        
+        # The same batch comes back from the spool of a restarted client, which starts at seq 1 again.
+        (tmp_path / "spool").mkdir()
+        (tmp_path / "spool" / "1-1.jsonl.gz").write_bytes(body)
+        second = _client(port, tmp_path)
+        second.record_transition(False, "idle")
+        assert second.flush()
+        
+        node = collector.collector.nodes["node-a"]
+        assert node.records == 2
+        assert node.duplicates == 1
+        assert [t["reason"] for t in node.transitions] == ["load", "idle"]
+    finally:
+        collector.close()
+
+
+def test_stop_spools_what_could_not_be_sent(port, tmp_path):
+    client = _client(port, tmp_path)
+    client.start()
+    client.record_transition(True, "load")
+    client.stop()
+    
+    spooled = client._spool_files()
+    assert len(spooled) == 1
+    assert decode_batch(spooled[0].read_bytes())[0]["reason"] == "load"
+
+
+def test_stalled_client_is_disconnected(port):
+    collector = Collector(port, read_timeout_seconds=0.2)
+    try:
+        with socket.create_connection(('127.0.0.1', port), timeout=5) as sock:
+            sock.sendall(b"POST /ingest HTTP/1.1\r\nContent-Length: 100\r\n\r\n0123456789")
+            assert sock.recv(1024) == b""
+    finally:
+        collector.close()
+
+
+def test_decode_batch_stops_at_max_bytes():
+    body = gzip.compress(b"{}\n" * 100000)
+    assert len(decode_batch(body)) == 100000
+    with pytest.raises(BatchTooLarge):
+        decode_batch(body, max_bytes=1024)
+
+
+def test_oversized_batch_is_rejected_with_413(port):
+    collector = Collector(port)
+    try:
+        body = gzip.compress(b" " * (65 * 1024 * 1024))
+        with socket.create_connection(('127.0.0.1', port), timeout=5) as sock:
+            sock.sendall(b"POST /ingest HTTP/1.1\r\nContent-Encoding: gzip\r\n"
+                         + f"Content-Length: {len(body)}\r\n\r\n".encode('ascii') + body)
+            assert sock.recv(1024).startswith(b"HTTP/1.1 413")
+        assert collector.collector.batches == 0
+    finally:
+        collector.close()
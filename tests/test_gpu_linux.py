@@ -0,0 +1,145 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from src import gpu_linux
+from src.gpu_linux import AmdSysfsSampler, IntelFdinfoSampler, drm_cards
+from src.gpu_samplers import GPUVendor
+
+INTEL_SLOT = "0000:00:02.0"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+    
+    def monotonic(self) -> float:
+        return self.now
+
+
+def _write(path: Path, text: str):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+def _amd_card(sysfs: Path, card: str, busy: int):
+    device = sysfs / 'class' / 'drm' / card / 'device'
+    _write(device / 'vendor', "0x1002\n")
+    _write(device / 'gpu_busy_percent', f"{busy}\n")
+    _write(device / 'mem_info_vram_used', f"{512 * 1048576}\n")
+    _write(device / 'mem_info_vram_total', f"{8192 * 1048576}\n")
+    _write(device / 'product_name', "Radeon RX 7800 XT\n")
+    return device
+
+
+def _intel_card(sysfs: Path, card: str):
+    device = sysfs / 'class' / 'drm' / card / 'device'
+    _write(device / 'vendor', "0x8086\n")
+    _write(device / 'uevent', f"DRIVER=i915\nPCI_SLOT_NAME={INTEL_SLOT}\n")
+    driver = sysfs / 'bus' / 'pci' / 'drivers' / 'i915'
+    driver.mkdir(parents=True, exist_ok=True)
+    os.symlink(driver, device / 'driver')
+    return device
+
+
+def _client(procfs: Path, pid: int, fd: int, target: str, fdinfo: str) -> Path:
+    fd_dir = procfs / str(pid) / 'fd'
+    fd_dir.mkdir(parents=True, exist_ok=True)
+    os.symlink(target, fd_dir / str(fd))
+    path = procfs / str(pid) / 'fdinfo' / str(fd)
+    _write(path, fdinfo)
+    return path
+
+
+def _i915_fdinfo(client_id: int, render_ns: int, video_ns: int = 0) -> str:
+    return (f"pos:\t0\nflags:\t02100002\ndrm-driver:\ti915\ndrm-pdev:\t{INTEL_SLOT}\n"
+            f"drm-client-id:\t{client_id}\ndrm-engine-render:\t{render_ns} ns\n"
+            f"drm-engine-video:\t{video_ns} ns\ndrm-engine-capacity-video:\t2\n")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(gpu_linux, 'time', fake)
+    return fake
+
+
+def test_drm_cards_skips_connectors_and_other_vendors(tmp_path):
+    _amd_card(tmp_path, 'card0', 10)
+    _write(tmp_path / 'class' / 'drm' / 'card0-DP-1' / 'device' / 'vendor', "0x1002\n")
+    _intel_card(tmp_path, 'card1')
+    
+    assert [name for name, _ in drm_cards(str(tmp_path), "0x1002")] == ['card0']
+    assert [name for name, _ in drm_cards(str(tmp_path), "0x8086")] == ['card1']
+
+
+def test_amd_sysfs_rereads_open_files(tmp_path):
+    device = _amd_card(tmp_path, 'card0', 37)
+    sampler = AmdSysfsSampler(None, sysfs_root=str(tmp_path))
+    
+    devices = sampler.discover({})
+    assert [(d.key, d.vendor, d.name) for d in devices] == [("drm:card0", GPUVendor.AMD, "Radeon RX 7800 XT")]
+    reading = sampler.sample()["drm:card0"]
+    assert reading.utilization == 37.0
+    assert reading.memory_used_mb == 512
+    assert reading.memory_total_mb == 8192
+    
+    _write(device / 'gpu_busy_percent', "88\n")
+    assert sampler.sample()["drm:card0"].utilization == 88.0
+
+
+def test_intel_fdinfo_engine_busy_time(tmp_path, clock):
+    sysfs = tmp_path / 'sys'
+    procfs = tmp_path / 'proc'
+    _intel_card(sysfs, 'card1')
+    game = _client(procfs, 4242, 7, '/dev/dri/renderD128', _i915_fdinfo(11, 0))
+    game_dup = _client(procfs, 4242, 8, '/dev/dri/renderD128', _i915_fdinfo(11, 0))
+    _client(procfs, 4243, 3, '/dev/null', _i915_fdinfo(12, 0))
+    compositor = _client(procfs, 900, 5, '/dev/dri/card1', _i915_fdinfo(13, 0))
+    
+    sampler = IntelFdinfoSampler(None, sysfs_root=str(sysfs), procfs_root=str(procfs), rescan_seconds=3600)
+    devices = sampler.discover({})
+    assert [(d.key, d.vendor) for d in devices] == [("drm:card1", GPUVendor.INTEL)]
+    assert len(sampler._clients) == 3
+    assert sampler.sample()["drm:card1"].utilization == 0.0
+    
+    # Over one second the game's render engine is busy 600 ms and the
+    # compositor's 150 ms; the same client open twice is only counted once.
+    clock.now += 1.0
+    for path in (game, game_dup):
+        _write(path, _i915_fdinfo(11, 600_000_000, 100_000_000))
+    _write(compositor, _i915_fdinfo(13, 150_000_000))
+    assert sampler.sample()["drm:card1"].utilization == pytest.approx(75.0)
+
+
+def test_intel_fdinfo_xe_cycles(tmp_path, clock):
+    sysfs = tmp_path / 'sys'
+    procfs = tmp_path / 'proc'
+    _intel_card(sysfs, 'card0')
+    
+    def xe(cycles: int, total: int) -> str:
+        return (f"drm-driver:\txe\ndrm-pdev:\t{INTEL_SLOT}\ndrm-client-id:\t5\n"
+                f"drm-cycles-rcs:\t{cycles}\ndrm-total-cycles-rcs:\t{total}\n")
+    
+    client = _client(procfs, 77, 4, '/dev/dri/renderD128', xe(1000, 10_000))
+    sampler = IntelFdinfoSampler(None, sysfs_root=str(sysfs), procfs_root=str(procfs), rescan_seconds=3600)
+    sampler.discover({})
+    sampler.sample()
+    
+    clock.now += 0.5
+    _write(client, xe(1000 + 2_000, 10_000 + 8_000))
+    assert sampler.sample()["drm:card0"].utilization == pytest.approx(25.0)
+
+
+def test_intel_fdinfo_drops_exited_clients(tmp_path, clock):
+    sysfs = tmp_path / 'sys'
+    procfs = tmp_path / 'proc'
+    _intel_card(sysfs, 'card1')
+    client = _client(procfs, 4242, 7, '/dev/dri/renderD128', _i915_fdinfo(11, 0))
+    
+    sampler = IntelFdinfoSampler(None, sysfs_root=str(sysfs), procfs_root=str(procfs), rescan_seconds=3600)
+    sampler.discover({})
+    _write(client, "")
+    sampler.sample()
+    assert sampler._clients == {}
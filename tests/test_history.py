@@ -0,0 +1,39 @@
+from src.history import HistoryStore
+
+
+class FakeConfig:
+    def __init__(self, interval_ms=1000, max_interval_ms=4000):
+        self.sampling_interval_ms = interval_ms
+        self.sampling_max_interval_ms = max_interval_ms
+        self.history_max_queue = 100
+
+
+def _intervals(store: HistoryStore):
+    return [sample[4] for sample in store._queue]
+
+
+def test_sample_interval_is_capped_at_twice_the_longest_tick(tmp_path):
+    store = HistoryStore(FakeConfig(), path=tmp_path / "history.db")
+    for ts in (100.0, 101.0, 105.0, 1000.0):
+        store.record(ts, 10.0, 5.0, False)
+    
+    assert _intervals(store) == [0.0, 1.0, 4.0, 8.0]
+
+
+def test_fixed_interval_longer_than_max_is_not_treated_as_a_gap(tmp_path):
+    store = HistoryStore(FakeConfig(interval_ms=10000, max_interval_ms=4000), path=tmp_path / "history.db")
+    for ts in (100.0, 110.0, 120.0):
+        store.record(ts, 10.0, 5.0, True)
+    
+    assert _intervals(store) == [0.0, 10.0, 10.0]
+
+
+def test_full_queue_drops_the_oldest_samples(tmp_path):
+    config = FakeConfig()
+    config.history_max_queue = 2
+    store = HistoryStore(config, path=tmp_path / "history.db")
+    for ts in (1.0, 2.0, 3.0):
+        store.record(ts, 1.0, 1.0, False)
+    
+    assert store.dropped == 1
+    assert [sample[0] for sample in store._queue] == [2.0, 3.0]
@@ -0,0 +1,122 @@
+from collections import namedtuple
+
+import pytest
+
+from src.io_load import BYTES_PER_MB, IoLoad
+
+DiskCounter = namedtuple('DiskCounter', ['read_bytes', 'write_bytes'])
+NetCounter = namedtuple('NetCounter', ['bytes_recv', 'bytes_sent'])
+
+
+class IoConfig:
+    def __init__(self, triggers):
+        self.io_triggers = triggers
+
+
+class FakeDisks:
+    """Per-disk byte counters that the test advances by hand."""
+    
+    def __init__(self, *disks):
+        self.counters = {name: [0, 0] for name in disks}
+    
+    def add(self, name: str, read_mb: float = 0.0, write_mb: float = 0.0):
+        counter = self.counters.setdefault(name, [0, 0])
+        counter[0] += int(read_mb * BYTES_PER_MB)
+        counter[1] += int(write_mb * BYTES_PER_MB)
+    
+    def __call__(self):
+        return {name: DiskCounter(*counter) for name, counter in self.counters.items()}
+
+
+def _load(disks, triggers, now: float = 100.0) -> IoLoad:
+    load = IoLoad(IoConfig(triggers), disk_counters=disks, net_counters=dict)
+    load.update(now)
+    return load
+
+
+def test_rate_is_bytes_per_second_per_device():
+    disks = FakeDisks("sda", "sdb")
+    load = _load(disks, [{"type": "disk", "direction": "read", "mbps": 100}])
+    
+    disks.add("sda", read_mb=100)
+    disks.add("sdb", read_mb=300)
+    load.update(102.0)
+    
+    assert load.rates()["disk"] == {"sda": (50.0, 0.0), "sdb": (150.0, 0.0)}
+    reason, headroom = load.evaluate()
+    assert reason == "Disk I/O sdb read at 150.0 MB/s"
+    assert headroom == 0.0
+
+
+def test_devices_are_not_summed():
+    disks = FakeDisks("sda", "sda1")
+    load = _load(disks, [{"type": "disk", "direction": "total", "mbps": 100}])
+    
+    # A disk and its partition report the same bytes; neither alone crosses the threshold.
+    disks.add("sda", read_mb=40, write_mb=20)
+    disks.add("sda1", read_mb=40, write_mb=20)
+    load.update(101.0)
+    
+    reason, headroom = load.evaluate()
+    assert reason is None
+    assert headroom == pytest.approx(40.0)
+
+
+def test_include_and_exclude_patterns_select_devices():
+    disks = FakeDisks("sda", "loop0")
+    load = _load(disks, [{"type": "disk", "direction": "write", "mbps": 10, "exclude": "loop*"}])
+    
+    disks.add("loop0", write_mb=500)
+    load.update(101.0)
+    assert load.evaluate()[0] is None
+    
+    disks.add("sda", write_mb=50)
+    load.update(102.0)
+    assert load.evaluate()[0] == "Disk I/O sda write at 50.0 MB/s"
+
+
+def test_new_device_is_matched_and_starts_from_zero():
+    disks = FakeDisks("sda")
+    load = _load(disks, [{"type": "disk", "direction": "read", "mbps": 10}])
+    
+    # A hot-plugged disk arrives with large lifetime counters; its first sample is not a rate.
+    disks.add("sdc", read_mb=10000)
+    load.update(101.0)
+    assert load.rates()["disk"]["sdc"] == (0.0, 0.0)
+    
+    disks.add("sdc", read_mb=20)
+    load.update(102.0)
+    assert load.evaluate()[0] == "Disk I/O sdc read at 20.0 MB/s"
+
+
+def test_counter_reset_reads_as_zero_rate():
+    disks = FakeDisks("sda")
+    load = _load(disks, [{"type": "disk", "direction": "read", "mbps": 10}])
+    disks.add("sda", read_mb=100)
+    load.update(101.0)
+    
+    disks.counters["sda"] = [0, 0]
+    load.update(102.0)
+    
+    assert load.rates()["disk"]["sda"] == (0.0, 0.0)
+
+
+def test_network_uses_received_and_sent_bytes():
+    counters = {"eth0": NetCounter(0, 0)}
+    load = IoLoad(IoConfig([{"type": "network", "direction": "read", "mbps": 5}]),
+                  disk_counters=dict, net_counters=lambda: counters)
+    load.update(100.0)
+    
+    counters["eth0"] = NetCounter(6 * BYTES_PER_MB, 1 * BYTES_PER_MB)
+    load.update(101.0)
+    
+    assert load.rates() == {"network": {"eth0": (6.0, 1.0)}}
+    assert load.evaluate()[0] == "Network I/O eth0 read at 6.0 MB/s"
+
+
+def test_invalid_trigger_specs_are_skipped():
+    load = _load(FakeDisks(), [{"type": "usb"}, {"type": "disk", "direction": "sideways"},
+                               {"type": "disk", "mbps": 0}, {"type": "disk"}])
+    
+    assert len(load.triggers) == 1
+    assert load.triggers[0].direction == "total"
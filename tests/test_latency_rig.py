@@ -0,0 +1,80 @@
+import shutil
+from types import SimpleNamespace
+
+import pytest
+
+from src.logging_setup import shutdown_logging
+from src.monitor import SystemMonitor
+from tools.latency_rig import GAME, HIGH, IDLE, Rig, Segment, build_scenarios, expected_windows, score
+
+
+def test_consecutive_boost_segments_merge_into_one_window():
+    timeline = [(0.0, Segment(3, IDLE)), (3.0, Segment(1, 0.8, expect_boost=True)),
+                (4.0, Segment(5, HIGH, expect_boost=True)), (9.0, Segment(2, IDLE)),
+                (11.0, Segment(2, HIGH, expect_boost=True))]
+    
+    assert expected_windows(timeline, 15.0) == [(3.0, 9.0), (11.0, 15.0)]
+
+
+def test_ramp_expects_one_window_from_seventy_percent_up_and_back_down():
+    timeline = []
+    started = 0.0
+    for segment in build_scenarios(2.0, 4.0)["ramp"]:
+        timeline.append((started, segment))
+        started += segment.seconds
+    
+    assert expected_windows(timeline, started) == [(pytest.approx(6.0), pytest.approx(18.0))]
+
+
+def test_score_measures_promote_and_demote_latency():
+    result = score([(3.0, 9.0)], [(5.2, True), (13.5, False)], 0.0, 20.0)
+    
+    assert result.promote == [pytest.approx(2.2)]
+    assert result.demote == [pytest.approx(4.5)]
+    assert (result.spurious, result.missed) == (0, 0)
+
+
+def test_score_counts_spurious_transitions_and_missed_windows():
+    transitions = [(1.0, True), (2.0, False), (4.0, True), (6.0, False), (7.0, True), (12.0, False)]
+    
+    result = score([(3.0, 9.0), (15.0, 18.0)], transitions, 0.0, 20.0)
+    
+    # Boosting before any window, dropping out mid-window and promoting twice are all spurious.
+    assert result.promote == [pytest.approx(1.0)]
+    assert result.demote == [pytest.approx(3.0)]
+    assert result.spurious == 4
+    assert result.missed == 1
+
+
+def test_score_without_windows_counts_every_transition_as_spurious():
+    result = score([], [(1.0, True), (3.0, False), (-1.0, True)], 0.0, 10.0)
+    
+    assert result.spurious == 2
+    assert result.missed == 0
+
+
+@pytest.fixture
+def rig():
+    rig = Rig(SimpleNamespace(promote_hold=2.0, demote_hold=4.0, interval_ms=250, workers=1, flap_control=False))
+    yield rig
+    shutdown_logging()
+    shutil.rmtree(rig.workdir, ignore_errors=True)
+
+
+def test_rig_config_turns_off_features_that_skew_latency(rig):
+    config = rig.config
+    
+    assert not config.flap_control_enabled
+    assert not config.attribution_enabled
+    assert not config.energy_enabled
+    assert not config.process_events_enabled
+    assert config.watched_games == [GAME]
+
+
+def test_monitor_uses_the_injected_process_table(rig):
+    processes = {1: "init", 4242: GAME}
+    monitor = SystemMonitor(rig.config, process_scanner=lambda: dict(processes))
+    
+    assert monitor.is_watched_game_running()
+    del processes[4242]
+    assert not monitor.is_watched_game_running()
@@ -0,0 +1,59 @@
+import logging
+
+from src.logging_setup import PACKAGE_LOGGER, SizeAndTimeRotatingFileHandler, setup_logging, shutdown_logging
+
+
+class LogConfig:
+    def __init__(self, log_dir, verbosity='info'):
+        self.log_dir = str(log_dir)
+        self.verbosity = verbosity
+        self.log_max_bytes = 1 << 20
+        self.log_backup_count = 2
+        self.log_rotate_hours = 24
+        self.log_batch_size = 10
+        self.log_flush_interval_ms = 10
+
+
+def test_later_setup_raises_verbosity_of_the_file_too(tmp_path):
+    logger = logging.getLogger(f"{PACKAGE_LOGGER}.test")
+    try:
+        setup_logging(LogConfig(tmp_path))
+        logger.debug("hidden")
+        setup_logging(LogConfig(tmp_path, verbosity='debug'))
+        logger.debug("shown")
+        setup_logging(LogConfig(tmp_path))
+        logger.debug("still shown")
+    finally:
+        shutdown_logging()
+        logging.getLogger(PACKAGE_LOGGER).setLevel(logging.NOTSET)
+    
+    text = (tmp_path / 'power_manager.log').read_text()
+    assert "hidden" not in text
+    assert "shown" in text and "still shown" in text
+
+
+def _record(message: str) -> logging.LogRecord:
+    return logging.LogRecord("test", logging.INFO, __file__, 1, message, None, None)
+
+
+def test_rotation_age_survives_reopening(tmp_path, monkeypatch):
+    path = tmp_path / 'power_manager.log'
+    now = [1_000_000.0]
+    monkeypatch.setattr("src.logging_setup.time.time", lambda: now[0])
+    
+    handler = SizeAndTimeRotatingFileHandler(path, max_bytes=1 << 20, backup_count=2, rotate_seconds=3600)
+    handler.emit(_record("first"))
+    handler.close()
+    
+    # Appending moves st_mtime forward, but the age still counts from the first write.
+    now[0] += 3000
+    handler = SizeAndTimeRotatingFileHandler(path, max_bytes=1 << 20, backup_count=2, rotate_seconds=3600)
+    assert not handler.shouldRollover(_record("x"))
+    now[0] += 700
+    assert handler.shouldRollover(_record("x"))
+    
+    handler.emit(_record("second"))
+    handler.close()
+    assert (tmp_path / 'power_manager.log.1').read_text().count("first") == 1
+    assert "second" in path.read_text()
+    assert float((tmp_path / 'power_manager.log.opened').read_text()) == now[0]
@@ -0,0 +1,134 @@
+import threading
+
+from src.overhead import OverheadMonitor
+
+
+class OverheadConfig:
+    overhead_budget_percent = 1.0
+    overhead_window_seconds = 3600.0
+    overhead_max_stride = 8
+    overhead_enforce = True
+
+
+def test_runs_from_several_threads_are_all_counted():
+    overhead = OverheadMonitor(OverheadConfig())
+    overhead.register("processEvents.poll")
+    
+    def poll():
+        for _ in range(2000):
+            overhead.run("processEvents.poll", lambda: True)
+    threads = [threading.Thread(target=poll) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for _ in range(2000):
+        overhead.tick()
+        overhead.run("cpu", lambda: 1.0)
+    for thread in threads:
+        thread.join()
+    
+    samplers = overhead.snapshot()["samplers"]
+    assert samplers["processEvents.poll"]["calls"] == 8000
+    assert samplers["cpu"]["calls"] == 2000
+
+
+def _over_budget(overhead: OverheadMonitor, name: str, share_percent: float):
+    """Close a one-second budget window in which the sampler used share_percent of a core."""
+    overhead._meters[name].window_cost = share_percent / 100.0
+    overhead._evaluate(1.0)
+
+
+def _sample_ticks(overhead: OverheadMonitor, name: str, ticks: int) -> int:
+    calls = []
+    for _ in range(ticks):
+        overhead.tick()
+        overhead.run(name, lambda: calls.append(True) or len(calls))
+    return len(calls)
+
+
+def test_stride_doubles_up_to_the_cap_and_reuses_the_last_value():
+    overhead = OverheadMonitor(OverheadConfig())
+    overhead.register("gpu")
+    overhead.run("gpu", lambda: 42)
+    
+    for expected in (2, 4, 8, 8):
+        _over_budget(overhead, "gpu", 5.0)
+        assert overhead._meters["gpu"].stride == expected
+    
+    assert _sample_ticks(overhead, "gpu", 64) == 8
+    assert overhead.snapshot()["samplers"]["gpu"]["skipped"] == 56
+
+
+def test_stride_relaxes_once_well_below_budget():
+    overhead = OverheadMonitor(OverheadConfig())
+    overhead.register("gpu")
+    _over_budget(overhead, "gpu", 5.0)
+    _over_budget(overhead, "gpu", 5.0)
+    
+    _over_budget(overhead, "gpu", 0.8)
+    assert overhead._meters["gpu"].stride == 4
+    _over_budget(overhead, "gpu", 0.1)
+    _over_budget(overhead, "gpu", 0.1)
+    assert overhead._meters["gpu"].stride == 1
+
+
+def test_fallback_is_tried_before_striding():
+    overhead = OverheadMonitor(OverheadConfig())
+    swaps = []
+    overhead.register("gpu", fallback=lambda: swaps.append(True) or True)
+    
+    _over_budget(overhead, "gpu", 5.0)
+    assert swaps == [True]
+    assert overhead._meters["gpu"].stride == 1
+    assert overhead.snapshot()["samplers"]["gpu"]["fallbackActive"]
+    
+    _over_budget(overhead, "gpu", 5.0)
+    assert swaps == [True]
+    assert overhead._meters["gpu"].stride == 2
+
+
+def test_declined_fallback_falls_through_to_striding():
+    overhead = OverheadMonitor(OverheadConfig())
+    overhead.register("gpu", fallback=lambda: False)
+    
+    _over_budget(overhead, "gpu", 5.0)
+    
+    assert overhead._meters["gpu"].stride == 2
+    assert not overhead._meters["gpu"].fallback_active
+
+
+def test_non_strideable_sampler_is_only_reported(caplog):
+    overhead = OverheadMonitor(OverheadConfig())
+    overhead.register("cpu", strideable=False)
+    
+    _over_budget(overhead, "cpu", 5.0)
+    _over_budget(overhead, "cpu", 5.0)
+    
+    assert overhead._meters["cpu"].stride == 1
+    assert _sample_ticks(overhead, "cpu", 8) == 8
+    assert sum("not throttled" in record.getMessage() for record in caplog.records) == 1
+
+
+def test_nothing_is_throttled_when_not_enforcing():
+    config = OverheadConfig()
+    config.overhead_enforce = False
+    overhead = OverheadMonitor(config)
+    overhead.register("gpu", fallback=lambda: True)
+    
+    _over_budget(overhead, "gpu", 50.0)
+    
+    assert overhead._meters["gpu"].stride == 1
+    assert not overhead._meters["gpu"].fallback_active
+
+
+def test_failing_sampler_returns_its_last_value_and_logs_once(caplog):
+    overhead = OverheadMonitor(OverheadConfig())
+    overhead.register("gpu")
+    assert overhead.run("gpu", lambda: 7) == 7
+    
+    def fail():
+        raise OSError("device lost")
+    assert overhead.run("gpu", fail) == 7
+    assert overhead.run("gpu", fail) == 7
+    
+    assert overhead.snapshot()["samplers"]["gpu"]["errors"] == 2
+    assert sum("device lost" in record.getMessage() for record in caplog.records) == 1
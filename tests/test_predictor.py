@@ -0,0 +1,136 @@
+import json
+import time
+
+import pytest
+
+from src.predictor import LaunchPredictor, time_bucket
+
+GAME = "game.exe"
+
+
+class PredictionConfig:
+    def __init__(self, model_path=None, max_entries: int = 100):
+        self.prediction_model_path = model_path
+        self.prediction_lookback_seconds = 60.0
+        self.prediction_min_launches = 3
+        self.prediction_min_confidence = 0.6
+        self.prediction_boost_seconds = 30.0
+        self.prediction_max_entries = max_entries
+
+
+def _at(hour: int, minute: int = 0, day: int = 5) -> float:
+    """A local timestamp at the given hour, so time-of-day buckets are deterministic."""
+    return time.mktime((2026, 1, day, hour, minute, 0, 0, 0, -1))
+
+
+def _launch(predictor: LaunchPredictor, name: str, now: float, boosted: bool):
+    prediction = predictor.observe({"shell", name}, now)
+    if boosted:
+        predictor.record_sustained_load(now + 10)
+    predictor.observe({"shell"}, now + 20)
+    return prediction
+
+
+def _predictor(**kwargs) -> LaunchPredictor:
+    predictor = LaunchPredictor(PredictionConfig(**kwargs))
+    predictor.observe({"shell"}, _at(0))
+    return predictor
+
+
+def test_processes_running_at_startup_are_not_launches():
+    predictor = LaunchPredictor(PredictionConfig())
+    predictor.observe({"shell", GAME}, _at(20))
+    predictor.observe({"shell", GAME}, _at(20, 1))
+    
+    assert predictor._stats == {}
+
+
+def test_prediction_needs_enough_launches_and_confidence():
+    predictor = _predictor()
+    
+    for day in (5, 6, 7):
+        assert _launch(predictor, GAME, _at(20, day=day), boosted=True) is None
+    prediction = _launch(predictor, GAME, _at(20, day=8), boosted=False)
+    
+    assert prediction is not None
+    assert prediction.confidence == 1.0
+    assert prediction.expires_at == _at(20, day=8) + 30.0
+    assert "3/3 launches in the evening" in prediction.explain()
+
+
+def test_time_of_day_bucket_wins_when_it_has_support():
+    predictor = _predictor()
+    for day in (5, 6, 7):
+        _launch(predictor, GAME, _at(20, day=day), boosted=True)
+    for day in (5, 6, 7):
+        _launch(predictor, GAME, _at(9, day=day), boosted=False)
+    
+    # Overall 3/6 is below the 60% confidence, but evenings alone are 3/3.
+    assert _launch(predictor, GAME, _at(21, day=9), boosted=False).bucket == time_bucket(_at(21))
+    assert _launch(predictor, GAME, _at(10, day=9), boosted=False) is None
+
+
+def test_overall_ratio_is_used_when_the_bucket_is_thin():
+    predictor = _predictor()
+    for day in (5, 6, 7):
+        _launch(predictor, GAME, _at(20, day=day), boosted=True)
+    
+    prediction = _launch(predictor, GAME, _at(3, day=8), boosted=False)
+    
+    assert prediction.bucket is None
+    assert "3/3 launches preceded" in prediction.explain()
+
+
+def test_only_launches_in_the_lookback_window_are_credited_once():
+    predictor = _predictor()
+    predictor.observe({"shell", "old.exe"}, _at(20))
+    predictor.observe({"shell", "old.exe", GAME}, _at(20, 2))
+    
+    predictor.record_sustained_load(_at(20, 2) + 5)
+    predictor.record_sustained_load(_at(20, 2) + 50)
+    
+    assert predictor._stats["old.exe"].boosts == 0
+    assert predictor._stats[GAME].boosts == 1
+
+
+def test_active_prediction_ends_on_exit_or_expiry():
+    predictor = _predictor()
+    for day in (5, 6, 7):
+        _launch(predictor, GAME, _at(20, day=day), boosted=True)
+    now = _at(20, day=8)
+    predictor.observe({"shell", GAME}, now)
+    
+    assert predictor.active_prediction({"shell", GAME}, now + 29) is not None
+    assert predictor.active_prediction({"shell", GAME}, now + 30) is None
+    
+    predictor.observe({"shell"}, now + 40)
+    predictor.observe({"shell", GAME}, now + 50)
+    assert predictor.active_prediction({"shell"}, now + 51) is None
+
+
+def test_least_recently_seen_names_are_evicted():
+    predictor = _predictor(max_entries=2)
+    for minute, name in enumerate(("a.exe", "b.exe", "c.exe")):
+        predictor.observe({"shell", name}, _at(20, minute))
+    
+    assert set(predictor._stats) == {"b.exe", "c.exe"}
+
+
+def test_model_round_trips_through_disk(tmp_path):
+    path = tmp_path / "launch_model.json"
+    predictor = _predictor(model_path=path)
+    for day in (5, 6, 7):
+        _launch(predictor, GAME, _at(20, day=day), boosted=day != 7)
+    predictor.save()
+    
+    restored = LaunchPredictor(PredictionConfig(model_path=path))
+    
+    assert restored.top_predictors() == [(GAME, pytest.approx(2 / 3), 2, 3)]
+    assert restored._stats[GAME].to_dict() == predictor._stats[GAME].to_dict()
+
+
+def test_model_with_another_version_is_ignored(tmp_path):
+    path = tmp_path / "launch_model.json"
+    path.write_text(json.dumps({"version": 99, "processes": {GAME: {"launches": 5, "boosts": 5}}}))
+    
+    assert LaunchPredictor(PredictionConfig(model_path=path))._stats == {}
@@ -0,0 +1,88 @@
+import threading
+
+import pytest
+
+from src.process_events import (_CN_MSG, _EXEC_EVENT, _NLMSGHDR, _PROC_EVENT, CN_IDX_PROC, CN_VAL_PROC,
+                                NLMSG_DONE, PROC_EVENT_EXEC, NetlinkProcSource, ProcessEventSource)
+
+GAME = "cyberpunk2077.exe"
+
+
+class FailingSource(ProcessEventSource):
+    name = "failing"
+    
+    def _run(self):
+        raise OSError("access denied")
+
+
+class IdleSource(ProcessEventSource):
+    name = "idle"
+    
+    def __init__(self, names, callback):
+        super().__init__(names, callback)
+        self.started = threading.Event()
+    
+    def _run(self):
+        self.started.set()
+        self._stop_event.wait()
+
+
+def _exec_message(pid: int, tgid: int) -> bytes:
+    event = _PROC_EVENT.pack(PROC_EVENT_EXEC, 0, 0) + _EXEC_EVENT.pack(pid, tgid)
+    cn_msg = _CN_MSG.pack(CN_IDX_PROC, CN_VAL_PROC, 0, 0, len(event), 0) + event
+    return _NLMSGHDR.pack(_NLMSGHDR.size + len(cn_msg), NLMSG_DONE, 0, 0, 0) + cn_msg
+
+
+def test_base_source_cannot_be_instantiated():
+    with pytest.raises(TypeError):
+        ProcessEventSource([GAME], lambda pid, name: None)
+
+
+def test_runtime_failure_hands_over_to_the_fallback():
+    replacements = []
+    
+    def fallback():
+        replacements.append(IdleSource([GAME], lambda pid, name: None))
+        return replacements[-1]
+    source = FailingSource([GAME], lambda pid, name: None, fallback=fallback)
+    
+    source.start()
+    source._thread.join(timeout=2)
+    
+    assert len(replacements) == 1
+    assert replacements[0].started.wait(2)
+    assert source.fallback_source is replacements[0]
+    
+    source.stop()
+    assert replacements[0]._thread is None
+    assert source.fallback_source is None
+
+
+def test_failure_without_fallback_just_stops():
+    source = FailingSource([GAME], lambda pid, name: None)
+    source.start()
+    source._thread.join(timeout=2)
+    assert source.fallback_source is None
+
+
+def test_netlink_exec_events_resolve_truncated_names(tmp_path, monkeypatch):
+    seen = []
+    (tmp_path / "4242").mkdir()
+    (tmp_path / "4242" / "comm").write_text(GAME[:15] + "\n")
+    (tmp_path / "77").mkdir()
+    (tmp_path / "77" / "comm").write_text("bash\n")
+    source = NetlinkProcSource([GAME], lambda pid, name: seen.append((pid, name)), procfs_root=str(tmp_path))
+    
+    class FakeProcess:
+        def __init__(self, pid):
+            self.pid = pid
+        
+        def name(self):
+            return "Cyberpunk2077.exe"
+    monkeypatch.setattr("src.process_events.psutil.Process", FakeProcess)
+    
+    # A thread exec (pid != tgid) and a non-matching process are ignored.
+    source.handle_message(_exec_message(4242, 4242) + _exec_message(4243, 4242) + _exec_message(77, 77))
+    
+    assert seen == [(4242, GAME)]
+    assert source.events == 1
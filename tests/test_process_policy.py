@@ -0,0 +1,151 @@
+import contextlib
+
+import psutil
+import pytest
+
+from src.process_policy import PRIORITY_LEVELS, ProcessPolicy
+
+GAME = "game.exe"
+LOW = PRIORITY_LEVELS["belowNormal"]
+NORMAL = PRIORITY_LEVELS["normal"]
+
+
+class FakeConfig:
+    def __init__(self, rules):
+        self.process_policy_rules = rules
+        self.watched_games = [GAME]
+
+
+class FakeProcess:
+    def __init__(self, pid: int, create_time: float = 1000.0, nice: int = NORMAL, deny: bool = False):
+        self.pid = pid
+        self._create_time = create_time
+        self._nice = nice
+        self._affinity = [0, 1, 2, 3]
+        self.deny = deny
+        self.sets = []
+    
+    def oneshot(self):
+        return contextlib.nullcontext()
+    
+    def create_time(self) -> float:
+        return self._create_time
+    
+    def nice(self, value=None):
+        if value is None:
+            return self._nice
+        self._check()
+        self.sets.append(('nice', value))
+        self._nice = value
+    
+    def cpu_affinity(self, value=None):
+        if value is None:
+            return list(self._affinity)
+        self._check()
+        self.sets.append(('cpu_affinity', value))
+        self._affinity = list(value)
+    
+    def _check(self):
+        if self.deny:
+            raise psutil.AccessDenied(self.pid)
+
+
+class ProcessTable:
+    """Stands in for psutil.Process: hands out whatever process currently has the PID."""
+    
+    def __init__(self):
+        self.processes = {}
+    
+    def add(self, process: FakeProcess) -> FakeProcess:
+        self.processes[process.pid] = process
+        return process
+    
+    def __call__(self, pid: int) -> FakeProcess:
+        if pid not in self.processes:
+            raise psutil.NoSuchProcess(pid)
+        return self.processes[pid]
+
+
+def _policy(table, **rule):
+    return ProcessPolicy(FakeConfig([{"match": "$watched", **rule}]), process_factory=table)
+
+
+def test_priority_is_restored_when_the_boost_ends():
+    table = ProcessTable()
+    game = table.add(FakeProcess(10))
+    policy = _policy(table, priority="belowNormal")
+    
+    policy.update(True, {10: GAME, 11: "shell"})
+    assert game.nice() == LOW
+    assert policy.snapshot()["managed"] == 1
+    
+    policy.update(False, {10: GAME})
+    assert game.nice() == NORMAL
+    assert policy.snapshot() == {"active": False, "managed": 0, "failed": 0}
+
+
+def test_reused_pid_is_left_alone():
+    table = ProcessTable()
+    game = table.add(FakeProcess(10, create_time=1000.0))
+    policy = _policy(table, priority="belowNormal")
+    policy.update(True, {10: GAME})
+    
+    # The stored object still reports its cached create time, as psutil.Process does.
+    stranger = table.add(FakeProcess(10, create_time=2000.0, nice=LOW))
+    policy.restore_all()
+    
+    assert game.sets == [('nice', LOW)]
+    assert stranger.sets == []
+    assert stranger.nice() == LOW
+
+
+def test_exited_process_is_skipped_on_restore():
+    table = ProcessTable()
+    table.add(FakeProcess(10))
+    policy = _policy(table, priority="belowNormal")
+    policy.update(True, {10: GAME})
+    
+    del table.processes[10]
+    policy.restore_all()
+    
+    assert policy.snapshot()["managed"] == 0
+
+
+def test_access_denied_on_apply_is_not_remembered_or_retried():
+    table = ProcessTable()
+    game = table.add(FakeProcess(10, deny=True))
+    policy = _policy(table, priority="belowNormal")
+    
+    policy.update(True, {10: GAME})
+    policy.update(True, {10: GAME})
+    
+    assert policy.snapshot()["managed"] == 0
+    policy.restore_all()
+    assert game.sets == []
+
+
+def test_access_denied_on_restore_is_logged(caplog):
+    table = ProcessTable()
+    game = table.add(FakeProcess(10))
+    policy = _policy(table, priority="belowNormal")
+    policy.update(True, {10: GAME})
+    
+    game.deny = True
+    policy.restore_all()
+    
+    assert game.nice() == LOW
+    assert any("Cannot restore" in record.getMessage() and record.levelname == "WARNING"
+               for record in caplog.records)
+
+
+@pytest.mark.skipif(not hasattr(psutil.Process, 'cpu_affinity'), reason="no CPU affinity on this platform")
+def test_affinity_is_restored():
+    table = ProcessTable()
+    game = table.add(FakeProcess(10))
+    policy = _policy(table, affinity="0")
+    
+    policy.update(True, {10: GAME})
+    assert game.cpu_affinity() == [0]
+    
+    policy.update(False, {})
+    assert game.cpu_affinity() == [0, 1, 2, 3]
@@ -0,0 +1,90 @@
+from src.processor_settings import (BOOST_MODES, PROCESSOR_SETTINGS, SCHEME_CURRENT, SUB_PROCESSOR,
+                                    ProcessorSettingsController, RecordingPowercfg, parse_query_output,
+                                    resolve_settings)
+
+MIN = PROCESSOR_SETTINGS["minProcessorState"]
+MAX = PROCESSOR_SETTINGS["maxProcessorState"]
+BOOST = PROCESSOR_SETTINGS["boostMode"]
+EPP = PROCESSOR_SETTINGS["epp"]
+
+# `powercfg /qh` with German labels; only the GUIDs and hex values are read.
+GERMAN_QUERY = f"""GUID des Energieschemas: 381b4222-f694-41f0-9685-ff5bb260df2e  (Ausbalanciert)
+  GUID der Untergruppe: {SUB_PROCESSOR}  (Prozessorenergieverwaltung)
+    GUID der Energieeinstellung: {MIN}  (Minimaler Leistungszustand des Prozessors)
+      Minimaler möglicher Einstellungswert: 0x00000000
+      Maximaler möglicher Einstellungswert: 0x00000064
+      Aktueller Wechselstrom-Einstellungsindex: 0x00000005
+      Aktueller Gleichstrom-Einstellungsindex: 0x00000005
+    GUID der Energieeinstellung: {BOOST}  (Modus zur Leistungssteigerung des Prozessors)
+      Index der möglichen Einstellung: 000
+      Angezeigter Name der möglichen Einstellung: Deaktiviert
+      Aktueller Wechselstrom-Einstellungsindex: 0x00000002
+      Aktueller Gleichstrom-Einstellungsindex: 0x00000001
+"""
+
+
+class FakeConfig:
+    def __init__(self, boost, normal, power_sources=("ac", "dc")):
+        self._states = {True: boost, False: normal}
+        self.processor_power_sources = list(power_sources)
+    
+    def processor_settings_for(self, boost: bool):
+        return self._states[boost]
+
+
+class FailingPowercfg(RecordingPowercfg):
+    def run_batch(self, commands):
+        self.batches.append(commands)
+        return False
+
+
+def test_parse_query_output_is_positional():
+    values = parse_query_output(GERMAN_QUERY)
+    assert values == {(MIN, "ac"): 5, (MIN, "dc"): 5, (BOOST, "ac"): 2, (BOOST, "dc"): 1}
+
+
+def test_resolve_settings_validates_values():
+    resolved = resolve_settings({"minProcessorState": 150, "epp": -3, "boostMode": "efficientAggressive",
+                                 "maxProcessorState": "fast", "turbo": 1})
+    assert resolved == {MIN: 100, EPP: 0, BOOST: BOOST_MODES["efficientAggressive"]}
+
+
+def test_apply_writes_only_changed_values_in_one_batch():
+    runner = RecordingPowercfg({(MIN, "ac"): 5, (MIN, "dc"): 5, (MAX, "ac"): 100, (MAX, "dc"): 100})
+    config = FakeConfig(boost={"minProcessorState": 100, "maxProcessorState": 100},
+                        normal={"minProcessorState": 5, "maxProcessorState": 100})
+    controller = ProcessorSettingsController(config, runner)
+    
+    assert controller.apply(True) == 2
+    assert runner.batches == [[
+        ["/setacvalueindex", SCHEME_CURRENT, SUB_PROCESSOR, MIN, "100"],
+        ["/setdcvalueindex", SCHEME_CURRENT, SUB_PROCESSOR, MIN, "100"],
+        ["/setactive", SCHEME_CURRENT]
+    ]]
+    
+    # Values are tracked after the first query: no re-query and no batch when nothing changed.
+    assert controller.apply(True) == 0
+    assert runner.queries == 1
+    assert len(runner.batches) == 1
+    
+    assert controller.apply(False) == 2
+    assert runner.values[(MIN, "ac")] == 5
+    assert controller.applied_batches == 2
+
+
+def test_apply_respects_power_sources():
+    runner = RecordingPowercfg()
+    controller = ProcessorSettingsController(FakeConfig({"epp": 0}, {"epp": 50}, power_sources=["ac"]), runner)
+    
+    assert controller.apply(True) == 1
+    assert runner.batches[0][0] == ["/setacvalueindex", SCHEME_CURRENT, SUB_PROCESSOR, EPP, "0"]
+
+
+def test_failed_batch_forces_a_fresh_query():
+    runner = FailingPowercfg({(MIN, "ac"): 5, (MIN, "dc"): 5})
+    controller = ProcessorSettingsController(FakeConfig({"minProcessorState": 100}, {"minProcessorState": 5}),
+                                             runner)
+    
+    assert controller.apply(True) is None
+    assert controller.apply(True) is None
+    assert runner.queries == 2
@@ -0,0 +1,75 @@
+import pstats
+import threading
+import time
+
+from src import profiling
+from src.profiling import TickProfiler, collapse_stack, profiled_section
+
+
+def _busy_monitor_work(seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def _busy_restart_work(seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def _restart_worker():
+    with profiled_section():
+        _busy_restart_work(0.2)
+
+
+def test_worker_sections_are_profiled_with_the_monitor_ticks(tmp_path):
+    profiler = TickProfiler(2, tmp_path, sample_interval_ms=1)
+    
+    profiler.tick_started()
+    worker = threading.Thread(target=_restart_worker, name='ServiceRestart')
+    worker.start()
+    _busy_monitor_work(0.05)
+    worker.join()
+    assert not profiler.tick_finished()
+    profiler.tick_started()
+    _busy_monitor_work(0.01)
+    assert profiler.tick_finished()
+    
+    assert profiling._active is None
+    pstats_path = next(tmp_path.glob('*.pstats'))
+    collapsed_path = next(tmp_path.glob('*.collapsed'))
+    functions = {name for _, _, name in pstats.Stats(str(pstats_path)).stats}
+    assert {'_busy_monitor_work', '_busy_restart_work'} <= functions
+    
+    collapsed = collapsed_path.read_text()
+    assert f"{threading.current_thread().name};" in collapsed
+    assert "ServiceRestart;" in collapsed
+    assert "_busy_restart_work" in collapsed
+
+
+def test_sampler_sleeps_between_ticks(tmp_path):
+    profiler = TickProfiler(5, tmp_path, sample_interval_ms=1)
+    
+    profiler.tick_started()
+    assert profiler._busy_event.is_set()
+    profiler.tick_finished()
+    assert not profiler._busy_event.is_set()
+    
+    profiler.finish()
+    assert profiler._sampler is None
+
+
+def test_sections_outside_profiling_are_free():
+    assert profiling._active is None
+    with profiled_section():
+        pass
+
+
+def test_collapse_stack_is_root_first():
+    def inner():
+        import sys
+        return collapse_stack(sys._getframe())
+    stack = inner()
+    assert stack.split(";")[-1].startswith("inner (test_profiling.py:")
+    assert stack.index("test_collapse_stack_is_root_first") < stack.index("inner")
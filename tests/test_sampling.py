@@ -0,0 +1,49 @@
+import pytest
+
+from src.sampling import AdaptiveInterval
+
+
+class SamplingConfig:
+    def __init__(self, adaptive: bool = True):
+        self.adaptive_sampling = adaptive
+        self.sampling_interval_ms = 1000
+        self.sampling_min_interval_ms = 250
+        self.sampling_max_interval_ms = 2000
+        self.sampling_near_margin_percent = 10.0
+        self.sampling_far_margin_percent = 40.0
+
+
+def test_fixed_interval_when_adaptive_sampling_is_off():
+    interval = AdaptiveInterval(SamplingConfig(adaptive=False))
+    assert interval.next_interval_ms(100.0, urgent=False) == 1000.0
+    assert interval.next_interval_ms(0.0, urgent=True) == 1000.0
+
+
+def test_backs_off_gradually_when_far_from_every_threshold():
+    interval = AdaptiveInterval(SamplingConfig())
+    
+    steps = [interval.next_interval_ms(80.0, urgent=False) for _ in range(6)]
+    
+    assert steps == pytest.approx([375.0, 562.5, 843.75, 1265.625, 1898.4375, 2000.0])
+
+
+def test_target_is_interpolated_between_the_margins():
+    interval = AdaptiveInterval(SamplingConfig())
+    for _ in range(10):
+        interval.next_interval_ms(80.0, urgent=False)
+    
+    # Halfway between the near and far margins asks for halfway between min and max.
+    assert interval.next_interval_ms(25.0, urgent=False) == pytest.approx(1125.0)
+
+
+def test_snaps_back_near_a_threshold_or_when_urgent():
+    interval = AdaptiveInterval(SamplingConfig())
+    for _ in range(10):
+        interval.next_interval_ms(80.0, urgent=False)
+    
+    assert interval.next_interval_ms(5.0, urgent=False) == 250.0
+    
+    for _ in range(10):
+        interval.next_interval_ms(80.0, urgent=False)
+    assert interval.next_interval_ms(80.0, urgent=True) == 250.0
+    assert interval.next_interval_ms(80.0, urgent=False) == 375.0
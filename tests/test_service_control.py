@@ -0,0 +1,124 @@
+import pytest
+
+from src.service_control import (RUNNING, STOP_PENDING, STOPPED, UNKNOWN, ServiceController,
+                                 SimulatedServiceBackend)
+
+SERVICE = "L-Connect Service"
+
+
+class FakeClock:
+    """Time that only moves when the controller sleeps."""
+    
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+    
+    def monotonic(self) -> float:
+        return self.now
+    
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _controller(backend, clock, deadline_seconds=20.0):
+    return ServiceController(backend, poll_seconds=0.05, deadline_seconds=deadline_seconds,
+                             clock=clock.monotonic, sleep=clock.sleep)
+
+
+def test_restart_waits_for_each_phase():
+    clock = FakeClock()
+    backend = SimulatedServiceBackend(stop_seconds=1.0, start_seconds=0.5, clock=clock.monotonic)
+    
+    result = _controller(backend, clock).restart(SERVICE)
+    
+    assert result.ok and result.state == RUNNING
+    assert result.stop_seconds == pytest.approx(1.0, abs=0.2)
+    assert result.start_seconds == pytest.approx(0.5, abs=0.2)
+    assert backend.requests == [('stop', SERVICE), ('start', SERVICE)]
+
+
+def test_polling_backs_off_to_four_times_the_interval():
+    clock = FakeClock()
+    backend = SimulatedServiceBackend(stop_seconds=2.0, clock=clock.monotonic)
+    
+    _controller(backend, clock).restart(SERVICE)
+    
+    assert clock.sleeps[:4] == pytest.approx([0.05, 0.1, 0.2, 0.2])
+    assert max(clock.sleeps) == pytest.approx(0.2)
+
+
+def test_restart_gives_up_at_the_deadline():
+    clock = FakeClock()
+    backend = SimulatedServiceBackend(stop_seconds=60.0, clock=clock.monotonic)
+    
+    result = _controller(backend, clock, deadline_seconds=5.0).restart(SERVICE)
+    
+    assert not result.ok
+    assert result.state == STOP_PENDING
+    assert "within 5s" in result.error
+    assert clock.now == pytest.approx(105.0)
+    assert ('start', SERVICE) not in backend.requests
+
+
+def test_unknown_service_fails_without_waiting():
+    clock = FakeClock()
+    backend = SimulatedServiceBackend(clock=clock.monotonic, state=UNKNOWN)
+    
+    result = _controller(backend, clock).restart(SERVICE)
+    
+    assert not result.ok and result.state == UNKNOWN
+    assert clock.sleeps == []
+    assert backend.requests == []
+
+
+def test_rejected_request_fails_without_waiting():
+    clock = FakeClock()
+    backend = SimulatedServiceBackend(clock=clock.monotonic)
+    
+    def reject(service):
+        raise OSError("access denied")
+    backend.request_stop = reject
+    
+    result = _controller(backend, clock).restart(SERVICE)
+    
+    assert not result.ok and result.state == RUNNING
+    assert "access denied" in result.error
+    assert clock.sleeps == []
+
+
+def test_stopped_service_is_only_started():
+    clock = FakeClock()
+    backend = SimulatedServiceBackend(start_seconds=0.3, clock=clock.monotonic, state=STOPPED)
+    
+    result = _controller(backend, clock).restart(SERVICE)
+    
+    assert result.ok
+    assert backend.requests == [('start', SERVICE)]
+
+
+def test_during_stop_runs_while_stopping_and_failure_is_raised_after_start():
+    clock = FakeClock()
+    backend = SimulatedServiceBackend(stop_seconds=1.0, clock=clock.monotonic)
+    seen = []
+    
+    def write_config():
+        seen.append(backend.query(SERVICE))
+        raise OSError("disk full")
+    
+    with pytest.raises(OSError, match="disk full"):
+        _controller(backend, clock).restart(SERVICE, during_stop=write_config)
+    
+    assert seen == [STOP_PENDING]
+    assert backend.query(SERVICE) == RUNNING
+
+
+def test_during_stop_runs_even_when_the_service_is_unknown():
+    clock = FakeClock()
+    backend = SimulatedServiceBackend(clock=clock.monotonic, state=UNKNOWN)
+    calls = []
+    
+    result = _controller(backend, clock).restart(SERVICE, during_stop=lambda: calls.append(True))
+    
+    assert calls == [True]
+    assert not result.ok
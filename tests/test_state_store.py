@@ -0,0 +1,46 @@
+import json
+
+from src.state_store import OVERRIDE_AUTO, OVERRIDE_BOOST, STATE_VERSION, StateStore
+
+
+def test_saved_state_round_trips(tmp_path):
+    store = StateStore(tmp_path / "state" / "state.json")
+    
+    store.save(True, OVERRIDE_BOOST, {"planName": "High performance", "planGuid": "8c5e7fda", "fanHash": None})
+    state = store.load()
+    
+    assert state["version"] == STATE_VERSION
+    assert state["boosted"] is True
+    assert state["overrideMode"] == OVERRIDE_BOOST
+    assert state["planName"] == "High performance"
+    assert state["planGuid"] == "8c5e7fda"
+    assert state["fanHash"] is None
+    assert not (tmp_path / "state" / "state.json.tmp").exists()
+
+
+def test_missing_file_loads_as_nothing(tmp_path):
+    assert StateStore(tmp_path / "state.json").load() is None
+
+
+def test_corrupt_or_foreign_files_are_ignored(tmp_path):
+    path = tmp_path / "state.json"
+    store = StateStore(path)
+    
+    path.write_text("{not json")
+    assert store.load() is None
+    
+    path.write_text(json.dumps({"version": STATE_VERSION + 1, "boosted": True}))
+    assert store.load() is None
+    
+    path.write_text(json.dumps({"version": STATE_VERSION}))
+    assert store.load() is None
+    
+    path.write_text(json.dumps([1, 2]))
+    assert store.load() is None
+
+
+def test_unknown_override_mode_falls_back_to_auto(tmp_path):
+    path = tmp_path / "state.json"
+    path.write_text(json.dumps({"version": STATE_VERSION, "boosted": False, "overrideMode": "turbo"}))
+    
+    assert StateStore(path).load()["overrideMode"] == OVERRIDE_AUTO
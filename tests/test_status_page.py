@@ -0,0 +1,120 @@
+import threading
+
+import pytest
+
+from src.status_page import StatusPage
+from src.status_reader import REASON_BYTES, SEQUENCE, SEQUENCE_OFFSET, StatusPageReader
+
+
+def _publish(page: StatusPage, i: int):
+    page.publish(1000.0 + i, float(i), float(i), i % 2 == 1, False, i, i / 2, f"tick {i}")
+
+
+def test_published_state_is_read_back(tmp_path):
+    page = StatusPage(tmp_path / "status" / "page")
+    reader = StatusPageReader(str(tmp_path / "status" / "page"))
+    try:
+        page.publish(1234.5, 91.5, 12.0, True, True, 7, 42.0, "CPU at 91.5%")
+        snapshot = reader.read()
+        
+        assert snapshot.sequence == 2
+        assert snapshot.timestamp == 1234.5
+        assert snapshot.cpu == 91.5 and snapshot.gpu == 12.0
+        assert snapshot.boosted and snapshot.manual_override
+        assert snapshot.transitions == 7
+        assert snapshot.boost_seconds == 42.0
+        assert snapshot.reason == "CPU at 91.5%"
+    finally:
+        reader.close()
+        page.close()
+
+
+def test_long_reason_is_truncated(tmp_path):
+    page = StatusPage(tmp_path / "page")
+    reader = StatusPageReader(str(tmp_path / "page"))
+    try:
+        page.publish(0.0, 0.0, 0.0, False, False, 0, 0.0, "x" * 300)
+        assert reader.read().reason == "x" * REASON_BYTES
+    finally:
+        reader.close()
+        page.close()
+
+
+def test_changed_tracks_publishes_since_the_last_read(tmp_path):
+    page = StatusPage(tmp_path / "page")
+    reader = StatusPageReader(str(tmp_path / "page"))
+    try:
+        _publish(page, 1)
+        assert reader.changed()
+        reader.read()
+        assert not reader.changed()
+        _publish(page, 2)
+        assert reader.changed()
+    finally:
+        reader.close()
+        page.close()
+
+
+def test_read_gives_up_while_the_writer_is_mid_update(tmp_path):
+    page = StatusPage(tmp_path / "page")
+    reader = StatusPageReader(str(tmp_path / "page"))
+    try:
+        _publish(page, 1)
+        SEQUENCE.pack_into(page._map, SEQUENCE_OFFSET, 3)
+        assert reader.read(retries=5) is None
+    finally:
+        reader.close()
+        page.close()
+
+
+def test_sequence_keeps_counting_after_the_writer_restarts(tmp_path):
+    page = StatusPage(tmp_path / "page")
+    _publish(page, 1)
+    # A writer that died mid-update leaves the counter odd.
+    SEQUENCE.pack_into(page._map, SEQUENCE_OFFSET, 3)
+    page.close()
+    
+    page = StatusPage(tmp_path / "page")
+    reader = StatusPageReader(str(tmp_path / "page"))
+    try:
+        _publish(page, 2)
+        assert reader.read().sequence == 4
+    finally:
+        reader.close()
+        page.close()
+
+
+def test_other_files_are_rejected(tmp_path):
+    path = tmp_path / "page"
+    path.write_bytes(b"\0" * 256)
+    
+    with pytest.raises(ValueError, match="not a status page"):
+        StatusPageReader(str(path))
+
+
+def test_concurrent_reads_are_never_torn(tmp_path):
+    page = StatusPage(tmp_path / "page")
+    reader = StatusPageReader(str(tmp_path / "page"))
+    stop = threading.Event()
+    
+    def write():
+        i = 0
+        while not stop.is_set():
+            i += 1
+            _publish(page, i)
+    writer = threading.Thread(target=write)
+    writer.start()
+    try:
+        snapshots = [reader.read(retries=10000) for _ in range(2000)]
+    finally:
+        stop.set()
+        writer.join()
+        reader.close()
+        page.close()
+    
+    published = [snapshot for snapshot in snapshots if snapshot is not None and snapshot.sequence > 0]
+    assert published
+    for snapshot in published:
+        i = snapshot.transitions
+        assert (snapshot.cpu, snapshot.gpu, snapshot.boosted, snapshot.reason) == (i, i, i % 2 == 1, f"tick {i}")
+        assert snapshot.sequence == 2 * i
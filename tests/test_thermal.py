@@ -0,0 +1,113 @@
+from collections import namedtuple
+
+from src.thermal import Limit, ThermalGate
+
+Temperature = namedtuple('Temperature', ['label', 'current'])
+Battery = namedtuple('Battery', ['percent', 'power_plugged'])
+Gpu = namedtuple('Gpu', ['temperature_c', 'power_w'])
+
+
+class ThermalConfig:
+    def __init__(self, battery=None):
+        self.thermal_hysteresis_c = 5.0
+        self.thermal_hysteresis_w = 20.0
+        self.thermal_cpu = {"blockAboveC": 85, "demoteAboveC": 95}
+        self.thermal_gpu = {"blockAboveC": 80, "demoteAboveC": 90, "demoteAbovePowerW": 300}
+        self.thermal_battery = battery or {"mode": "thresholds", "cpuPercent": 90, "minPercent": 20}
+        self.thermal_sample_seconds = 5.0
+
+
+class FakeSensors:
+    """Stands in for psutil's sensors_* functions."""
+    
+    def __init__(self, cpu_temp: float = 50.0, battery=None):
+        self.cpu_temp = cpu_temp
+        self.battery = battery
+        self.reads = 0
+    
+    def sensors_temperatures(self):
+        self.reads += 1
+        return {"coretemp": [Temperature("Package", self.cpu_temp), Temperature("Core 0", self.cpu_temp - 3)]}
+    
+    def sensors_battery(self):
+        return self.battery
+
+
+def test_ceiling_latches_until_hysteresis_below_the_limit():
+    limit = Limit("CPU temperature", 85.0, 5.0, "°C")
+    
+    assert [limit.update(v) for v in (84, 85, 82, 80, 79.9, 84)] == [False, True, True, True, False, False]
+
+
+def test_floor_latches_until_hysteresis_above_the_limit():
+    limit = Limit("Battery", 20.0, 5.0, "%", floor=True)
+    
+    assert [limit.update(v) for v in (21, 20, 24, 25, 25.1)] == [False, True, True, True, False]
+
+
+def test_missing_value_or_limit_never_trips():
+    assert not Limit("GPU power", None, 20.0, "W").update(500.0)
+    limit = Limit("GPU power", 300.0, 20.0, "W")
+    limit.update(400.0)
+    assert not limit.update(None)
+
+
+def test_sensors_are_read_every_sample_period():
+    sensors = FakeSensors(cpu_temp=60.0)
+    gate = ThermalGate(ThermalConfig(), sensors)
+    
+    gate.update([], now=100.0)
+    sensors.cpu_temp = 99.0
+    gate.update([], now=104.0)
+    assert gate.cpu_temp == 60.0
+    
+    gate.update([], now=105.0)
+    assert sensors.reads == 2
+    assert gate.cpu_temp == 99.0
+
+
+def test_block_and_demote_reasons():
+    sensors = FakeSensors(cpu_temp=88.0)
+    gate = ThermalGate(ThermalConfig(), sensors)
+    
+    gate.update([Gpu(70.0, 150.0)], now=0.0)
+    assert gate.demote_reason() is None
+    assert gate.block_reason() == "Thermal block: CPU temperature 88°C (limit 85°C)"
+    
+    gate.update([Gpu(70.0, 200.0), Gpu(72.0, 150.0)], now=1.0)
+    assert gate.demote_reason() == "Thermal limit: GPU power 350W (limit 300W)"
+    assert gate.block_reason() == gate.demote_reason()
+    
+    gate.update([Gpu(70.0, 290.0)], now=2.0)
+    assert gate.demote_reason() is not None
+    gate.update([Gpu(70.0, 270.0)], now=3.0)
+    assert gate.demote_reason() is None
+
+
+def test_battery_raises_thresholds_and_demotes_when_low():
+    sensors = FakeSensors(battery=Battery(50.0, False))
+    gate = ThermalGate(ThermalConfig(), sensors)
+    gate.update([], now=0.0)
+    
+    assert gate.on_battery
+    assert gate.cpu_threshold(80.0) == 90.0
+    assert gate.gpu_threshold(80.0) == 80.0
+    assert gate.demote_reason() is None
+    
+    sensors.battery = Battery(15.0, False)
+    gate.update([], now=10.0)
+    assert gate.demote_reason() == "Power limit: Battery 15% (limit 20%)"
+    
+    sensors.battery = Battery(15.0, True)
+    gate.update([], now=20.0)
+    assert gate.demote_reason() is None
+    assert gate.cpu_threshold(80.0) == 80.0
+
+
+def test_battery_block_mode():
+    sensors = FakeSensors(battery=Battery(80.0, False))
+    gate = ThermalGate(ThermalConfig(battery={"mode": "block"}), sensors)
+    gate.update([], now=0.0)
+    
+    assert gate.block_reason() == "On battery"
+    assert gate.demote_reason() is None
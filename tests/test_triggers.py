@@ -0,0 +1,82 @@
+import pytest
+
+from src.triggers import Trigger, TriggerContext, TriggerSyntaxError, compile_triggers
+
+
+def _context(**values) -> TriggerContext:
+    ctx = TriggerContext()
+    for name, value in values.items():
+        setattr(ctx, name, value)
+    return ctx
+
+
+def test_comparison_reports_the_clause_that_fired():
+    trigger = Trigger("hot", "cpu > 80 or gpu >= 90")
+    
+    assert trigger.evaluate(_context(cpu=50.0, gpu=95.0)) == "Trigger 'hot': gpu >= 90"
+    assert trigger.evaluate(_context(cpu=50.0, gpu=50.0)) is None
+
+
+def test_missing_metric_never_fires():
+    trigger = Trigger("warm", "cpu_temp > 80")
+    assert trigger.evaluate(_context()) is None
+    assert trigger.evaluate(_context(cpu_temp=85.0)) is not None
+
+
+def test_for_requires_the_condition_to_hold_without_a_break():
+    trigger = Trigger("sustained", "cpu > 50 for 3s")
+    
+    assert trigger.evaluate(_context(cpu=60.0, now=10.0)) is None
+    assert trigger.evaluate(_context(cpu=60.0, now=12.0)) is None
+    assert trigger.evaluate(_context(cpu=40.0, now=12.5)) is None
+    assert trigger.evaluate(_context(cpu=60.0, now=13.0)) is None
+    assert trigger.evaluate(_context(cpu=60.0, now=16.0)) == "Trigger 'sustained': cpu > 50 for 3s"
+
+
+def test_or_keeps_every_timer_running():
+    trigger = Trigger("either", "gpu > 90 or cpu > 50 for 2s")
+    
+    trigger.evaluate(_context(cpu=60.0, gpu=95.0, now=0.0))
+    assert trigger.evaluate(_context(cpu=60.0, gpu=10.0, now=2.0)) == "Trigger 'either': cpu > 50 for 2s"
+
+
+def test_processes_cores_and_booleans():
+    trigger = Trigger("build", "proc('CL.exe') and core(1) > 90 and not on_battery")
+    
+    ctx = _context(processes={"cl.exe"}, cores=(10.0, 95.0), on_battery=False)
+    assert trigger.evaluate(ctx) is not None
+    assert trigger.uses_cores
+    ctx.on_battery = True
+    assert trigger.evaluate(ctx) is None
+    assert trigger.evaluate(_context(processes={"cl.exe"}, cores=(10.0,))) is None
+
+
+@pytest.mark.parametrize("expression, column", [
+    ("cpu >", 6),
+    ("cpu > 80 for 3", 14),
+    ("cpu $ 80", 5),
+    ("(cpu > 80", 10),
+    ("core(1.5) > 80", 6)
+])
+def test_syntax_errors_point_at_the_column(expression, column):
+    with pytest.raises(TriggerSyntaxError) as error:
+        Trigger("bad", expression)
+    assert error.value.position + 1 == column
+
+
+def test_invalid_rules_are_skipped(caplog):
+    triggers = compile_triggers([
+        {"name": "ok", "when": "cpu > 80"},
+        "cpu > 90",
+        ["gpu > 90"],
+        {"name": "numeric", "when": 42},
+        {"name": "broken", "when": "cpu >"},
+        {"when": "gpu > 90"}
+    ])
+    
+    assert [trigger.name for trigger in triggers] == ["ok", "rule6"]
+    assert len([r for r in caplog.records if r.levelname == "ERROR"]) == 4
+
+
+def test_rules_that_are_not_a_list_are_ignored():
+    assert compile_triggers({"when": "cpu > 80"}) == []
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Latency rig for Dynamic Power Plan (Linux).
+
+Drives SystemMonitor and PowerManager (with simulated actuators) while a
+multiprocessing load generator plays scripted CPU load patterns and a fake
+process table injects watched games. Reports promote/demote latency
+distributions and spurious transitions per scenario.
+
+Usage:
+    python tools/latency_rig.py [--scenario NAME ...] [--repeat N] [--json]
+
+Latency is measured from the start (or end) of the expected load window to
+the moment PowerManager.apply_boost_mode() returns. Run it on an otherwise
+idle machine; other load shifts the CPU readings. Flap control, attribution
+and energy metering are off unless --flap-control turns flap control back on.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.config import Config
+from src.logging_setup import shutdown_logging
+from src.monitor import SystemMonitor
+from src.power_manager import PowerManager
+
+GAME = "latencyrig-game.exe"
+GAME_PID = 424242
+BASE_PROCESSES = {1: "init", 2: "kthreadd", 100: "sshd", 200: "bash"}
+IDLE = 0.0
+HIGH = 1.0
+SLICE_SECONDS = 0.02
+
+
+class Segment(NamedTuple):
+    seconds: float
+    duty: float
+    game: bool = False
+    expect_boost: bool = False
+    # Deliver the game start like a process event source would, not only via the next scan.
+    fast_path: bool = False
+
+
+def _load_worker(duty, stop):
+    """Burn CPU for `duty` of every 20 ms slice until stop is set."""
+    while not stop.is_set():
+        busy = duty.value * SLICE_SECONDS
+        started = time.perf_counter()
+        while time.perf_counter() - started < busy:
+            pass
+        rest = SLICE_SECONDS - (time.perf_counter() - started)
+        if rest > 0:
+            time.sleep(rest)
+
+
+class LoadGenerator:
+    def __init__(self, workers: int):
+        self.duty = multiprocessing.Value('d', 0.0, lock=False)
+        self.stop_event = multiprocessing.Event()
+        self.processes = [multiprocessing.Process(target=_load_worker, args=(self.duty, self.stop_event),
+                                                  daemon=True) for _ in range(workers)]
+    
+    def start(self):
+        for process in self.processes:
+            process.start()
+    
+    def set(self, duty: float):
+        self.duty.value = duty
+    
+    def stop(self):
+        self.stop_event.set()
+        for process in self.processes:
+            process.join(timeout=2)
+
+
+def build_scenarios(promote_hold: float, demote_hold: float) -> Dict[str, List[Segment]]:
+    settle = demote_hold + 4
+    loaded = promote_hold + 6
+    ramp = [Segment(0.5, step / 10) for step in range(1, 11)]
+    scenarios = {
+        "step": [Segment(3, IDLE), Segment(loaded, HIGH, expect_boost=True), Segment(settle, IDLE)],
+        "bursts": [Segment(3, IDLE)] + [Segment(promote_hold * 0.5, HIGH), Segment(2, IDLE)] * 5
+        + [Segment(settle, IDLE)],
+        "ramp": [Segment(3, IDLE)]
+        + [segment._replace(expect_boost=segment.duty >= 0.7) for segment in ramp]
+        + [Segment(loaded, HIGH, expect_boost=True)]
+        + [segment._replace(expect_boost=segment.duty >= 0.7) for segment in reversed(ramp)]
+        + [Segment(settle, IDLE)],
+        "game": [Segment(3, IDLE), Segment(loaded, IDLE, game=True, expect_boost=True), Segment(settle, IDLE)],
+        "game-fast": [Segment(3, IDLE), Segment(loaded, IDLE, game=True, expect_boost=True, fast_path=True),
+                      Segment(settle, IDLE)]
+    }
+    return scenarios
+
+
+class RunResult(NamedTuple):
+    promote: List[float]
+    demote: List[float]
+    spurious: int
+    missed: int
+
+
+class Rig:
+    def __init__(self, args):
+        self.args = args
+        self.workdir = Path(tempfile.mkdtemp(prefix='latency-rig-'))
+        self.config = self._make_config()
+        self.load = LoadGenerator(args.workers)
+        self.processes: Dict[int, str] = dict(BASE_PROCESSES)
+        self.transitions: List[Tuple[float, bool]] = []
+        self._lock = threading.Lock()
+    
+    def _make_config(self) -> Config:
+        overrides = {
+            "thresholds": {"promoteHoldSeconds": self.args.promote_hold, "demoteHoldSeconds": self.args.demote_hold},
+            "games": {"watch": [GAME]},
+            "sampling": {"intervalMs": self.args.interval_ms, "adaptive": False},
+            "lconnect": {"enableFanBoost": False, "serviceBackend": "simulated"},
+            "prediction": {"enabled": False},
+            "history": {"enabled": False},
+            "state": {"persist": False},
+            "processEvents": {"enabled": False},
+            "thermal": {"enabled": False},
+            # Flap control lengthens the holds in the bursts and ramp scenarios. Attribution scans every
+            # process when a hold starts, and energy adds a sampler to each tick. All three skew latency.
+            "flapControl": {"enabled": self.args.flap_control},
+            "attribution": {"enabled": False},
+            "energy": {"enabled": False},
+            "logging": {"logDir": str(self.workdir / "logs")}
+        }
+        path = self.workdir / 'config.json'
+        path.write_text(json.dumps(overrides))
+        return Config(str(path))
+    
+    def _on_state_change(self, boost: bool):
+        self.power_manager.apply_boost_mode(boost)
+        with self._lock:
+            self.transitions.append((time.monotonic(), boost))
+    
+    def run_scenario(self, segments: List[Segment]) -> RunResult:
+        self.monitor = SystemMonitor(self.config, process_scanner=lambda: dict(self.processes))
+        self.power_manager = PowerManager(self.config)
+        self.monitor.set_state_change_callback(self._on_state_change)
+        self.transitions = []
+        self.load.set(IDLE)
+        self.monitor.start()
+        time.sleep(1.0)
+        
+        timeline: List[Tuple[float, Segment]] = []
+        try:
+            for segment in segments:
+                started = time.monotonic()
+                timeline.append((started, segment))
+                self.load.set(segment.duty)
+                if segment.game and GAME_PID not in self.processes:
+                    self.processes[GAME_PID] = GAME
+                    if segment.fast_path:
+                        self.monitor.notify_process_started(GAME_PID, GAME)
+                elif not segment.game:
+                    self.processes.pop(GAME_PID, None)
+                time.sleep(max(0.0, started + segment.seconds - time.monotonic()))
+            ended = time.monotonic()
+        finally:
+            self.load.set(IDLE)
+            self.processes.pop(GAME_PID, None)
+            self.monitor.stop()
+            self.power_manager.wait_idle(timeout=self.config.service_deadline_seconds)
+        return score(expected_windows(timeline, ended), self.transitions, timeline[0][0], ended)
+    
+    def close(self):
+        self.load.stop()
+        shutdown_logging()
+
+
+def expected_windows(timeline: List[Tuple[float, Segment]], ended: float) -> List[Tuple[float, float]]:
+    """Merge consecutive expect_boost segments into (start, end) windows."""
+    windows: List[Tuple[float, float]] = []
+    for i, (started, segment) in enumerate(timeline):
+        finished = timeline[i + 1][0] if i + 1 < len(timeline) else ended
+        if not segment.expect_boost:
+            continue
+        if windows and abs(windows[-1][1] - started) < 1e-6:
+            windows[-1] = (windows[-1][0], finished)
+        else:
+            windows.append((started, finished))
+    return windows
+
+
+def score(windows: List[Tuple[float, float]], transitions: List[Tuple[float, bool]],
+          started: float, ended: float) -> RunResult:
+    """Match transitions to windows: one promote after each window start, one demote after its end.
+
+    Anything else (boosting with no expected load, dropping out mid-window,
+    extra flips) counts as spurious; a window with no promote counts as missed.
+    """
+    promote: List[float] = []
+    demote: List[float] = []
+    spurious = 0
+    missed = 0
+    pending = [t for t in transitions if t[0] >= started]
+    boundaries = [start for start, _ in windows[1:]] + [ended + 3600]
+    
+    spurious += sum(1 for t, _ in pending if windows and t < windows[0][0])
+    if not windows:
+        spurious += len(pending)
+    
+    for (start, end), next_start in zip(windows, boundaries):
+        in_range = [(t, boost) for t, boost in pending if start <= t < next_start]
+        promoted_at: Optional[float] = None
+        demoted_at: Optional[float] = None
+        for t, boost in in_range:
+            if boost and promoted_at is None and t < end:
+                promoted_at = t
+                promote.append(t - start)
+            elif not boost and promoted_at is not None and demoted_at is None and t >= end:
+                demoted_at = t
+                demote.append(t - end)
+            else:
+                spurious += 1
+        if promoted_at is None:
+            missed += 1
+    return RunResult(promote, demote, spurious, missed)
+
+
+def distribution(values: List[float]) -> Dict[str, Any]:
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+    
+    def pick(fraction: float) -> float:
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+    return {
+        "count": len(ordered),
+        "min": ordered[0],
+        "p50": pick(0.5),
+        "p95": pick(0.95),
+        "max": ordered[-1]
+    }
+
+
+def _format(dist: Dict[str, Any]) -> str:
+    if not dist["count"]:
+        return "-"
+    return f"{dist['p50']:.2f}s p50 / {dist['p95']:.2f}s p95 ({dist['min']:.2f}-{dist['max']:.2f}, n={dist['count']})"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure promote/demote latency against scripted load')
+    parser.add_argument('--scenario', action='append', help='Scenario to run (repeatable; default all)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per scenario')
+    parser.add_argument('--interval-ms', type=int, default=250, help='Monitor sampling interval')
+    parser.add_argument('--promote-hold', type=float, default=2.0, help='thresholds.promoteHoldSeconds')
+    parser.add_argument('--demote-hold', type=float, default=4.0, help='thresholds.demoteHoldSeconds')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Load generator processes')
+    parser.add_argument('--flap-control', action='store_true', help='Keep flapControl on (off by default)')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+    
+    if platform.system() != "Linux":
+        print("The latency rig runs on Linux only", file=sys.stderr)
+        sys.exit(1)
+    
+    scenarios = build_scenarios(args.promote_hold, args.demote_hold)
+    names = args.scenario or list(scenarios)
+    unknown = [name for name in names if name not in scenarios]
+    if unknown:
+        parser.error(f"Unknown scenario(s) {', '.join(unknown)}; choose from {', '.join(scenarios)}")
+    
+    rig = Rig(args)
+    rig.load.start()
+    report = {}
+    try:
+        for name in names:
+            runs = [rig.run_scenario(scenarios[name]) for _ in range(args.repeat)]
+            report[name] = {
+                "runs": len(runs),
+                "promote": distribution([v for run in runs for v in run.promote]),
+                "demote": distribution([v for run in runs for v in run.demote]),
+                "spurious": sum(run.spurious for run in runs),
+                "missed": sum(run.missed for run in runs)
+            }
+            if not args.json:
+                result = report[name]
+                print(f"{name:10} promote {_format(result['promote'])}")
+                print(f"{'':10} demote  {_format(result['demote'])}")
+                print(f"{'':10} spurious {result['spurious']}, missed {result['missed']} over {result['runs']} runs",
+                      flush=True)
+    finally:
+        rig.close()
+    
+    if args.json:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()